@@ -7,9 +7,99 @@ class Settings(BaseSettings):
     supabase_service_key: str
     use_supabase: bool = False       # optional, default False
     storage_bucket: str = "task-files"  # optional default
+    # Table access: "supabase" (PostgREST) or "sqlite" (embedded, single node)
+    repository_backend: str = "supabase"
+    sqlite_path: str = "./taskflow.db"
+    sqlite_max_connections: int = 4  # query threads, one connection each
+    sqlite_statement_cache_size: int = 256  # prepared statements per connection
+    sqlite_busy_timeout: float = 5.0  # seconds a write waits for the lock
+
+    # Where uploads live: "supabase" (storage_bucket) or "local" (a directory)
+    storage_backend: str = "supabase"
+    local_storage_root: str = "./storage"
+    local_storage_public_url: str = "/api/files"  # served by GET /api/files/{path}
     jwt_secret: str = ""  # optional, add if you need JWT_SECRET
+    jwt_algorithm: str = "HS256"
+    jwt_expiration: int = 3600  # seconds
     cors_origins: list[str] = ["http://localhost:3000"]  # CORS allowed origins
 
+    # Max concurrent in-flight calls per Supabase upstream, per worker
+    postgrest_max_concurrency: int = 32
+    storage_max_concurrency: int = 8
+    auth_max_concurrency: int = 8
+
+    # Shared Supabase connection pool (see app.utils.supabase_client)
+    supabase_http2: bool = True
+    supabase_max_connections: int = 100
+    supabase_max_keepalive_connections: int = 20
+    supabase_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    supabase_timeout: float = 30.0
+    supabase_warmup: bool = True  # open a connection at startup
+
+    # Read-through caches for tasks and project lists (app.utils.cache)
+    cache_enabled: bool = True
+    cache_max_entries: int = 10_000
+    cache_ttl_seconds: float = 30.0
+    # Verified JWT claims; entries never outlive the token's exp
+    token_cache_max_entries: int = 10_000
+    token_cache_ttl_seconds: float = 300.0
+    # /api/auth/me profiles: served from cache, refreshed in the background
+    profile_cache_ttl_seconds: float = 3600.0
+    profile_refresh_seconds: float = 60.0
+
+    # Share one upstream call between identical concurrent reads
+    single_flight_enabled: bool = True
+
+    # Opt-in fast path for list endpoints (app.utils.fast_json): validate
+    # rows once and serialize in pydantic-core; with trust_rows, skip
+    # validation and write database rows straight out with orjson
+    fast_json: bool = False
+    fast_json_trust_rows: bool = False
+
+    # Per-request sampling profiler (app.utils.profiling). When enabled,
+    # requests sent with `X-Profile: <admin_token>` and a random
+    # profiling_sample_rate fraction of traffic are profiled; results are
+    # served by /api/admin/profiles, which also takes the admin token
+    admin_token: str = ""  # empty disables the admin API
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_interval: float = 0.005  # seconds between stack samples
+    profiling_max_stored: int = 100
+
+    # GET /tasks/project/{project_id} page size
+    task_page_size_default: int = 50
+    task_page_size_max: int = 200
+
+    # GET /tasks/project/{project_id}/events: server-sent task changes
+    task_feed_queue_size: int = 500  # events buffered per subscriber before it is told to resync
+    task_feed_heartbeat_seconds: float = 15.0  # keeps idle streams open through proxies
+
+    # GET /tasks/project/{project_id}/changes (delta sync)
+    task_sync_settle_seconds: float = 5.0  # cursors trail now by this much, so late-committing writes aren't skipped
+    task_tombstone_retention_days: int = 30  # older cursors get 410 and reload the full list
+
+    # /tasks/bulk
+    task_bulk_max_items: int = 1000
+    task_bulk_chunk_size: int = 500  # rows per insert/delete round trip
+
+    # Background jobs (app.utils.jobs)
+    job_workers: int = 0  # workers per queue; 0 = one per CPU core
+    job_queue_size: int = 1000  # jobs beyond this are dropped
+    job_max_attempts: int = 3
+    job_retry_seconds: float = 1.0  # doubled after each failed attempt
+    # Thumbnails, dimensions and page counts of uploads, made in the background
+    upload_processing_enabled: bool = True
+    thumbnail_size: int = 256  # longest edge, pixels
+
+    # DELETE /api/projects/{id}: background cascade over tasks, files and blobs
+    project_delete_batch_size: int = 200  # tasks (with their files) per batch
+    storage_delete_chunk_size: int = 50  # blobs (plus thumbnails) per storage remove call
+    project_delete_lease_seconds: float = 300.0  # a worker's claim on a deletion, renewed every batch
+
+    # POST /api/files/upload/batch
+    upload_batch_max_files: int = 50
+    upload_batch_concurrency: int = 4  # files streamed to storage at once per request
+
     class Config:
         env_file = ".env"
         extra = "allow"  # allow extra env vars like JWT_SECRET
@@ -1,28 +1,65 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
+from app.repositories.base import get_repository
+from app.services.project_deletion import start_deletion_sweeper, stop_deletion_sweeper
+from app.utils.broadcast import broadcast_stats
+from app.utils.cache import cache_stats
+from app.utils.concurrency import single_flight_stats
+from app.utils.jobs import close_job_queues, job_stats
+from app.utils.metrics import MetricsMiddleware, metrics
+from app.utils.profiling import ProfilingMiddleware, profiles
+from app.utils.supabase_client import registry
+from app.routers import admin
 from app.routers import auth
 from app.routers import projects
 from app.routers import tasks
 from app.routers import files
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await registry.start()
+    await get_repository().start()
+    start_deletion_sweeper()
+    yield
+    await stop_deletion_sweeper()
+    await close_job_queues()
+    await get_repository().close()
+    await registry.close()
 
-app = FastAPI(title="TaskFlow API (dev)")
 
+app = FastAPI(title="TaskFlow API (dev)", lifespan=lifespan)
+
+# Middleware added last runs first
+if settings.profiling_enabled:
+    # Not installed at all unless enabled, so unprofiled traffic pays nothing
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profiles,
+        token=settings.admin_token,
+        sample_rate=settings.profiling_sample_rate,
+        interval=settings.profiling_interval,
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Profile-Id"],
 )
+# Outermost, so the timing includes CORS and every other layer
+app.add_middleware(MetricsMiddleware)
 
-app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
-
+# Routers carry their full prefix, so route.path is the whole template
+app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(tasks.router)
-app.include_router(files.router, prefix="/api")
+app.include_router(files.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -32,3 +69,54 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/health/connections")
+async def connection_health():
+    """Startup time and per-upstream connection reuse/latency of the Supabase pool"""
+    return registry.metrics.snapshot()
+
+@app.get("/health/cache")
+async def cache_health():
+    """Size, hit/miss and eviction counts of the in-process read caches"""
+    return cache_stats()
+
+@app.get("/health/coalescing")
+async def coalescing_health():
+    """How many identical concurrent reads shared one upstream call"""
+    return single_flight_stats()
+
+@app.get("/health/jobs")
+async def job_health():
+    """Queue depth, in-flight, retried and failed background jobs"""
+    return job_stats()
+
+@app.get("/health/feeds")
+async def feed_health():
+    """Subscribers, fan-out and slow-consumer resyncs of the realtime feeds"""
+    return broadcast_stats()
+
+
+def _collect_runtime_gauges():
+    for name, stats in cache_stats().items():
+        cache_entries.set(stats["entries"], cache=name)
+        cache_lookups.set(stats["hits"], cache=name, result="hit")
+        cache_lookups.set(stats["misses"], cache=name, result="miss")
+    for name, stats in single_flight_stats().items():
+        coalesced_calls.set(stats["collapsed"], group=name)
+    for name, stats in broadcast_stats().items():
+        feed_subscribers.set(stats["subscribers"], feed=name)
+        feed_overflows.set(stats["overflows"], feed=name)
+
+
+cache_entries = metrics.gauge("taskflow_cache_entries", "Entries in each in-process cache", ("cache",))
+cache_lookups = metrics.gauge("taskflow_cache_lookups", "Cache lookups since start, by result", ("cache", "result"))
+coalesced_calls = metrics.gauge("taskflow_coalesced_reads", "Reads served by another caller's in-flight call", ("group",))
+feed_subscribers = metrics.gauge("taskflow_feed_subscribers", "Open realtime feed connections", ("feed",))
+feed_overflows = metrics.gauge("taskflow_feed_resyncs", "Slow subscribers told to resync since start", ("feed",))
+metrics.add_collector(_collect_runtime_gauges)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of route, upstream, cache and coalescing metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
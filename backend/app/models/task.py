@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class TaskCreate(BaseModel):
@@ -28,3 +28,36 @@ class TaskResponse(BaseModel):
     assigned_to: Optional[UUID] = None
     updated_at: datetime
     priority: str
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: UUID
+
+class TaskBulkDelete(BaseModel):
+    ids: List[UUID]
+
+class TaskBulkResult(BaseModel):
+    index: int  # position in the request array
+    id: Optional[UUID] = None
+    status: str  # created | updated | deleted | not_found | failed
+    error: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class TaskSearchHit(TaskResponse):
+    rank: float  # relevance, higher is better; only comparable within one query
+
+class TaskChanges(BaseModel):
+    changes: List[TaskResponse]  # created or updated since the cursor
+    deleted: List[UUID]  # tombstones: ids of tasks deleted since the cursor
+    cursor: str  # pass back as `since`
+    has_more: bool  # call again with `cursor` right away
+
+class TaskCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: Dict[str, int]  # user id, or "unassigned"
+
+class DashboardStats(BaseModel):
+    totals: TaskCounts  # across all the user's projects
+    projects: Dict[UUID, TaskCounts]
@@ -0,0 +1,94 @@
+# app/repositories/base.py
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Sequence
+
+# (column, operator, value) - operator is a PostgREST filter name: eq, neq,
+# lt, lte, gt, gte, in, is, ilike
+Filter = tuple[str, str, Any]
+# (column, descending)
+Order = tuple[str, bool]
+
+
+class Repository(ABC):
+    """
+    Table access used by the services. Rows are plain dicts; writes return
+    the rows they touched.
+    """
+
+    async def start(self):
+        """Open connections / create schema; called from the app lifespan"""
+
+    async def close(self):
+        """Release what `start` opened"""
+
+    @abstractmethod
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        order: Sequence[Order] = (),
+        limit: Optional[int] = None,
+        after: Optional[dict] = None,
+    ) -> list[dict]:
+        """
+        `after` holds the `order` column values of the last row already seen;
+        only rows sorting after it are returned (keyset pagination).
+        """
+
+    @abstractmethod
+    async def count(self, table: str, group_by: Sequence[str], filters: Sequence[Filter] = ()) -> list[dict]:
+        """
+        Row counts grouped in the database: one dict per group holding the
+        `group_by` columns and `count`
+        """
+
+    @abstractmethod
+    async def search(
+        self,
+        table: str,
+        terms: Sequence[str],
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Full-text search of `table` through its text index: rows matching
+        every term (as a word prefix), best first, each with a `rank`.
+        Terms are plain words: letters, digits and underscores only.
+        """
+
+    @abstractmethod
+    async def insert(self, table: str, rows: dict | list[dict], ignore_duplicates: bool = False) -> list[dict]:
+        """
+        With `ignore_duplicates`, rows whose primary key already exists are
+        skipped instead of failing the insert; only the rows written are returned.
+        """
+
+    @abstractmethod
+    async def update(self, table: str, values: dict, filters: Sequence[Filter]) -> list[dict]:
+        ...
+
+    @abstractmethod
+    async def delete(self, table: str, filters: Sequence[Filter]) -> list[dict]:
+        ...
+
+
+# Singleton instance
+_repository_instance: Optional[Repository] = None
+
+def get_repository() -> Repository:
+    """Get or create the configured repository (`settings.repository_backend`)"""
+    global _repository_instance
+    if _repository_instance is None:
+        from app.config import settings
+        if settings.repository_backend == "sqlite":
+            from app.repositories.sqlite_repository import SqliteRepository
+            _repository_instance = SqliteRepository(settings.sqlite_path)
+        elif settings.repository_backend == "supabase":
+            from app.repositories.supabase_repository import SupabaseRepository
+            _repository_instance = SupabaseRepository()
+        else:
+            raise RuntimeError(f"Unknown repository backend: {settings.repository_backend}")
+    return _repository_instance
@@ -0,0 +1,362 @@
+# app/repositories/sqlite_repository.py
+import asyncio
+import re
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence
+from app.config import settings
+from app.repositories.base import Filter, Order, Repository
+from app.utils.metrics import track_upstream
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    owner_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_owner_id ON projects (owner_id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    assigned_to TEXT,
+    created_by TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+-- Covers the board query: one project, newest first, keyset on id
+CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks (project_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to ON tasks (assigned_to);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at);
+
+-- Full-text index over tasks (GET /tasks/search), kept in sync by triggers;
+-- Supabase: migrations/004_task_search.sql
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, description,
+    content='tasks', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+
+-- Deleted task ids, for delta sync (GET /tasks/project/{id}/changes);
+-- Supabase: migrations/001_task_tombstones.sql
+CREATE TABLE IF NOT EXISTS task_tombstones (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    deleted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_project_id ON task_tombstones (project_id, deleted_at, id);
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_deleted_at ON task_tombstones (deleted_at);
+
+-- Background project deletions (DELETE /api/projects/{id}), resumed by
+-- whichever worker claims them; Supabase: migrations/003_project_deletions.sql
+CREATE TABLE IF NOT EXISTS project_deletions (
+    id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tasks_deleted INTEGER NOT NULL DEFAULT 0,
+    files_deleted INTEGER NOT NULL DEFAULT 0,
+    objects_removed INTEGER NOT NULL DEFAULT 0,
+    pending_paths TEXT,
+    error TEXT,
+    claimed_by TEXT,
+    lease_expires_at TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_project_deletions_status ON project_deletions (status, lease_expires_at);
+
+CREATE TABLE IF NOT EXISTS task_files (
+    id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_type TEXT,
+    file_size INTEGER,
+    uploaded_by TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    width INTEGER,
+    height INTEGER,
+    page_count INTEGER,
+    thumbnail_path TEXT,
+    processed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_task_files_task_id ON task_files (task_id);
+CREATE INDEX IF NOT EXISTS idx_task_files_file_path ON task_files (file_path);
+"""
+
+# Columns added after a table was first created; added to older databases
+# at startup (Supabase: migrations/002_task_files_metadata.sql)
+ADDED_COLUMNS = {
+    "task_files": [
+        ("width", "INTEGER"), ("height", "INTEGER"), ("page_count", "INTEGER"),
+        ("thumbnail_path", "TEXT"), ("processed_at", "TEXT"),
+    ],
+    "project_deletions": [("claimed_by", "TEXT"), ("lease_expires_at", "TEXT NOT NULL DEFAULT ''")],
+}
+
+# table -> (FTS5 index, bm25 column weights); a title hit outranks a description hit
+_SEARCH_INDEXES = {"tasks": ("tasks_fts", "10.0, 1.0")}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_OPERATORS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+
+def _name(identifier: str) -> str:
+    # Identifiers can't be bound as parameters, so only plain names get in
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid identifier: {identifier!r}")
+    return f'"{identifier}"'
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _where(filters: Sequence[Filter], params: list) -> str:
+    clauses = []
+    for column, op, value in filters:
+        column = _name(column)
+        if op in _OPERATORS:
+            clauses.append(f"{column} {_OPERATORS[op]} ?")
+            params.append(_value(value))
+        elif op == "in":
+            values = [_value(v) for v in value]
+            if not values:
+                clauses.append("0")
+                continue
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        elif op == "is":
+            if value is None or value == "null":
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} IS ?")
+                params.append(1 if value in (True, "true") else 0)
+        elif op == "ilike":
+            # SQLite LIKE is case-insensitive for ASCII; PostgREST also takes * for %
+            clauses.append(f"{column} LIKE ?")
+            params.append(str(value).replace("*", "%"))
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return " AND ".join(clauses)
+
+
+def _keyset(order: Sequence[Order], after: dict, params: list) -> str:
+    """Rows sorting strictly after `after` under `order` (see keyset_filter)"""
+    clauses = []
+    for i, (column, desc) in enumerate(order):
+        parts = []
+        for previous, _ in order[:i]:
+            parts.append(f"{_name(previous)} = ?")
+            params.append(_value(after[previous]))
+        parts.append(f"{_name(column)} {'<' if desc else '>'} ?")
+        params.append(_value(after[column]))
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def _columns(columns: str) -> str:
+    if columns.strip() == "*":
+        return "*"
+    return ", ".join(_name(c.strip()) for c in columns.split(","))
+
+
+class SqliteRepository(Repository):
+    """
+    Tables in an embedded SQLite database, for single-node deployments and
+    as a deterministic baseline in performance tests.
+
+    WAL mode lets reads run alongside a write. Queries run on a small
+    thread pool, one connection per thread; values are always bound
+    parameters and each connection caches its prepared statements, so
+    repeated query shapes skip parsing and planning.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.sqlite_max_connections, thread_name_prefix="sqlite"
+        )
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                isolation_level=None,  # autocommit; multi-row writes open their own transaction
+                check_same_thread=False,
+                cached_statements=settings.sqlite_statement_cache_size,
+                timeout=settings.sqlite_busy_timeout,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+            with self._schema_lock:
+                if not self._schema_ready:
+                    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+                    conn.executescript(SCHEMA)
+                    for table, columns in ADDED_COLUMNS.items():
+                        present = {row[1] for row in conn.execute(f"PRAGMA table_info({_name(table)})")}
+                        for column, kind in columns:
+                            if column not in present:
+                                conn.execute(f"ALTER TABLE {_name(table)} ADD COLUMN {_name(column)} {kind}")
+                    # Index rows written before the index existed
+                    for index, _ in _SEARCH_INDEXES.values():
+                        if index not in existing:
+                            conn.execute(f"INSERT INTO {_name(index)} ({_name(index)}) VALUES ('rebuild')")
+                    self._schema_ready = True
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, table: str, operation: str, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        with track_upstream("sqlite", table, operation):
+            return await loop.run_in_executor(self._executor, lambda: fn(self._connection()))
+
+    async def start(self):
+        await self._run("", "connect", lambda conn: None)
+
+    async def close(self):
+        def close_all():
+            # Let running queries finish before their connections close
+            self._executor.shutdown(wait=True)
+            with self._schema_lock:
+                for conn in self._connections:
+                    conn.close()
+                self._connections.clear()
+        # Draining blocks, so it happens off the event loop
+        await asyncio.to_thread(close_all)
+
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        order: Sequence[Order] = (),
+        limit: Optional[int] = None,
+        after: Optional[dict] = None,
+    ) -> list[dict]:
+        params: list = []
+        sql = f"SELECT {_columns(columns)} FROM {_name(table)}"
+        where = [w for w in (_where(filters, params), _keyset(order, after, params) if after else "") if w]
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order:
+            sql += " ORDER BY " + ", ".join(f"{_name(c)} {'DESC' if d else 'ASC'}" for c, d in order)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return await self._run(table, "select", lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def count(self, table: str, group_by: Sequence[str], filters: Sequence[Filter] = ()) -> list[dict]:
+        params: list = []
+        groups = ", ".join(_name(c) for c in group_by)
+        sql = f"SELECT {groups}, COUNT(*) AS count FROM {_name(table)}"
+        where = _where(filters, params)
+        if where:
+            sql += " WHERE " + where
+        sql += f" GROUP BY {groups}"
+        return await self._run(table, "count", lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def search(
+        self,
+        table: str,
+        terms: Sequence[str],
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """FTS5 match of every term as a prefix, ranked by weighted bm25"""
+        if table not in _SEARCH_INDEXES:
+            raise ValueError(f"No search index for table: {table}")
+        index, weights = _SEARCH_INDEXES[table]
+        params: list = [" ".join(f'"{term}"*' for term in terms)]
+        # `*` already includes rank; an explicit list gets it added once
+        projection = _columns(columns)
+        if projection != "*" and "rank" not in {c.strip() for c in columns.split(",")}:
+            projection += ", rank"
+        # Filters apply to the joined rows; the subquery keeps their column
+        # names unambiguous next to the index's own columns
+        sql = (
+            f"SELECT {projection} FROM ("
+            f"SELECT t.*, -bm25({_name(index)}, {weights}) AS rank "
+            f"FROM {_name(index)} JOIN {_name(table)} t ON t.rowid = {_name(index)}.rowid "
+            f"WHERE {_name(index)} MATCH ?)"
+        )
+        where = _where(filters, params)
+        if where:
+            sql += " WHERE " + where
+        sql += " ORDER BY rank DESC, id LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        return await self._run(table, "search", lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def insert(self, table: str, rows: dict | list[dict], ignore_duplicates: bool = False) -> list[dict]:
+        rows = [rows] if isinstance(rows, dict) else rows
+        if not rows:
+            return []
+
+        def insert_all(conn: sqlite3.Connection) -> list[dict]:
+            inserted = []
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in rows:
+                    row = {"id": str(uuid.uuid4()), **row}
+                    names = list(row)
+                    sql = (
+                        f"INSERT INTO {_name(table)} ({', '.join(_name(n) for n in names)}) "
+                        f"VALUES ({', '.join('?' * len(names))})"
+                        f"{' ON CONFLICT DO NOTHING' if ignore_duplicates else ''} RETURNING *"
+                    )
+                    inserted.extend(dict(r) for r in conn.execute(sql, [_value(row[n]) for n in names]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return inserted
+
+        return await self._run(table, "insert", insert_all)
+
+    async def update(self, table: str, values: dict, filters: Sequence[Filter]) -> list[dict]:
+        params = [_value(v) for v in values.values()]
+        sql = f"UPDATE {_name(table)} SET {', '.join(f'{_name(c)} = ?' for c in values)}"
+        where = _where(filters, params)
+        if where:
+            sql += " WHERE " + where
+        sql += " RETURNING *"
+        return await self._run(table, "update", lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def delete(self, table: str, filters: Sequence[Filter]) -> list[dict]:
+        params: list = []
+        sql = f"DELETE FROM {_name(table)}"
+        where = _where(filters, params)
+        if where:
+            sql += " WHERE " + where
+        sql += " RETURNING *"
+        return await self._run(table, "delete", lambda conn: [dict(row) for row in conn.execute(sql, params)])
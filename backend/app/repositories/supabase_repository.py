@@ -0,0 +1,155 @@
+# app/repositories/supabase_repository.py
+from typing import Hashable, Optional, Sequence
+from app.config import settings
+from app.repositories.base import Filter, Order, Repository
+from app.utils.concurrency import single_flight, upstream_limit
+from app.utils.supabase_client import get_service_client
+
+_FILTER_METHODS = {"in": "in_", "is": "is_"}
+
+
+def _apply_filters(query, filters: Sequence[Filter]):
+    for column, op, value in filters:
+        query = getattr(query, _FILTER_METHODS.get(op, op))(column, value)
+    return query
+
+
+def _quote(value) -> str:
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_filter(order: Sequence[Order], after: dict) -> str:
+    """
+    PostgREST `or` filter selecting the rows that sort strictly after
+    `after` under `order`, e.g. for [(updated_at, desc), (id, desc)]:
+
+        updated_at.lt.X,and(updated_at.eq.X,id.lt.Y)
+    """
+    clauses = []
+    for i, (column, desc) in enumerate(order):
+        parts = [f"{c}.eq.{_quote(after[c])}" for c, _ in order[:i]]
+        parts.append(f"{column}.{'lt' if desc else 'gt'}.{_quote(after[column])}")
+        clauses.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return ",".join(clauses)
+
+
+def _freeze(value) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class SupabaseRepository(Repository):
+    """
+    Async access to Supabase (PostgREST) tables.
+
+    Same semantics as `client.table(...)...execute()`, but awaited on the event
+    loop and bounded by the "postgrest" upstream semaphore so a slow round-trip
+    queues requests here instead of stalling the loop or the threadpool.
+
+    Identical concurrent selects share one upstream call (single flight).
+    Every write bumps its table's generation, which is part of the read key,
+    so a read issued after a write never joins a call that started before it.
+    """
+
+    def __init__(self):
+        self.reads = single_flight("postgrest_reads")
+        self._generations: dict[str, int] = {}
+
+    def _wrote(self, table: str):
+        self._generations[table] = self._generations.get(table, 0) + 1
+
+    async def _execute(self, query) -> list[dict]:
+        async with upstream_limit("postgrest"):
+            res = await query.execute()
+        return res.data or []
+
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        order: Sequence[Order] = (),
+        limit: Optional[int] = None,
+        after: Optional[dict] = None,
+    ) -> list[dict]:
+        client = get_service_client()
+        query = _apply_filters(client.table(table).select(columns), filters)
+        if after:
+            query = query.or_(keyset_filter(order, after))
+        for column, desc in order:
+            query = query.order(column, desc=desc)
+        if limit is not None:
+            query = query.limit(limit)
+        if not settings.single_flight_enabled:
+            return await self._execute(query)
+
+        key = (table, self._generations.get(table, 0), columns, _freeze(filters), _freeze(order), limit, _freeze(after))
+        return await self.reads.do(key, lambda: self._execute(query))
+
+    async def count(self, table: str, group_by: Sequence[str], filters: Sequence[Filter] = ()) -> list[dict]:
+        """
+        PostgREST aggregate select (`status,priority,count()`), grouped by
+        the plain columns. Needs aggregates enabled for the API role:
+
+            alter role authenticator set pgrst.db_aggregates_enabled = 'true';
+            notify pgrst, 'reload config';
+        """
+        client = get_service_client()
+        query = _apply_filters(client.table(table).select(",".join([*group_by, "count()"])), filters)
+        if not settings.single_flight_enabled:
+            return await self._execute(query)
+
+        key = (table, self._generations.get(table, 0), "count", tuple(group_by), _freeze(filters))
+        return await self.reads.do(key, lambda: self._execute(query))
+
+    async def search(
+        self,
+        table: str,
+        terms: Sequence[str],
+        columns: str = "*",
+        filters: Sequence[Filter] = (),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Calls the `search_<table>(q)` database function with a prefix
+        tsquery; filters, ranking and paging apply to its result. For tasks
+        it is created by migrations/004_task_search.sql.
+        """
+        client = get_service_client()
+        query = client.rpc(f"search_{table}", {"q": " & ".join(f"{term}:*" for term in terms)})
+        query = _apply_filters(query.select(columns if columns == "*" else f"{columns},rank"), filters)
+        query = query.order("rank", desc=True).order("id")
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        elif offset:
+            query = query.offset(offset)
+        return await self._execute(query)
+
+    async def insert(self, table: str, rows: dict | list[dict], ignore_duplicates: bool = False) -> list[dict]:
+        client = get_service_client()
+        query = client.table(table)
+        query = query.upsert(rows, ignore_duplicates=True) if ignore_duplicates else query.insert(rows)
+        try:
+            return await self._execute(query)
+        finally:
+            self._wrote(table)
+
+    async def update(self, table: str, values: dict, filters: Sequence[Filter]) -> list[dict]:
+        client = get_service_client()
+        try:
+            return await self._execute(_apply_filters(client.table(table).update(values), filters))
+        finally:
+            self._wrote(table)
+
+    async def delete(self, table: str, filters: Sequence[Filter]) -> list[dict]:
+        client = get_service_client()
+        try:
+            return await self._execute(_apply_filters(client.table(table).delete(), filters))
+        finally:
+            self._wrote(table)
+
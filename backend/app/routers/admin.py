@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.utils.profiling import profiles
+from app.utils.security import require_admin
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Stored request profiles, newest first"""
+    return profiles.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("json", pattern="^(json|folded)$")):
+    """
+    One request profile: summary plus "cpu" and "await" stacks with sample
+    counts, or `format=folded` for flame graph tools
+    """
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    if format == "folded":
+        return PlainTextResponse(profile.folded())
+    return {**profile.summary(), "stacks": profile.stacks()}
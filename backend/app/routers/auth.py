@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.models.user import UserCreate, UserLogin, Token, UserResponse
 from app.services.auth_service import AuthService
-from app.utils.security import get_current_user
+from fastapi.security import HTTPAuthorizationCredentials
+from app.utils.security import get_current_user, revoke_token, security
 
-router = APIRouter()
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+auth_service = AuthService()
 
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
@@ -14,8 +16,7 @@ async def signup(user_data: UserCreate):
     - **password**: Strong password (min 6 characters)
     - **full_name**: User's full name (optional)
     """
-    service = AuthService()
-    return await service.signup(user_data)
+    return await auth_service.signup(user_data)
 
 @router.post("/login", response_model=Token)
 async def login(credentials: UserLogin):
@@ -24,8 +25,7 @@ async def login(credentials: UserLogin):
 
     Returns JWT access token
     """
-    service = AuthService()
-    return await service.login(credentials)
+    return await auth_service.login(credentials)
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
@@ -34,13 +34,18 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 
     Requires: Bearer token in Authorization header
     """
-    service = AuthService()
-    return await service.get_user_by_id(current_user["sub"])
+    return await auth_service.get_profile(current_user)
 
 @router.post("/logout")
-async def logout(current_user: dict = Depends(get_current_user)):
+async def logout(
+    current_user: dict = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
     """
     Logout current user
-    Note: With JWT, logout is handled client-side by removing token
+
+    The token is revoked in this process until it expires; clients should
+    still discard it.
     """
+    revoke_token(credentials.credentials)
     return {"message": "Logged out successfully"}
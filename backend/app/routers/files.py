@@ -1,15 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query
-import uuid
+import asyncio
+from typing import List
+from fastapi import APIRouter, Depends, UploadFile, File, Header, HTTPException, Response, status, Query
 from pathlib import Path
-from app.utils.supabase_client import get_service_client
+from app.config import settings
+from app.repositories.base import get_repository
+from app.services.file_service import blob_path, publish_blob, release_blobs, staging_path
+from app.services.project_service import ProjectService
+from app.services.upload_processing import schedule_processing
+from app.storage.base import get_storage
+from app.utils.http_cache import etag_matches, strong_etag
+from app.utils.security import get_current_user
+from app.utils.uploads import MAX_FILE_SIZE, UploadStream, file_too_large
 
-router = APIRouter(prefix="/files", tags=["files"])
+router = APIRouter(prefix="/api/files", tags=["files"])
+repository = get_repository()
 
-BUCKET_NAME = "task-files"
+# Stored objects are immutable, so browsers and CDNs may keep them for a year
+FILE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx", ".txt", ".jpg", ".jpeg", ".png", ".gif", ".csv", ".xlsx"}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-
-supabase = get_service_client()
 
 def validate_file_extension(filename: str):
     ext = Path(filename).suffix.lower()
@@ -19,15 +27,55 @@ def validate_file_extension(filename: str):
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-async def validate_file_size(file: UploadFile):
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
+def validate_file_size(file: UploadFile):
+    # The multipart parser usually knows the size already, so oversized files
+    # are rejected before anything is sent to storage. UploadStream enforces
+    # the same limit chunk by chunk when it doesn't.
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise file_too_large()
+
+async def stage_upload(storage, file: UploadFile) -> tuple[UploadStream, str]:
+    """
+    Validate one upload and stream it to a staging object, hashing it in
+    the same pass.
+
+    Returns the stream (sized and hashed) and the staged object's path; see
+    `publish_blob` for moving it to its content-addressed path.
+    """
+    validate_file_extension(file.filename)
+    validate_file_size(file)
+    stream = UploadStream(file)
+    staged = staging_path()
+    await write_blob(storage, stream, staged, file.content_type)
+    return stream, staged
+
+async def write_blob(storage, stream: UploadStream, file_path: str, content_type: str | None):
+    # ✅ Stream to storage in chunks; never holds the whole file
+    try:
+        await storage.upload_stream(file_path, stream, content_type=content_type)
+    except HTTPException:
+        raise  # size limit hit mid-stream, or storage rejected it
+    except Exception as storage_error:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size is {MAX_FILE_SIZE // (1024*1024)}MB"
+            status_code=500, 
+            detail=f"Storage upload failed: {str(storage_error)}"
         )
-    await file.seek(0)
-    return content
+
+async def discard(storage, staged: list[str]):
+    try:
+        await storage.delete_files(staged)
+    except Exception:
+        pass
+
+def file_record(task_id: str, user_id: str | None, file: UploadFile, file_path: str, size: int) -> dict:
+    return {
+        "task_id": task_id,
+        "file_name": file.filename,
+        "file_path": file_path,
+        "file_type": Path(file.filename).suffix,
+        "file_size": size,
+        "uploaded_by": user_id
+    }
 
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_file(
@@ -36,62 +84,213 @@ async def upload_file(
     file: UploadFile = File(...)
 ):
     try:
-        validate_file_extension(file.filename)
-        content = await validate_file_size(file)
+        storage = await get_storage()
+        stream, staged = await stage_upload(storage, file)
+        file_path = blob_path(stream.hexdigest())
 
-        unique_filename = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-
-        # ✅ Storage upload returns UploadResponse, not dict
+        # ✅ Insert DB record: the blob is referenced before it is published
         try:
-            res = supabase.storage.from_(BUCKET_NAME).upload(unique_filename, content)
-            # Check if upload was successful (no exception means success)
-        except Exception as storage_error:
+            rows = await repository.insert("task_files", file_record(task_id, user_id, file, file_path, stream.size))
+            if not rows:
+                raise HTTPException(status_code=500, detail="Failed to insert file record")
+        except Exception as db_error:
+            await discard(storage, [staged])
             raise HTTPException(
-                status_code=500, 
-                detail=f"Storage upload failed: {str(storage_error)}"
+                status_code=500,
+                detail=f"Database insert failed: {str(db_error)}"
             )
 
-        # ✅ Get public URL
-        url = supabase.storage.from_(BUCKET_NAME).get_public_url(unique_filename)
-
-        # ✅ Insert DB record - .execute() returns a response object
+        # ✅ Same content already stored: the staged copy is dropped
         try:
-            record = supabase.table("task_files").insert({
-                "task_id": task_id,
-                "file_name": file.filename,
-                "file_path": unique_filename,
-                "file_type": Path(file.filename).suffix,
-                "file_size": len(content),
-                "uploaded_by": user_id
-            }).execute()
-            
-            # Check for errors in the response
-            if hasattr(record, 'data') and not record.data:
-                raise HTTPException(status_code=500, detail="Failed to insert file record")
-                
-        except Exception as db_error:
-            # Cleanup: delete uploaded file if DB insert fails
-            try:
-                supabase.storage.from_(BUCKET_NAME).remove([unique_filename])
-            except:
-                pass
+            deduplicated = not await publish_blob(storage, staged, file_path)
+        except Exception as storage_error:
+            await repository.delete("task_files", filters=[("id", "eq", rows[0]["id"])])
+            await discard(storage, [staged])
             raise HTTPException(
                 status_code=500,
-                detail=f"Database insert failed: {str(db_error)}"
+                detail=f"Storage upload failed: {str(storage_error)}"
             )
 
+        # ✅ Thumbnails / page counts are made in the background
+        schedule_processing(file_path, Path(file.filename).suffix)
+
+        # ✅ Get public URL
+        url = await storage.get_public_url(file_path)
+
         return {
             "message": "File uploaded successfully",
             "data": {
                 "task_id": task_id,
                 "file_name": file.filename,
-                "file_path": unique_filename,
+                "file_path": file_path,
                 "url": url,
-                "size": len(content)
+                "size": stream.size,
+                "deduplicated": deduplicated
             }
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/upload/batch", status_code=status.HTTP_201_CREATED)
+async def upload_files(
+    task_id: str = Query(...),
+    user_id: str | None = Query(None),
+    files: List[UploadFile] = File(...)
+):
+    """
+    Upload many files to one task in a single request.
+
+    Files are streamed to storage concurrently (at most
+    `upload_batch_concurrency` at a time), hashed as they go, and all
+    `task_files` rows are written in one insert. Content already in storage
+    (or repeated within the batch) is then kept once. Each file gets its own
+    status; a failed file doesn't fail the others.
+    """
+    if len(files) > settings.upload_batch_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Max per batch is {settings.upload_batch_max_files}"
+        )
+
+    storage = await get_storage()
+    results = [{"file_name": f.filename, "status": "pending"} for f in files]
+    staged: dict[int, tuple[UploadStream, str]] = {}
+    limit = asyncio.Semaphore(settings.upload_batch_concurrency)
+
+    async def stage(index: int):
+        async with limit:
+            try:
+                staged[index] = await stage_upload(storage, files[index])
+            except HTTPException as e:
+                results[index].update(status="failed", error=e.detail)
+
+    await asyncio.gather(*(stage(index) for index in range(len(files))))
+    stored = sorted(staged)
+    paths = {i: blob_path(staged[i][0].hexdigest()) for i in stored}
+    rows = []
+
+    if stored:
+        try:
+            rows = await repository.insert("task_files", [
+                file_record(task_id, user_id, files[i], paths[i], staged[i][0].size) for i in stored
+            ])
+            if len(rows) != len(stored):
+                raise Exception("Failed to insert file records")
+        except Exception as db_error:
+            await discard(storage, [staged[i][1] for i in stored])
+            for i in stored:
+                results[i].update(status="failed", error=f"Database insert failed: {str(db_error)}")
+            stored = []
+
+    # Rows come back in insert order; publish one after another so repeats
+    # within the batch find the first copy in place
+    for i, row in zip(stored, rows):
+        try:
+            deduplicated = not await publish_blob(storage, staged[i][1], paths[i])
+        except Exception as storage_error:
+            await repository.delete("task_files", filters=[("id", "eq", row["id"])])
+            await discard(storage, [staged[i][1]])
+            results[i].update(status="failed", error=f"Storage upload failed: {str(storage_error)}")
+            continue
+        results[i].update(
+            status="uploaded",
+            file_path=paths[i],
+            url=await storage.get_public_url(paths[i]),
+            size=staged[i][0].size,
+            deduplicated=deduplicated
+        )
+    # One job per distinct blob handles all of its rows
+    uploaded_paths = {paths[i]: i for i in stored if results[i]["status"] == "uploaded"}
+    for file_path, i in uploaded_paths.items():
+        schedule_processing(file_path, Path(files[i].filename).suffix)
+
+    uploaded = sum(1 for r in results if r["status"] == "uploaded")
+    return {
+        "message": f"Uploaded {uploaded} of {len(files)} files",
+        "task_id": task_id,
+        "uploaded": uploaded,
+        "failed": len(files) - uploaded,
+        "data": results
+    }
+
+@router.get("/task/{task_id}")
+async def list_task_files(task_id: str):
+    """
+    A task's files, newest first, with a URL for each and, once background
+    processing is done, a thumbnail URL (images), dimensions and page count
+    """
+    rows = await repository.select(
+        "task_files", filters=[("task_id", "eq", task_id)], order=[("created_at", True), ("id", True)]
+    )
+    storage = await get_storage()
+    files = []
+    for row in rows:
+        # Rows may be shared with concurrent readers (single-flight): copy, don't mutate
+        thumbnail = row.get("thumbnail_path")
+        files.append({
+            **row,
+            "url": await storage.get_public_url(row["file_path"]),
+            "thumbnail_url": await storage.get_public_url(thumbnail) if thumbnail else None,
+        })
+    return files
+
+@router.delete("/{file_id}")
+async def delete_file(file_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Delete a task_files record by ID; only the owner of the task's project
+    may.
+
+    The stored blob is reference counted: it is removed from storage only
+    when no other record points at the same content.
+    """
+    files = await repository.select("task_files", "id,task_id", filters=[("id", "eq", file_id)])
+    tasks = files and await repository.select(
+        "tasks", "project_id", filters=[("id", "eq", str(files[0]["task_id"]))]
+    )
+    if not tasks:
+        raise HTTPException(status_code=404, detail="File not found")
+    await ProjectService.require_owner(str(tasks[0]["project_id"]), str(current_user["sub"]))
+
+    rows = await repository.delete("task_files", filters=[("id", "eq", file_id)])
+    if not rows:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    storage = await get_storage()
+    removed = await release_blobs(storage, [rows[0]["file_path"]])
+    return {"success": True, "blob_removed": bool(removed)}
+
+@router.get("/{file_path:path}")
+async def download_file(
+    file_path: str,
+    range_header: str | None = Header(None, alias="Range"),
+    if_range: str | None = Header(None, alias="If-Range"),
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+):
+    """
+    Stream a stored file, honoring Range requests.
+
+    Stored names are content digests (older uploads: unique UUIDs) and are
+    never overwritten, so the path alone identifies the content and makes a
+    strong ETag; a matching If-None-Match gets a 304 without touching storage.
+    """
+    etag = strong_etag(file_path)
+    cache_headers = {"ETag": etag, "Cache-Control": FILE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag_matches(if_none_match, etag):
+        # The client can only hold this ETag from an earlier 200 for the same content
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    storage = await get_storage()
+    download = await storage.open_download(file_path, range_header)
+    if download.status_code == 416:  # Range not satisfiable
+        await download.aclose()
+        return Response(status_code=download.status_code, headers={**cache_headers, **download.headers})
+
+    # Streamed from the backend (local disk: sent zero-copy where possible)
+    return download.response(cache_headers)
@@ -1,14 +1,17 @@
 # app/routers/projects.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, UUID4
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, TypeAdapter, UUID4
 from typing import Optional, List
 from datetime import datetime
 import uuid
 
-from app.utils.supabase_client import get_service_client
+from app.config import settings
+from app.services.project_deletion import get_deletion, request_deletion
+from app.services.project_service import ProjectService
+from app.utils.fast_json import dump_models, dump_rows, json_response
+from app.utils.http_cache import collection_etag, not_modified
 from app.utils.security import get_current_user  # real auth dependency
 
-client = get_service_client()
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 class ProjectBase(BaseModel):
@@ -31,6 +34,19 @@ class ProjectResponse(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectDeletionResponse(BaseModel):
+    id: UUID4
+    status: str  # pending, running, done or failed
+    tasks_deleted: int
+    files_deleted: int
+    objects_removed: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+project_list_adapter = TypeAdapter(List[ProjectResponse])
+PROJECT_FIELDS = tuple(ProjectResponse.model_fields)
+
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project: ProjectCreate, current_user: dict = Depends(get_current_user)
@@ -43,40 +59,58 @@ async def create_project(
     payload["created_at"] = now.isoformat()
     payload["updated_at"] = now.isoformat()
 
-    res = client.table("projects").insert(payload).execute()
+    created = await ProjectService.create_project(payload)
 
-    if not res.data:
+    if not created:
         raise HTTPException(status_code=500, detail="Failed to create project")
 
-    return res.data[0]
+    return created
 
 
 @router.get("/", response_model=List[ProjectResponse])
-async def list_my_projects(current_user=Depends(get_current_user)):
-    owner_id = str(current_user["id"])
-    res = client.table("projects").select("*").eq("owner_id", owner_id).execute()
-
-    if res.data is None:
-        raise HTTPException(status_code=500, detail="Failed to fetch projects")
-
-    return res.data
+async def list_my_projects(request: Request, response: Response, current_user=Depends(get_current_user)):
+    owner_id = str(current_user["sub"])
+    projects = await ProjectService.get_projects_by_owner(owner_id)
+    cached = not_modified(request, response, collection_etag(projects))
+    if cached:
+        return cached
+    if settings.fast_json:
+        if settings.fast_json_trust_rows:
+            body = dump_rows(projects, PROJECT_FIELDS)
+        else:
+            body = dump_models(project_list_adapter, project_list_adapter.validate_python(projects))
+        return json_response(response, body)
+    return projects
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(project_id: str, update_data: ProjectUpdate, current_user=Depends(get_current_user)):
     payload = update_data.dict(exclude_unset=True)
     payload["updated_at"] = datetime.utcnow().isoformat()
-    res = client.table("projects").update(payload).eq("id", project_id).eq("owner_id", str(current_user["id"])).execute()
+    updated = await ProjectService.update_project(project_id, str(current_user["sub"]), payload)
 
-    if not res.data:
+    if not updated:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    return res.data[0]
+    return updated
 
-@router.delete("/{project_id}", response_model=ProjectResponse)
+@router.delete("/{project_id}", response_model=ProjectDeletionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def delete_project(project_id: str, current_user=Depends(get_current_user)):
-    res = client.table("projects").delete().eq("id", project_id).eq("owner_id", str(current_user["id"])).execute()
+    """
+    Remove the project at once and delete its tasks, attachments and stored
+    files in the background; follow along at GET /{project_id}/deletion
+    """
+    deletion = await request_deletion(project_id, str(current_user["sub"]))
 
-    if not res.data:
+    if not deletion:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    return res.data[0]
+    return deletion
+
+@router.get("/{project_id}/deletion", response_model=ProjectDeletionResponse)
+async def get_project_deletion(project_id: str, current_user=Depends(get_current_user)):
+    deletion = await get_deletion(project_id, str(current_user["sub"]))
+
+    if not deletion:
+        raise HTTPException(status_code=404, detail="No deletion for this project")
+
+    return deletion
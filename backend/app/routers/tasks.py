@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from uuid import UUID
-from typing import List
-from app.models.task import TaskCreate, TaskUpdate, TaskResponse
-from app.services.task_service import TaskService
+from typing import List, Optional
+from app.config import settings
+from app.models.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskBulkUpdate, TaskBulkDelete, TaskBulkResult, TaskChanges, TaskSearchHit,
+    TaskCounts, DashboardStats,
+)
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService, task_feed, task_list_adapter
+from app.utils.fast_json import dump_models, dump_rows, json_response
+from app.utils.http_cache import collection_etag, not_modified
+from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 task_service = TaskService()
@@ -14,34 +23,156 @@ def get_current_user_id():
 
 
 @router.post("/", response_model=TaskResponse)
-def create_task(payload: TaskCreate, current_user_id: UUID = Depends(get_current_user_id)):
-    task = task_service.create_task(payload, created_by=current_user_id)
+async def create_task(payload: TaskCreate, current_user_id: UUID = Depends(get_current_user_id)):
+    task = await task_service.create_task(payload, created_by=current_user_id)
     return task
 
 
+def check_bulk_size(items: list):
+    if len(items) > settings.task_bulk_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items. Max per request is {settings.task_bulk_max_items}"
+        )
+
+
+# Bulk, search and stats routes are declared before /{task_id} so they aren't parsed as IDs
+
+@router.post("/bulk", response_model=List[TaskBulkResult])
+async def create_tasks(payloads: List[TaskCreate], current_user_id: UUID = Depends(get_current_user_id)):
+    check_bulk_size(payloads)
+    return await task_service.create_tasks(payloads, created_by=current_user_id)
+
+
+@router.put("/bulk", response_model=List[TaskBulkResult])
+async def update_tasks(updates: List[TaskBulkUpdate]):
+    check_bulk_size(updates)
+    return await task_service.update_tasks(updates)
+
+
+@router.delete("/bulk", response_model=List[TaskBulkResult])
+async def delete_tasks(payload: TaskBulkDelete):
+    check_bulk_size(payload.ids)
+    return await task_service.delete_tasks(payload.ids)
+
+
+@router.get("/search", response_model=List[TaskSearchHit])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in title or description"),
+    limit: int = Query(settings.task_page_size_default, ge=1, le=settings.task_page_size_max),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Search tasks across the caller's projects, best matches first"""
+    hits, next_cursor = await task_service.search_tasks(str(current_user["sub"]), q, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return hits
+
+
+@router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+    """Task counts by status, priority and assignee for each of the caller's projects and overall"""
+    return await task_service.dashboard(str(current_user["sub"]))
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: UUID):
-    task = task_service.get_task(task_id)
+async def get_task(task_id: UUID, request: Request, response: Response):
+    task = await task_service.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return not_modified(request, response, collection_etag([task])) or task
 
 
 @router.get("/project/{project_id}", response_model=List[TaskResponse])
-def get_tasks_for_project(project_id: UUID):
-    res = task_service.list_tasks(project_id)
-    return res  # No need for res.error handling; TaskService returns list
+async def get_tasks_for_project(
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[UUID] = None,
+    sort: str = Query("-updated_at", description="Sort column, '-' prefix for descending"),
+    limit: int = Query(settings.task_page_size_default, ge=1, le=settings.task_page_size_max),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+):
+    trusted = settings.fast_json and settings.fast_json_trust_rows
+    tasks, next_cursor = await task_service.list_tasks(
+        project_id, status=status, priority=priority, assigned_to=assigned_to,
+        sort=sort, limit=limit, cursor=cursor, raw=trusted,
+    )
+    # Body stays a plain list; the next page is announced in a header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    cached = not_modified(request, response, collection_etag(tasks))
+    if cached:
+        return cached
+    if settings.fast_json:
+        body = dump_rows(tasks) if trusted else dump_models(task_list_adapter, tasks)
+        return json_response(response, body)
+    return tasks
+
+
+@router.get("/project/{project_id}/stats", response_model=TaskCounts)
+async def get_project_stats(project_id: UUID, current_user: dict = Depends(get_current_user)):
+    """Task counts by status, priority and assignee for one of the caller's projects"""
+    return await task_service.project_counts(project_id, str(current_user["sub"]))
+
+
+@router.get("/project/{project_id}/changes", response_model=TaskChanges)
+async def get_task_changes(
+    project_id: UUID,
+    since: Optional[str] = Query(None, description="`cursor` from the previous call; omit for a full copy"),
+    limit: int = Query(settings.task_page_size_max, ge=1, le=settings.task_page_size_max),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Delta sync for one of the caller's projects: tasks created or updated
+    and ids of tasks deleted since `since`, plus the cursor for the next
+    call. Apply changes as upserts and deletions as removals; on 410,
+    reload from scratch.
+    """
+    await ProjectService.require_owner(str(project_id), str(current_user["sub"]))
+    return await task_service.list_changes(project_id, since=since, limit=limit)
+
+
+@router.get("/project/{project_id}/events")
+async def task_events(project_id: UUID, current_user: dict = Depends(get_current_user)):
+    """
+    Server-sent events for one of the caller's projects, instead of polling
+    the list: `task.created` / `task.updated` carry the task, `task.deleted`
+    its id. Load the list once, then apply events. On `resync` (the client
+    fell behind) or a reconnect, load it again.
+    """
+    await ProjectService.require_owner(str(project_id), str(current_user["sub"]))
+    subscription = task_feed.subscribe(str(project_id))
+
+    async def stream():
+        try:
+            yield b"retry: 3000\nevent: ready\ndata: {}\n\n"
+            while True:
+                chunk = await subscription.next(settings.task_feed_heartbeat_seconds)
+                yield chunk or b": ping\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: UUID, payload: TaskUpdate):
-    task = task_service.update_task(task_id, payload)
+async def update_task(task_id: UUID, payload: TaskUpdate):
+    task = await task_service.update_task(task_id, payload)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
 @router.delete("/{task_id}")
-def delete_task(task_id: UUID):
-    res = task_service.delete_task(task_id)
+async def delete_task(task_id: UUID):
+    res = await task_service.delete_task(task_id)
     return {"success": res}
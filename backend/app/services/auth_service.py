@@ -1,14 +1,44 @@
-from app.utils.supabase_client import get_anon_client
+from app.utils.supabase_client import get_auth_client, get_service_client
+from app.utils.concurrency import upstream_limit
 from app.models.user import UserCreate, UserLogin, UserResponse, Token
 from app.utils.security import create_access_token
+from app.config import settings
+from app.utils.cache import get_cache
 from fastapi import HTTPException, status
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# user_id -> (monotonic time fetched, UserResponse)
+profile_cache = get_cache(
+    "user_profiles",
+    max_entries=settings.cache_max_entries,
+    ttl=settings.profile_cache_ttl_seconds,
+)
+# user_id -> in-flight background refresh; also keeps the task referenced
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+def remember_profile(user: UserResponse):
+    profile_cache.set(str(user.id), (time.monotonic(), user))
+
+
+def profile_claims(user: UserResponse) -> dict:
+    """JWT claims for `user`; enough for /me to answer without a lookup"""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "full_name": user.full_name,
+        "created_at": user.created_at.isoformat(),
+    }
+
 class AuthService:
-    def __init__(self):
-        self.supabase = get_anon_client()
+    """
+    Clients come from the shared registry, so an instance is cheap and
+    holds no connections of its own.
+    """
 
     async def signup(self, user_data: UserCreate) -> Token:
         """
@@ -16,15 +46,16 @@ class AuthService:
         """
         try:
             # Create user in Supabase Auth
-            response = self.supabase.auth.sign_up({
-                "email": user_data.email,
-                "password": user_data.password,
-                "options": {
-                    "data": {
-                        "full_name": user_data.full_name
+            async with upstream_limit("auth"):
+                response = await get_auth_client().sign_up({
+                    "email": user_data.email,
+                    "password": user_data.password,
+                    "options": {
+                        "data": {
+                            "full_name": user_data.full_name
+                        }
                     }
-                }
-            })
+                })
 
             if not response.user:
                 raise HTTPException(
@@ -32,17 +63,16 @@ class AuthService:
                     detail="Failed to create user"
                 )
 
-            # Create access token
-            access_token = create_access_token(
-                data={"sub": str(response.user.id), "email": response.user.email}
-            )
-
             user_response = UserResponse(
                 id=response.user.id,
                 email=response.user.email,
                 full_name=user_data.full_name,
                 created_at=response.user.created_at
             )
+            remember_profile(user_response)
+
+            # Create access token
+            access_token = create_access_token(data=profile_claims(user_response))
 
             return Token(access_token=access_token, user=user_response)
 
@@ -58,10 +88,11 @@ class AuthService:
         Login user and return access token
         """
         try:
-            response = self.supabase.auth.sign_in_with_password({
-                "email": credentials.email,
-                "password": credentials.password
-            })
+            async with upstream_limit("auth"):
+                response = await get_auth_client().sign_in_with_password({
+                    "email": credentials.email,
+                    "password": credentials.password
+                })
 
             if not response.user:
                 raise HTTPException(
@@ -69,17 +100,16 @@ class AuthService:
                     detail="Invalid credentials"
                 )
 
-            # Create access token
-            access_token = create_access_token(
-                data={"sub": str(response.user.id), "email": response.user.email}
-            )
-
             user_response = UserResponse(
                 id=response.user.id,
                 email=response.user.email,
                 full_name=response.user.user_metadata.get("full_name"),
                 created_at=response.user.created_at
             )
+            remember_profile(user_response)
+
+            # Create access token
+            access_token = create_access_token(data=profile_claims(user_response))
 
             return Token(access_token=access_token, user=user_response)
 
@@ -90,18 +120,64 @@ class AuthService:
                 detail="Invalid credentials"
             )
 
+    async def get_profile(self, claims: dict) -> UserResponse:
+        """
+        Profile of the token's user without a network hop where possible:
+        cached profile, else one built from the token's claims. Profiles
+        older than `profile_refresh_seconds` are refreshed in the background.
+        Only tokens that carry no profile claims wait on the admin API.
+        """
+        user_id = claims["sub"]
+        cached = profile_cache.get(user_id)
+        if cached is not None:
+            fetched_at, profile = cached
+            if time.monotonic() - fetched_at > settings.profile_refresh_seconds:
+                self._refresh_in_background(user_id)
+            return profile
+
+        if all(claims.get(k) for k in ("email", "created_at")):
+            profile = UserResponse(
+                id=user_id,
+                email=claims["email"],
+                full_name=claims.get("full_name"),
+                created_at=claims["created_at"]
+            )
+            # Claims are as old as the token, so refresh on the next request
+            profile_cache.set(user_id, (float("-inf"), profile))
+            return profile
+
+        return await self.get_user_by_id(user_id)
+
+    def _refresh_in_background(self, user_id: str):
+        if user_id in _refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self.get_user_by_id(user_id)
+            except HTTPException:
+                pass  # keep serving the cached profile until it expires
+            finally:
+                _refreshing.pop(user_id, None)
+
+        _refreshing[user_id] = asyncio.create_task(refresh())
+
     async def get_user_by_id(self, user_id: str) -> UserResponse:
         """
-        Get user details by ID
+        Get user details by ID from the admin API and refresh the profile cache
         """
         try:
-            response = self.supabase.auth.admin.get_user_by_id(user_id)
-            return UserResponse(
+            # Admin API needs the service-role key
+            async with upstream_limit("auth"):
+                response = await get_service_client().auth.admin.get_user_by_id(user_id)
+            user_response = UserResponse(
                 id=response.user.id,
                 email=response.user.email,
                 full_name=response.user.user_metadata.get("full_name"),
                 created_at=response.user.created_at
             )
+            remember_profile(user_response)
+            return user_response
         except Exception as e:
             logger.error(f"Get user error: {str(e)}")
             raise HTTPException(
@@ -1,16 +1,109 @@
-from fastapi import UploadFile
-from app.utils.supabase_client import supabase
+import asyncio
+import uuid
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from app.repositories.base import get_repository
+from app.storage.base import get_storage
+from app.utils.uploads import UploadStream
 
-BUCKET_NAME = "task-files"
+repository = get_repository()
 
 async def save_file(file: UploadFile):
-    # Read file content
-    content = await file.read()
-    
-    # Upload to Supabase Storage
-    supabase.storage.from_(BUCKET_NAME).upload(file.filename, content)
-    
+    storage = await get_storage()
+
+    # Stream to the configured storage backend
+    await storage.upload_stream(file.filename, UploadStream(file), content_type=file.content_type)
+
     # Get public URL
-    url = supabase.storage.from_(BUCKET_NAME).get_public_url(file.filename)
-    
-    return {"filename": file.filename, "url": url.public_url}
+    url = await storage.get_public_url(file.filename)
+
+    return {"filename": file.filename, "url": url}
+
+# Content-addressed blobs
+#
+# Uploads are stored under the SHA-256 of their content, so identical files
+# share one storage object and each task_files row is a reference to it.
+# A blob is only removed once no row points at it any more.
+#
+# References and blobs change without a lock between them, so both sides
+# follow an order that keeps every row's blob in place:
+#
+# - uploads are streamed to a staging object (hashed on the way), the row
+#   is inserted, and only then is the staged object moved to its blob
+#   path - or dropped if the blob is already there;
+# - releases move an unreferenced blob aside, check the references again
+#   and move it back if a row appeared meanwhile; otherwise it is deleted.
+
+def blob_path(digest: str) -> str:
+    return digest
+
+
+def staging_path() -> str:
+    """A fresh name to stream an upload to before its digest is known"""
+    return f"staging/{uuid.uuid4().hex}"
+
+
+def thumbnail_path(file_path: str) -> str:
+    """Where the preview of the blob at `file_path` is stored"""
+    return f"thumbnails/{file_path}"
+
+
+async def referenced_paths(file_paths: list[str]) -> set[str]:
+    """The subset of `file_paths` that at least one task_files row uses"""
+    if not file_paths:
+        return set()
+    rows = await repository.select(
+        "task_files", "file_path", filters=[("file_path", "in", list(set(file_paths)))]
+    )
+    return {row["file_path"] for row in rows}
+
+
+async def publish_blob(storage, staged: str, file_path: str) -> bool:
+    """
+    Move a staged upload to its blob path once its row exists. False when
+    the blob was already stored (the staged copy is dropped).
+    """
+    return await storage.move(staged, file_path, exist_ok=True)
+
+
+async def _set_aside(storage, file_path: str) -> Optional[str]:
+    trash = f"trash/{uuid.uuid4().hex}"
+    try:
+        await storage.move(file_path, trash)
+    except HTTPException as e:
+        if e.status_code != 404:
+            raise
+        return None  # already gone
+    return trash
+
+
+async def release_blobs(storage, file_paths: list[str]) -> list[str]:
+    """
+    Remove the blobs in `file_paths` that no task_files row references,
+    with their thumbnails.
+
+    Returns the paths actually removed.
+    """
+    unreferenced = sorted(set(file_paths) - await referenced_paths(file_paths))
+    if not unreferenced:
+        return []
+    set_aside = await asyncio.gather(*(_set_aside(storage, p) for p in unreferenced), return_exceptions=True)
+    trashed = {path: trash for path, trash in zip(unreferenced, set_aside) if isinstance(trash, str)}
+    try:
+        for error in set_aside:
+            if isinstance(error, BaseException):
+                raise error
+        # An upload may have referenced one of them since the first check
+        for path in await referenced_paths(list(trashed)):
+            await storage.move(trashed.pop(path), path, exist_ok=True)
+        if trashed:
+            await storage.delete_files(list(trashed.values()) + [thumbnail_path(p) for p in trashed])
+    except Exception:
+        # Put back what we set aside, so a retry finds the blobs where it expects
+        for path, trash in trashed.items():
+            try:
+                await storage.move(trash, path, exist_ok=True)
+            except Exception:
+                pass
+        raise
+    return sorted(trashed)
@@ -0,0 +1,241 @@
+# app/services/project_deletion.py
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from app.config import settings
+from app.repositories.base import get_repository
+from app.services.file_service import release_blobs
+from app.services.project_service import ProjectService
+from app.services.task_service import task_cache, task_counts
+from app.storage.base import get_storage
+from app.utils.jobs import get_job_queue
+
+logger = logging.getLogger(__name__)
+
+repository = get_repository()
+deletion_jobs = get_job_queue("project_deletions")
+
+# A project's deletion is tracked in project_deletions (id = project id):
+#
+#   pending -> running -> done
+#                      -> failed (after the job queue's retries)
+#
+# A worker process only runs a deletion it has claimed: a conditional
+# update that takes the row once its lease has expired. The lease is
+# renewed with every batch; a worker that finds it taken over stops. Rows
+# whose lease ran out (a crashed or stopped worker, or a failed run) are
+# claimed again by the sweep every worker runs.
+#
+# Every step is safe to repeat, so a run interrupted anywhere is finished
+# by running the job again.
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_sweeper: Optional[asyncio.Task] = None
+
+
+class LeaseLost(Exception):
+    """Another worker claimed the deletion after our lease expired"""
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _lease() -> str:
+    return (datetime.utcnow() + timedelta(seconds=settings.project_delete_lease_seconds)).isoformat()
+
+
+async def get_deletion(project_id: str, owner_id: str) -> Optional[dict]:
+    rows = await repository.select(
+        "project_deletions", filters=[("id", "eq", project_id), ("owner_id", "eq", owner_id)]
+    )
+    return rows[0] if rows else None
+
+
+async def request_deletion(project_id: str, owner_id: str) -> Optional[dict]:
+    """
+    Delete the project row now and queue the cascade over its tasks, files
+    and blobs. Returns the deletion record (the existing one when the
+    project is already being deleted), or None if the caller has no such
+    project.
+    """
+    projects = await repository.select(
+        "projects", "id", filters=[("id", "eq", project_id), ("owner_id", "eq", owner_id)]
+    )
+    if not projects:
+        return await get_deletion(project_id, owner_id)
+
+    now = _now()
+    # A concurrent or earlier request already recorded it: that run finishes the job
+    rows = await repository.insert("project_deletions", {
+        "id": project_id,
+        "owner_id": owner_id,
+        "status": "pending",
+        "tasks_deleted": 0,
+        "files_deleted": 0,
+        "objects_removed": 0,
+        "pending_paths": "[]",
+        "error": None,
+        # Claimed by this worker from the start
+        "claimed_by": WORKER_ID,
+        "lease_expires_at": _lease(),
+        "created_at": now,
+        "updated_at": now,
+    }, ignore_duplicates=True)
+    if not rows:
+        return await get_deletion(project_id, owner_id)
+    # Recorded first: if we die past this point, the sweep resumes the job
+    try:
+        await ProjectService.delete_project(project_id, owner_id)
+    except Exception:
+        # Nothing is deleted yet, so a retried request starts over
+        await repository.delete("project_deletions", filters=[("id", "eq", project_id)])
+        raise
+    schedule_deletion(project_id)
+    return rows[0]
+
+
+def schedule_deletion(project_id: str):
+    deletion_jobs.submit("delete_project", lambda: run_deletion(project_id))
+
+
+async def _claim(project_id: str) -> Optional[dict]:
+    """
+    Take (or keep) the deletion for this worker: a compare-and-set on the
+    lease, or a renewal if we already hold it. None when another worker
+    holds it or it is done.
+    """
+    now = _now()
+    values = {
+        "status": "running", "error": None, "claimed_by": WORKER_ID, "lease_expires_at": _lease(), "updated_at": now,
+    }
+    unfinished = [("id", "eq", project_id), ("status", "neq", "done")]
+    rows = await repository.update(
+        "project_deletions", values, filters=[*unfinished, ("lease_expires_at", "lt", now)]
+    )
+    if not rows:
+        rows = await repository.update(
+            "project_deletions", values, filters=[*unfinished, ("claimed_by", "eq", WORKER_ID)]
+        )
+    return rows[0] if rows else None
+
+
+async def _release(storage, file_paths: list[str]) -> int:
+    removed = 0
+    chunk = settings.storage_delete_chunk_size
+    for i in range(0, len(file_paths), chunk):
+        removed += len(await release_blobs(storage, file_paths[i:i + chunk]))
+    return removed
+
+
+async def run_deletion(project_id: str):
+    """
+    Delete a project's tasks and task_files rows in batches, releasing the
+    blobs of each batch as its rows go. Progress is saved after every
+    batch; blob paths whose rows are already gone are saved before the
+    rows are deleted, so a rerun still releases them.
+    """
+    state = await _claim(project_id)
+    if state is None:
+        return
+    progress = {k: state[k] or 0 for k in ("tasks_deleted", "files_deleted", "objects_removed")}
+
+    async def save(**changes):
+        # Renews the lease; finding it taken over means someone else runs this now
+        rows = await repository.update(
+            "project_deletions",
+            {"lease_expires_at": _lease(), **changes, "updated_at": _now()},
+            filters=[("id", "eq", project_id), ("claimed_by", "eq", WORKER_ID)],
+        )
+        if not rows:
+            raise LeaseLost(project_id)
+
+    try:
+        storage = await get_storage()
+        # Left by a run that stopped between deleting rows and their blobs
+        pending = json.loads(state["pending_paths"] or "[]")
+        if pending:
+            progress["objects_removed"] += await _release(storage, pending)
+            await save(pending_paths="[]", **progress)
+        # In case the request stopped before deleting the row itself
+        await repository.delete("projects", filters=[("id", "eq", project_id)])
+
+        while True:
+            tasks = await repository.select(
+                "tasks", "id", filters=[("project_id", "eq", project_id)],
+                limit=settings.project_delete_batch_size,
+            )
+            if not tasks:
+                break
+            task_ids = [str(t["id"]) for t in tasks]
+            files = await repository.select(
+                "task_files", "id,file_path", filters=[("task_id", "in", task_ids)]
+            )
+            if files:
+                paths = sorted({f["file_path"] for f in files})
+                await save(pending_paths=json.dumps(paths))
+                await repository.delete("task_files", filters=[("id", "in", [f["id"] for f in files])])
+                progress["files_deleted"] += len(files)
+                progress["objects_removed"] += await _release(storage, paths)
+            deleted = await repository.delete("tasks", filters=[("id", "in", task_ids)])
+            progress["tasks_deleted"] += len(deleted)
+            for task_id in task_ids:
+                task_cache.invalidate(task_id)
+            await save(pending_paths="[]", **progress)
+
+        await repository.delete("task_tombstones", filters=[("project_id", "eq", project_id)])
+        task_counts.invalidate(project_id)
+        await save(status="done")
+        logger.info(
+            f"Deleted project {project_id}: {progress['tasks_deleted']} tasks, "
+            f"{progress['files_deleted']} files, {progress['objects_removed']} objects"
+        )
+    except LeaseLost:
+        logger.warning(f"Deletion of project {project_id} was taken over by another worker")
+    except Exception as e:
+        # Failed, with the lease given up: the queue's next attempt or a sweep picks it up
+        await save(status="failed", error=str(e), lease_expires_at=_now(), **progress)
+        raise
+
+
+async def resume_deletions():
+    """Claim and requeue deletions no worker holds a live lease on"""
+    rows = await repository.select(
+        "project_deletions", "id",
+        filters=[("status", "neq", "done"), ("lease_expires_at", "lt", _now())],
+    )
+    claimed = [row["id"] for row in rows if await _claim(row["id"])]
+    for project_id in claimed:
+        schedule_deletion(project_id)
+    if claimed:
+        logger.info(f"Resuming {len(claimed)} project deletions")
+
+
+async def _sweep():
+    while True:
+        try:
+            await resume_deletions()
+        except Exception as e:
+            logger.warning(f"Resuming project deletions failed: {str(e)}")
+        await asyncio.sleep(settings.project_delete_lease_seconds)
+
+
+def start_deletion_sweeper():
+    """Resume unfinished deletions now and whenever a lease runs out"""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = asyncio.create_task(_sweep(), name="project-deletion-sweeper")
+
+
+async def stop_deletion_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
@@ -1,12 +1,17 @@
-from app.utils.supabase_client import get_service_client
+from fastapi import HTTPException, status
+from app.repositories.base import get_repository
+from app.utils.cache import get_cache
+from typing import Optional
 import uuid
 
-# Initialize Supabase service client
-client = get_service_client()
+# Shared async data access layer
+repository = get_repository()
+# owner_id -> list of project rows, invalidated on any write by that owner
+projects_cache = get_cache("projects_by_owner")
 
 class ProjectService:
     @staticmethod
-    def create_project(project_data: dict):
+    async def create_project(project_data: dict) -> Optional[dict]:
         """
         Create a new project in Supabase.
 
@@ -15,29 +20,56 @@ class ProjectService:
         if "id" not in project_data:
             project_data["id"] = str(uuid.uuid4())
 
-        res = client.table("project").insert(project_data).execute()
-        return res.data
+        rows = await repository.insert("projects", project_data)
+        if project_data.get("owner_id"):
+            projects_cache.invalidate(str(project_data["owner_id"]))
+        return rows[0] if rows else None
 
     @staticmethod
-    def get_projects_by_owner(owner_id: str):
+    async def get_projects_by_owner(owner_id: str) -> list[dict]:
         """
         Retrieve all projects belonging to a specific user.
         """
-        res = client.table("project").select("*").eq("owner_id", owner_id).execute()
-        return res.data
+        cached = projects_cache.get(owner_id)
+        if cached is not None:
+            return cached
+
+        version = projects_cache.version
+        projects = await repository.select("projects", filters=[("owner_id", "eq", owner_id)])
+        projects_cache.set(owner_id, projects, version=version)
+        return projects
+
+    @staticmethod
+    async def require_owner(project_id: str, owner_id: str):
+        """
+        404 unless the project belongs to `owner_id` (checked against the
+        owner's cached project list)
+        """
+        projects = await ProjectService.get_projects_by_owner(owner_id)
+        if str(project_id) not in {str(p["id"]) for p in projects}:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
 
     @staticmethod
-    def update_project(project_id: str, update_data: dict):
+    async def update_project(project_id: str, owner_id: str, update_data: dict) -> Optional[dict]:
         """
-        Update project fields by project ID.
+        Update project fields by project ID, scoped to its owner.
         """
-        res = client.table("project").update(update_data).eq("id", project_id).execute()
-        return res.data
+        rows = await repository.update(
+            "projects", update_data, filters=[("id", "eq", project_id), ("owner_id", "eq", owner_id)]
+        )
+        projects_cache.invalidate(owner_id)
+        return rows[0] if rows else None
 
     @staticmethod
-    def delete_project(project_id: str):
+    async def delete_project(project_id: str, owner_id: str) -> Optional[dict]:
         """
-        Delete a project by project ID.
+        Delete a project by project ID, scoped to its owner.
         """
-        res = client.table("project").delete().eq("id", project_id).execute()
-        return res.data
+        rows = await repository.delete(
+            "projects", filters=[("id", "eq", project_id), ("owner_id", "eq", owner_id)]
+        )
+        projects_cache.invalidate(owner_id)
+        return rows[0] if rows else None
@@ -1,96 +1,86 @@
-from supabase import create_client, Client
-from fastapi import UploadFile, HTTPException, status
-from typing import Optional
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+import httpx
+from supabase import AsyncClient
+from fastapi import HTTPException, status
+from typing import AsyncIterable, Optional
+from app.config import settings
+from app.storage.base import Download, StorageBackend
+from app.utils.concurrency import upstream_limit
+from app.utils.supabase_client import get_service_client, registry
 
-load_dotenv()
+STORAGE_BUCKET = settings.storage_bucket
 
-# Supabase configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "task-flow-files")
 
+def _error_status(res: httpx.Response) -> int:
+    # Storage reports most errors as 400 with the real status in "statusCode"
+    if res.status_code == 400:
+        try:
+            return int(res.json().get("statusCode"))
+        except (ValueError, TypeError, AttributeError):
+            return 400
+    return res.status_code
+
+
+def _is_duplicate(res: httpx.Response) -> bool:
+    return _error_status(res) == 409
 
-class SupabaseStorage:
+
+class SupabaseStorage(StorageBackend):
     """Wrapper for Supabase storage operations"""
     
     def __init__(self):
-        if not SUPABASE_URL or not SUPABASE_KEY:
-            raise ValueError("Supabase credentials not configured")
-        
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        # Shared client from the lifespan-managed registry
+        self.client: AsyncClient = get_service_client()
         self.bucket = STORAGE_BUCKET
     
-    def ensure_bucket_exists(self):
+    async def ensure_bucket_exists(self):
         """Create bucket if it doesn't exist"""
         try:
             # Try to get bucket
-            self.client.storage.get_bucket(self.bucket)
+            await self.client.storage.get_bucket(self.bucket)
         except Exception:
             # Create bucket if it doesn't exist
-            self.client.storage.create_bucket(
+            await self.client.storage.create_bucket(
                 self.bucket,
                 options={"public": False}  # Set to True if files should be publicly accessible
             )
     
-    async def upload_file(
+    async def upload_stream(
         self,
-        file: UploadFile,
-        folder: str = "uploads",
-        filename: Optional[str] = None
-    ) -> dict:
+        file_path: str,
+        chunks: AsyncIterable[bytes],
+        content_type: Optional[str] = None,
+        upsert: bool = False,
+        exist_ok: bool = False
+    ) -> None:
         """
-        Upload file to Supabase storage
-        
-        Args:
-            file: FastAPI UploadFile object
-            folder: Folder path in bucket
-            filename: Custom filename (optional, uses original if not provided)
-        
-        Returns:
-            dict with file info including public URL
+        Upload an object from an async byte stream (sent chunked).
+
+        storage3 only accepts whole bytes or local files, so this posts to
+        the storage REST endpoint directly over the shared connection pool.
+        Exceptions raised by `chunks` (e.g. a size limit) abort the upload
+        and propagate unchanged. With `exist_ok`, an object already stored
+        under `file_path` counts as success (content-addressed blobs).
         """
-        try:
-            # Read file content
-            content = await file.read()
-            
-            # Determine filename
-            upload_filename = filename or file.filename
-            file_path = f"{folder}/{upload_filename}"
-            
-            # Upload to Supabase
-            response = self.client.storage.from_(self.bucket).upload(
-                path=file_path,
-                file=content,
-                file_options={
-                    "content-type": file.content_type,
-                    "upsert": "false"  # Set to "true" to overwrite existing files
-                }
-            )
-            
-            # Get public URL
-            public_url = self.client.storage.from_(self.bucket).get_public_url(file_path)
-            
-            return {
-                "filename": upload_filename,
-                "path": file_path,
-                "url": public_url,
-                "size": len(content),
-                "content_type": file.content_type
-            }
-            
-        except Exception as e:
+        url = f"{self.client.storage_url}object/{self.bucket}/{file_path}"
+        headers = {
+            **self.client.options.headers,
+            "Content-Type": content_type or "application/octet-stream",
+            "x-upsert": "true" if upsert else "false",
+        }
+        async with upstream_limit("storage"):
+            res = await registry.http.post(url, content=chunks, headers=headers)
+        if exist_ok and _is_duplicate(res):
+            return
+        if res.is_error:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error uploading to Supabase: {str(e)}"
+                detail=f"Storage upload failed: {res.text}"
             )
-    
-    def download_file(self, file_path: str) -> bytes:
+
+    async def download_file(self, file_path: str) -> bytes:
         """Download file from Supabase storage"""
         try:
-            response = self.client.storage.from_(self.bucket).download(file_path)
+            response = await self.client.storage.from_(self.bucket).download(file_path)
             return response
         except Exception as e:
             raise HTTPException(
@@ -98,10 +88,78 @@ class SupabaseStorage:
                 detail=f"File not found: {str(e)}"
             )
     
-    def delete_file(self, file_path: str) -> dict:
+    async def open_download(self, file_path: str, range_header: Optional[str] = None) -> Download:
+        """
+        Start a streamed download, forwarding an HTTP Range header if given.
+
+        The upstream body is passed through as-is (matching its
+        Content-Length) and the upstream response is closed with the
+        download. 404 when missing.
+        """
+        url = f"{self.client.storage_url}object/authenticated/{self.bucket}/{file_path}"
+        headers = dict(self.client.options.headers)
+        if range_header:
+            headers["Range"] = range_header
+        # Only the request/headers round-trip holds a storage slot; the body
+        # streams to the client afterwards
+        async with upstream_limit("storage"):
+            res = await registry.http.send(registry.http.build_request("GET", url, headers=headers), stream=True)
+        if res.status_code == 416 or res.is_success:
+            headers = {
+                name: res.headers[name]
+                for name in ("Content-Length", "Content-Range", "Content-Encoding", "Content-Type")
+                if name in res.headers
+            }
+            headers.setdefault("Content-Type", "application/octet-stream")
+            return Download(res.status_code, headers, body=res.aiter_raw(), close=res.aclose)
+        await res.aclose()
+        if res.status_code >= 500:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Storage download failed with status {res.status_code}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File not found: {file_path}"
+        )
+
+    async def move(self, source: str, destination: str, exist_ok: bool = False) -> bool:
+        """Server-side rename; Storage refuses to overwrite the destination"""
+        url = f"{self.client.storage_url}object/move"
+        body = {"bucketId": self.bucket, "sourceKey": source, "destinationKey": destination}
+        async with upstream_limit("storage"):
+            res = await registry.http.post(url, json=body, headers=dict(self.client.options.headers))
+        if exist_ok and _is_duplicate(res):
+            await self.delete_files([source])
+            return False
+        if _error_status(res) == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {source}"
+            )
+        if res.is_error:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Storage move failed: {res.text}"
+            )
+        return True
+
+    async def exists(self, file_path: str) -> bool:
+        """HEAD on the object: its headers only, no body"""
+        url = f"{self.client.storage_url}object/authenticated/{self.bucket}/{file_path}"
+        async with upstream_limit("storage"):
+            res = await registry.http.head(url, headers=dict(self.client.options.headers))
+        if res.status_code >= 500:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Storage lookup failed with status {res.status_code}"
+            )
+        return res.is_success
+
+    async def delete_file(self, file_path: str) -> dict:
         """Delete file from Supabase storage"""
         try:
-            response = self.client.storage.from_(self.bucket).remove([file_path])
+            response = await self.client.storage.from_(self.bucket).remove([file_path])
             return {"message": "File deleted successfully", "path": file_path}
         except Exception as e:
             raise HTTPException(
@@ -109,10 +167,22 @@ class SupabaseStorage:
                 detail=f"Error deleting file: {str(e)}"
             )
     
-    def list_files(self, folder: str = "") -> list:
+    async def delete_files(self, file_paths: list[str]) -> dict:
+        """Delete several files from Supabase storage in one call"""
+        try:
+            async with upstream_limit("storage"):
+                await self.client.storage.from_(self.bucket).remove(file_paths)
+            return {"message": "Files deleted successfully", "paths": file_paths}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error deleting files: {str(e)}"
+            )
+    
+    async def list_files(self, folder: str = "") -> list:
         """List files in a folder"""
         try:
-            response = self.client.storage.from_(self.bucket).list(folder)
+            response = await self.client.storage.from_(self.bucket).list(folder)
             return response
         except Exception as e:
             raise HTTPException(
@@ -120,18 +190,7 @@ class SupabaseStorage:
                 detail=f"Error listing files: {str(e)}"
             )
     
-    def get_public_url(self, file_path: str) -> str:
+    async def get_public_url(self, file_path: str) -> str:
         """Get public URL for a file"""
-        return self.client.storage.from_(self.bucket).get_public_url(file_path)
-
-
-# Singleton instance
-_storage_instance = None
+        return await self.client.storage.from_(self.bucket).get_public_url(file_path)
 
-def get_storage() -> SupabaseStorage:
-    """Get or create Supabase storage instance"""
-    global _storage_instance
-    if _storage_instance is None:
-        _storage_instance = SupabaseStorage()
-        _storage_instance.ensure_bucket_exists()
-    return _storage_instance
\ No newline at end of file
@@ -1,69 +1,499 @@
 # app/services/task_service.py
-from app.utils.supabase_client import get_service_client
-from app.models.task import TaskCreate, TaskResponse, TaskUpdate
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+from fastapi import HTTPException, status
+from app.config import settings
+from app.repositories.base import get_repository
+from app.models.task import (
+    DashboardStats, TaskBulkResult, TaskBulkUpdate, TaskChanges, TaskCounts, TaskCreate, TaskResponse,
+    TaskSearchHit, TaskUpdate,
+)
+from app.services.project_service import ProjectService
+from app.utils.broadcast import get_broadcaster
+from app.utils.cache import get_cache
+from app.utils.pagination import decode_cursor, encode_cursor, parse_sort
+from pydantic import TypeAdapter
 from uuid import UUID, uuid4
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Shared async data access layer
+repository = get_repository()
+# task_id -> TaskResponse, invalidated on update/delete
+task_cache = get_cache("tasks")
+# project_id -> subscribers of /tasks/project/{project_id}/events
+task_feed = get_broadcaster("tasks")
+# project_id -> Counter of (status, priority, assigned_to) -> tasks. Filled
+# by one GROUP BY and adjusted in place by this worker's writes
+task_counts = get_cache("task_counts")
+COUNT_FIELDS = ("status", "priority", "assigned_to")
+
+# Columns a task listing can be sorted on; `id` breaks ties so keyset
+# cursors are stable.
+TASK_SORT_FIELDS = {"updated_at", "created_at", "title", "status", "priority"}
+# Validates a whole page in one pydantic-core call
+task_list_adapter = TypeAdapter(List[TaskResponse])
+TASK_COLUMNS = ",".join(TaskResponse.model_fields)
+task_search_adapter = TypeAdapter(List[TaskSearchHit])
+# Words of a search query; each must prefix-match a word of the title or description
+SEARCH_WORD = re.compile(r"\w+")
+MAX_SEARCH_TERMS = 8
+
+def _task_row(payload: TaskCreate, created_by, now: datetime) -> dict:
+    return {
+        "id": str(uuid4()),  # generate a new v4 UUID for task
+        "project_id": str(payload.project_id),
+        "title": payload.title,
+        "description": payload.description,
+        "status": payload.status,
+        "priority": payload.priority,
+        "assigned_to": str(payload.assigned_to) if getattr(payload, "assigned_to", None) else None,
+        "created_by": str(created_by),
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat()
+    }
+
+
+def _count_key(task: TaskResponse | dict) -> tuple:
+    values = (task[f] if isinstance(task, dict) else getattr(task, f) for f in COUNT_FIELDS)
+    return tuple(None if v is None else str(v) for v in values)
+
+
+def _counted(project_id, key: tuple, delta: int):
+    def apply(counts: Counter):
+        counts[key] += delta
+        if counts[key] <= 0:
+            del counts[key]
+    task_counts.update(str(project_id), apply)
+
+
+def _published(event: str, task: TaskResponse) -> TaskResponse:
+    task_feed.publish(str(task.project_id), event, {"type": event, "task": task.model_dump(mode="json")})
+    if event == "task.created":
+        _counted(task.project_id, _count_key(task), 1)
+    return task
+
+
+def _summary(counters: Iterable[Counter]) -> TaskCounts:
+    total = 0
+    by_field = [Counter() for _ in COUNT_FIELDS]
+    for counts in counters:
+        for key, n in counts.items():
+            total += n
+            for breakdown, value in zip(by_field, key):
+                breakdown[value if value is not None else "unassigned"] += n
+    by_status, by_priority, by_assignee = by_field
+    return TaskCounts(
+        total=total, by_status=by_status, by_priority=by_priority, by_assignee=by_assignee
+    )
+
+
+_last_tombstone_prune = 0.0
+
+
+async def _delete_tasks(filters: list) -> List[dict]:
+    """
+    Delete the matching task rows, recording their tombstones first so
+    delta sync never misses a deletion: if the tombstones can't be written,
+    nothing is deleted and the error propagates.
+    """
+    global _last_tombstone_prune
+    rows = await repository.select("tasks", ",".join(["id", "project_id", *COUNT_FIELDS]), filters=filters)
+    if not rows:
+        return []
+    ids = [str(row["id"]) for row in rows]
+    now = datetime.utcnow()
+    # A concurrent delete of the same task may have written its tombstone already
+    written = await repository.insert("task_tombstones", [
+        {"id": str(row["id"]), "project_id": str(row["project_id"]), "deleted_at": now.isoformat()}
+        for row in rows
+    ], ignore_duplicates=True)
+    try:
+        deleted = await repository.delete("tasks", filters=[("id", "in", ids)])
+    except Exception:
+        # Don't report tasks that are still there as deleted; tombstones
+        # another call wrote are its to keep or remove
+        if written:
+            await repository.delete("task_tombstones", filters=[("id", "in", [str(row["id"]) for row in written])])
+        raise
+
+    for row in deleted:
+        task_feed.publish(
+            str(row["project_id"]), "task.deleted", {"type": "task.deleted", "id": str(row["id"])}
+        )
+        _counted(row["project_id"], _count_key(row), -1)
+    # Cursors older than the retention get 410, so older tombstones are dead weight
+    if time.monotonic() - _last_tombstone_prune > 3600:
+        _last_tombstone_prune = time.monotonic()
+        cutoff = now - timedelta(days=settings.task_tombstone_retention_days)
+        try:
+            await repository.delete("task_tombstones", filters=[("deleted_at", "lt", cutoff.isoformat())])
+        except Exception as e:
+            logger.warning(f"Pruning task tombstones failed: {str(e)}")
+    return deleted
+
+
+def _utc(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _settled(rows: List[dict], limit: int, column: str, horizon: datetime, position: Optional[dict]) -> Optional[dict]:
+    """
+    Keyset position after the last row stamped at or before `horizon`. Rows
+    newer than that are returned now and again on the next call, since a
+    write stamped earlier may still be committing behind them. A full page
+    always advances, so paging can't stall on a burst of recent writes.
+
+    A page that isn't full holds every row up to `horizon`, so the position
+    moves on to `horizon` itself: an idle project's cursor keeps up with
+    the clock instead of aging past the tombstone retention.
+    """
+    if len(rows) > limit:
+        return {column: rows[limit - 1][column], "id": rows[limit - 1]["id"]}
+    for row in rows:
+        if _utc(row[column]) > horizon:
+            break
+        position = {column: row[column], "id": row["id"]}
+    if position is None or _utc(position[column]) < horizon:
+        position = {column: horizon.isoformat(), "id": ""}
+    return position
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
-# Initialize Supabase service client
-client = get_service_client()
 
 class TaskService:
     @staticmethod
-    def create_task(payload: TaskCreate, created_by: Optional[UUID] = None) -> TaskResponse:
-        now = datetime.utcnow()
-        task_id = str(uuid4())  # generate a new v4 UUID for task
-
+    async def create_task(payload: TaskCreate, created_by: Optional[UUID] = None) -> TaskResponse:
         # If created_by not provided, fetch project owner
         if created_by is None:
-            project_res = client.table("projects").select("owner_id").eq("id", str(payload.project_id)).execute()
-            if not project_res.data or len(project_res.data) == 0:
+            projects = await repository.select(
+                "projects", "owner_id", filters=[("id", "eq", str(payload.project_id))]
+            )
+            if not projects:
                 raise Exception("Project not found")
-            created_by = project_res.data[0]["owner_id"]
-
-        task_data = {
-            "id": task_id,
-            "project_id": str(payload.project_id),
-            "title": payload.title,
-            "description": payload.description,
-            "status": payload.status,
-            "priority": payload.priority,
-            "assigned_to": str(payload.assigned_to) if getattr(payload, "assigned_to", None) else None,
-            "created_by": str(created_by),
-            "created_at": now.isoformat(),
-            "updated_at": now.isoformat()
-        }
+            created_by = projects[0]["owner_id"]
 
-        res = client.table("tasks").insert(task_data).execute()
-        if res.data:
-            return TaskResponse(**res.data[0])
+        rows = await repository.insert("tasks", _task_row(payload, created_by, datetime.utcnow()))
+        if rows:
+            return _published("task.created", TaskResponse(**rows[0]))
         raise Exception("Failed to create task")
 
     @staticmethod
-    def get_task(task_id: UUID) -> Optional[TaskResponse]:
-        res = client.table("tasks").select("*").eq("id", str(task_id)).execute()
-        if res.data:
-            return TaskResponse(**res.data[0])
+    async def create_tasks(payloads: List[TaskCreate], created_by: Optional[UUID] = None) -> List[TaskBulkResult]:
+        """
+        Create many tasks in a few round trips: one lookup resolves the owner
+        of every distinct project, then rows are inserted in chunks of
+        `task_bulk_chunk_size`.
+        """
+        results = [TaskBulkResult(index=i, status="failed") for i in range(len(payloads))]
+
+        owners = {}
+        if created_by is None:
+            project_ids = sorted({str(p.project_id) for p in payloads})
+            projects = await repository.select("projects", "id,owner_id", filters=[("id", "in", project_ids)])
+            owners = {p["id"]: p["owner_id"] for p in projects}
+
+        now = datetime.utcnow()
+        pending = []
+        for i, payload in enumerate(payloads):
+            owner = created_by or owners.get(str(payload.project_id))
+            if owner is None:
+                results[i].error = "Project not found"
+                continue
+            pending.append((i, _task_row(payload, owner, now)))
+
+        for chunk in _chunks(pending, settings.task_bulk_chunk_size):
+            try:
+                rows = await repository.insert("tasks", [row for _, row in chunk])
+                inserted = {row["id"]: row for row in rows}
+            except Exception as e:
+                inserted, error = {}, f"Failed to create task: {str(e)}"
+            else:
+                error = "Failed to create task"
+            for i, row in chunk:
+                results[i].id = UUID(row["id"])
+                if row["id"] in inserted:
+                    results[i].status = "created"
+                    results[i].task = _published("task.created", TaskResponse(**inserted[row["id"]]))
+                else:
+                    results[i].error = error
+        return results
+
+    @staticmethod
+    async def get_task(task_id: UUID) -> Optional[TaskResponse]:
+        key = str(task_id)
+        cached = task_cache.get(key)
+        if cached is not None:
+            return cached
+
+        version = task_cache.version
+        rows = await repository.select("tasks", filters=[("id", "eq", key)])
+        if rows:
+            task = TaskResponse(**rows[0])
+            task_cache.set(key, task, version=version)
+            return task
         return None
 
     @staticmethod
-    def list_tasks(project_id: UUID) -> List[TaskResponse]:
-        res = client.table("tasks").select("*").eq("project_id", str(project_id)).execute()
-        return [TaskResponse(**task) for task in res.data]
+    async def list_tasks(
+        project_id: UUID,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assigned_to: Optional[UUID] = None,
+        sort: str = "-updated_at",
+        limit: int = settings.task_page_size_default,
+        cursor: Optional[str] = None,
+        raw: bool = False,
+    ) -> tuple[List[TaskResponse] | List[dict], Optional[str]]:
+        """
+        One page of a project's tasks, filtered and sorted in the query.
+
+        Keyset pagination on (sort column, id): pass the returned cursor back
+        to get the next page. The cursor is None on the last page.
+
+        With `raw`, returns the database rows (TaskResponse columns only)
+        without validating them.
+        """
+        column, desc = parse_sort(sort, TASK_SORT_FIELDS)
+        order = [(column, desc), ("id", desc)]
+        filters = [("project_id", "eq", str(project_id))]
+        for name, value in (("status", status), ("priority", priority), ("assigned_to", assigned_to)):
+            if value is not None:
+                filters.append((name, "eq", str(value)))
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        # One extra row tells us whether another page exists
+        rows = await repository.select(
+            "tasks", TASK_COLUMNS, filters=filters, order=order, limit=limit + 1, after=after
+        )
+        next_cursor = encode_cursor(sort, rows[limit - 1], [column, "id"]) if len(rows) > limit else None
+        if raw:
+            return rows[:limit], next_cursor
+        return task_list_adapter.validate_python(rows[:limit]), next_cursor
+
+    @staticmethod
+    async def count_tasks(project_ids: List[str]) -> dict[str, Counter]:
+        """
+        Per-project task counts by (status, priority, assigned_to), from the
+        cache or one GROUP BY over the projects not cached
+        """
+        counts, missing = {}, []
+        for project_id in project_ids:
+            cached = task_counts.get(project_id)
+            if cached is None:
+                missing.append(project_id)
+            else:
+                counts[project_id] = cached
+        if missing:
+            version = task_counts.version
+            rows = await repository.count(
+                "tasks", ("project_id", *COUNT_FIELDS), filters=[("project_id", "in", missing)]
+            )
+            fetched = {project_id: Counter() for project_id in missing}
+            for row in rows:
+                fetched[str(row["project_id"])][_count_key(row)] += row["count"]
+            for project_id, project_counts in fetched.items():
+                task_counts.set(project_id, project_counts, version=version)
+            counts.update(fetched)
+        return counts
+
+    @staticmethod
+    async def dashboard(owner_id: str) -> DashboardStats:
+        """Task counts by status, priority and assignee for each of the owner's projects, and overall"""
+        projects = await ProjectService.get_projects_by_owner(owner_id)
+        counts = await TaskService.count_tasks([str(p["id"]) for p in projects])
+        return DashboardStats(
+            totals=_summary(counts.values()),
+            projects={project_id: _summary([c]) for project_id, c in counts.items()},
+        )
+
+    @staticmethod
+    async def project_counts(project_id: UUID, owner_id: str) -> TaskCounts:
+        await ProjectService.require_owner(str(project_id), owner_id)
+        counts = await TaskService.count_tasks([str(project_id)])
+        return _summary(counts.values())
 
     @staticmethod
-    def update_task(task_id: UUID, payload: TaskUpdate) -> Optional[TaskResponse]:
+    async def search_tasks(
+        owner_id: str,
+        q: str,
+        limit: int = settings.task_page_size_default,
+        cursor: Optional[str] = None,
+    ) -> tuple[List[TaskSearchHit], Optional[str]]:
+        """
+        Tasks in any of the owner's projects whose title or description
+        contain every word of `q` (as a prefix), best matches first.
+
+        Served by the repository's full-text index. The cursor holds the
+        offset of the next page and is only valid for the same `q`.
+        """
+        terms = [word.lower() for word in SEARCH_WORD.findall(q)][:MAX_SEARCH_TERMS]
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query needs at least one word"
+            )
+        offset = decode_cursor(cursor, q)["offset"] if cursor else 0
+
+        projects = await ProjectService.get_projects_by_owner(owner_id)
+        if not projects:
+            return [], None
+        rows = await repository.search(
+            "tasks", terms, TASK_COLUMNS,
+            filters=[("project_id", "in", [str(p["id"]) for p in projects])],
+            limit=limit + 1, offset=offset,
+        )
+        next_cursor = encode_cursor(q, {"offset": offset + limit}, ["offset"]) if len(rows) > limit else None
+        return task_search_adapter.validate_python(rows[:limit]), next_cursor
+
+    @staticmethod
+    async def list_changes(project_id: UUID, since: Optional[str] = None, limit: int = settings.task_page_size_max) -> TaskChanges:
+        """
+        Tasks created or updated, and ids of tasks deleted, after the `since`
+        cursor, oldest first. Without `since`, every task and no deletions:
+        the client's initial copy.
+
+        Both lists are keyset-paged on (updated_at / deleted_at, id); when
+        `has_more` is set, call again with the returned cursor. A change may
+        be returned twice around the cursor, so apply them as upserts.
+        """
+        now = datetime.utcnow()
+        horizon = now - timedelta(seconds=settings.task_sync_settle_seconds)
+        if since:
+            position = decode_cursor(since, "changes")
+            tasks_after, deleted_after = position["tasks"], position["deleted"]
+            retention = now - timedelta(days=settings.task_tombstone_retention_days)
+            if _utc(deleted_after["deleted_at"]) < retention:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Cursor is older than the tombstone retention; reload the full list"
+                )
+        else:
+            tasks_after, deleted_after = None, {"deleted_at": horizon.isoformat(), "id": ""}
+
+        project = [("project_id", "eq", str(project_id))]
+        changed, deleted = await asyncio.gather(
+            repository.select(
+                "tasks", TASK_COLUMNS, filters=project,
+                order=[("updated_at", False), ("id", False)], limit=limit + 1, after=tasks_after,
+            ),
+            repository.select(
+                "task_tombstones", "id,deleted_at", filters=project,
+                order=[("deleted_at", False), ("id", False)], limit=limit + 1, after=deleted_after,
+            ),
+        )
+        cursor = {
+            "tasks": _settled(changed, limit, "updated_at", horizon, tasks_after),
+            "deleted": _settled(deleted, limit, "deleted_at", horizon, deleted_after),
+        }
+        return TaskChanges(
+            changes=task_list_adapter.validate_python(changed[:limit]),
+            deleted=[row["id"] for row in deleted[:limit]],
+            cursor=encode_cursor("changes", cursor, ["tasks", "deleted"]),
+            has_more=len(changed) > limit or len(deleted) > limit,
+        )
+
+    @staticmethod
+    async def update_task(task_id: UUID, payload: TaskUpdate) -> Optional[TaskResponse]:
         update_data = payload.dict(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow().isoformat()
         if "assigned_to" in update_data and update_data["assigned_to"]:
             update_data["assigned_to"] = str(update_data["assigned_to"])
 
-        res = client.table("tasks").update(update_data).eq("id", str(task_id)).execute()
-        if res.data:
-            return TaskResponse(**res.data[0])
+        # The cached copy tells the dashboard counts what the update moves from
+        previous = task_cache.get(str(task_id))
+        rows = await repository.update("tasks", update_data, filters=[("id", "eq", str(task_id))])
+        task_cache.invalidate(str(task_id))
+        if rows:
+            task = TaskResponse(**rows[0])
+            task_cache.set(str(task_id), task)
+            if any(f in update_data for f in COUNT_FIELDS):
+                if previous is None:
+                    task_counts.invalidate(str(task.project_id))
+                elif _count_key(previous) != _count_key(task):
+                    _counted(task.project_id, _count_key(previous), -1)
+                    _counted(task.project_id, _count_key(task), 1)
+            return _published("task.updated", task)
         return None
 
     @staticmethod
-    def delete_task(task_id: UUID) -> bool:
-        res = client.table("tasks").delete().eq("id", str(task_id)).execute()
-        return len(res.data) > 0
+    async def update_tasks(updates: List[TaskBulkUpdate]) -> List[TaskBulkResult]:
+        """
+        Apply many updates. Entries with identical changes (e.g. moving a
+        sprint to "done") share one `id=in.(...)` update, so round trips
+        scale with the number of distinct changes, not tasks.
+        """
+        results = [TaskBulkResult(index=i, id=u.id, status="not_found") for i, u in enumerate(updates)]
+        now = datetime.utcnow().isoformat()
+
+        groups: dict[tuple, list[int]] = {}
+        for i, update in enumerate(updates):
+            changes = update.dict(exclude_unset=True, exclude={"id"})
+            groups.setdefault(tuple(sorted(changes.items())), []).append(i)
+
+        async def apply(changes: tuple, indexes: list[int]):
+            ids = sorted({str(updates[i].id) for i in indexes})
+            try:
+                rows = await repository.update(
+                    "tasks", {**dict(changes), "updated_at": now}, filters=[("id", "in", ids)]
+                )
+            except Exception as e:
+                for i in indexes:
+                    results[i].status, results[i].error = "failed", f"Failed to update task: {str(e)}"
+                return
+            updated = {row["id"]: _published("task.updated", TaskResponse(**row)) for row in rows}
+            for i in indexes:
+                task = updated.get(str(updates[i].id))
+                if task:
+                    results[i].status, results[i].task = "updated", task
+
+        await asyncio.gather(*(apply(changes, indexes) for changes, indexes in groups.items()))
+        for update in updates:
+            task_cache.invalidate(str(update.id))
+        # Previous values aren't known here; recount the projects touched
+        recount = {
+            str(results[i].task.project_id)
+            for changes, indexes in groups.items() if any(f in dict(changes) for f in COUNT_FIELDS)
+            for i in indexes if results[i].task is not None
+        }
+        for project_id in recount:
+            task_counts.invalidate(project_id)
+        return results
+
+    @staticmethod
+    async def delete_tasks(task_ids: List[UUID]) -> List[TaskBulkResult]:
+        """Delete many tasks with `id=in.(...)` deletes, chunked"""
+        results = [TaskBulkResult(index=i, id=t, status="not_found") for i, t in enumerate(task_ids)]
+        deleted: set[str] = set()
+        ids = sorted({str(t) for t in task_ids})
+        for chunk in _chunks(ids, settings.task_bulk_chunk_size):
+            try:
+                rows = await _delete_tasks([("id", "in", chunk)])
+            except Exception as e:
+                for result in results:
+                    if str(result.id) in chunk:
+                        result.status, result.error = "failed", f"Failed to delete task: {str(e)}"
+                continue
+            deleted.update(str(row["id"]) for row in rows)
+        for result in results:
+            task_cache.invalidate(str(result.id))
+            if str(result.id) in deleted:
+                result.status = "deleted"
+        return results
+
+    @staticmethod
+    async def delete_task(task_id: UUID) -> bool:
+        rows = await _delete_tasks([("id", "eq", str(task_id))])
+        task_cache.invalidate(str(task_id))
+        return len(rows) > 0
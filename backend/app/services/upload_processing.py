@@ -0,0 +1,123 @@
+# app/services/upload_processing.py
+import io
+import logging
+import re
+import zipfile
+from datetime import datetime
+from typing import Optional
+from PIL import Image, ImageOps
+from pypdf import PdfReader
+from app.config import settings
+from app.repositories.base import get_repository
+from app.services.file_service import thumbnail_path
+from app.storage.base import get_storage
+from app.utils.jobs import get_job_queue
+
+logger = logging.getLogger(__name__)
+
+repository = get_repository()
+upload_jobs = get_job_queue("uploads")
+
+IMAGE_TYPES = {".jpg", ".jpeg", ".png", ".gif"}
+DOCUMENT_TYPES = {".pdf", ".docx", ".xlsx"}
+METADATA_COLUMNS = ("width", "height", "page_count", "thumbnail_path")
+
+
+def _image(data: bytes) -> tuple[dict, tuple[bytes, str]]:
+    with Image.open(io.BytesIO(data)) as original:
+        # GIFs use their first frame; JPEGs are turned upright first
+        image = ImageOps.exif_transpose(original)
+        metadata = {"width": image.width, "height": image.height}
+        image.thumbnail((settings.thumbnail_size, settings.thumbnail_size))
+        out = io.BytesIO()
+        if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+            image.convert("RGBA").save(out, "PNG", optimize=True)
+            return metadata, (out.getvalue(), "image/png")
+        image.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+        return metadata, (out.getvalue(), "image/jpeg")
+
+
+def _zip_member(data: bytes, name: str) -> Optional[str]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        try:
+            return archive.read(name).decode("utf-8", "replace")
+        except KeyError:
+            return None
+
+
+def _docx_pages(data: bytes) -> Optional[int]:
+    # Word stores the page count of its last layout; nothing to render here
+    match = re.search(r"<Pages>(\d+)</Pages>", _zip_member(data, "docProps/app.xml") or "")
+    return int(match.group(1)) if match else None
+
+
+def _xlsx_sheets(data: bytes) -> Optional[int]:
+    workbook = _zip_member(data, "xl/workbook.xml")
+    return len(re.findall(r"<sheet\b", workbook)) if workbook else None
+
+
+def extract(data: bytes, file_type: str) -> tuple[dict, Optional[tuple[bytes, str]]]:
+    """
+    Metadata columns (and for images a thumbnail: bytes, content type) of
+    one upload. CPU-bound; runs on the job queue's thread pool.
+    """
+    if file_type in IMAGE_TYPES:
+        return _image(data)
+    if file_type == ".pdf":
+        return {"page_count": len(PdfReader(io.BytesIO(data)).pages)}, None
+    if file_type == ".docx":
+        return {"page_count": _docx_pages(data)}, None
+    if file_type == ".xlsx":
+        # A workbook's "pages" are its sheets
+        return {"page_count": _xlsx_sheets(data)}, None
+    return {}, None
+
+
+async def _single(body: bytes):
+    yield body
+
+
+async def process_upload(file_path: str, file_type: str):
+    """
+    Fill the metadata columns of every task_files row using the blob at
+    `file_path`. A blob is processed once; rows added later for the same
+    content copy the result. The columns come from
+    migrations/002_task_files_metadata.sql on Supabase.
+    """
+    rows = await repository.select(
+        "task_files", ",".join(["id", "processed_at", *METADATA_COLUMNS]), filters=[("file_path", "eq", file_path)]
+    )
+    pending = [row["id"] for row in rows if not row.get("processed_at")]
+    if not pending:
+        return
+    done = next((row for row in rows if row.get("processed_at")), None)
+    if done is not None:
+        metadata = {column: done[column] for column in METADATA_COLUMNS}
+    else:
+        storage = await get_storage()
+        data = await storage.download_file(file_path)
+        try:
+            metadata, thumbnail = await upload_jobs.run_blocking(extract, data, file_type)
+        except Exception as e:
+            # Unreadable content won't get better on a retry; record it as processed
+            logger.warning(f"Could not read {file_type} upload {file_path}: {str(e)}")
+            metadata, thumbnail = {}, None
+        if thumbnail is not None:
+            body, content_type = thumbnail
+            await storage.upload_stream(
+                thumbnail_path(file_path), _single(body), content_type=content_type, exist_ok=True
+            )
+            metadata["thumbnail_path"] = thumbnail_path(file_path)
+    metadata["processed_at"] = datetime.utcnow().isoformat()
+    await repository.update("task_files", metadata, filters=[("id", "in", pending)])
+
+
+def schedule_processing(file_path: str, file_type: str):
+    """
+    Queue post-upload processing for an image or document; returns at once
+    so the upload response isn't delayed
+    """
+    file_type = file_type.lower()
+    if settings.upload_processing_enabled and file_type in IMAGE_TYPES | DOCUMENT_TYPES:
+        job = "thumbnail" if file_type in IMAGE_TYPES else "metadata"
+        upload_jobs.submit(job, lambda: process_upload(file_path, file_type))
@@ -0,0 +1,155 @@
+# app/storage/base.py
+from abc import ABC, abstractmethod
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Optional
+from fastapi import HTTPException, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.config import settings
+from app.utils.uploads import UploadStream
+
+
+class Download:
+    """
+    An object opened for reading: status (200, 206 or 416), the entity
+    headers to send (Content-Length, Content-Range, Content-Type, ...) and
+    the body. Backends that can do better than streaming chunks through
+    Python override `response()`.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: dict[str, str],
+        body: Optional[AsyncIterator[bytes]] = None,
+        close: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self._close = close
+
+    async def aclose(self):
+        if self._close is not None:
+            await self._close()
+
+    def response(self, headers: dict[str, str]) -> Response:
+        """The HTTP response for this download; it closes the download when done"""
+        return StreamingResponse(
+            self.body,
+            status_code=self.status_code,
+            headers={**headers, **self.headers},
+            background=BackgroundTask(self.aclose),
+        )
+
+
+class StorageBackend(ABC):
+    """
+    Where uploaded files live. Paths are relative to the backend's bucket
+    or root directory; stored objects are never modified in place.
+    """
+
+    async def ensure_bucket_exists(self):
+        """Prepare the bucket/directory; called once before first use"""
+
+    @abstractmethod
+    async def upload_stream(
+        self,
+        file_path: str,
+        chunks: AsyncIterable[bytes],
+        content_type: Optional[str] = None,
+        upsert: bool = False,
+        exist_ok: bool = False
+    ) -> None:
+        """
+        Store an object from an async byte stream. Exceptions raised by
+        `chunks` abort the upload and propagate unchanged. With `exist_ok`,
+        an object already stored under `file_path` counts as success.
+        """
+
+    @abstractmethod
+    async def open_download(self, file_path: str, range_header: Optional[str] = None) -> Download:
+        """Open an object for streaming, honoring an HTTP Range header. 404 when missing."""
+
+    @abstractmethod
+    async def move(self, source: str, destination: str, exist_ok: bool = False) -> bool:
+        """
+        Rename an object; 404 when `source` is missing. True when moved. With
+        `exist_ok`, an object already at `destination` is kept instead: the
+        source is deleted and False returned.
+        """
+
+    @abstractmethod
+    async def exists(self, file_path: str) -> bool:
+        """Whether an object is stored under `file_path` (metadata only, no body)"""
+
+    @abstractmethod
+    async def delete_files(self, file_paths: list[str]) -> dict:
+        """Delete several objects; missing ones are ignored"""
+
+    @abstractmethod
+    async def list_files(self, folder: str = "") -> list:
+        """Objects directly under `folder`"""
+
+    @abstractmethod
+    async def get_public_url(self, file_path: str) -> str:
+        """URL clients can fetch the object from"""
+
+    async def upload_file(
+        self,
+        file: UploadFile,
+        folder: str = "uploads",
+        filename: Optional[str] = None
+    ) -> dict:
+        """
+        Upload an UploadFile under `folder`
+
+        Returns:
+            dict with file info including public URL
+        """
+        try:
+            upload_filename = filename or file.filename
+            file_path = f"{folder}/{upload_filename}"
+
+            # Stream without reading the whole file
+            stream = UploadStream(file)
+            await self.upload_stream(file_path, stream, content_type=file.content_type)
+
+            return {
+                "filename": upload_filename,
+                "path": file_path,
+                "url": await self.get_public_url(file_path),
+                "size": stream.size,
+                "content_type": file.content_type
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error uploading file: {str(e)}"
+            )
+
+    async def delete_file(self, file_path: str) -> dict:
+        await self.delete_files([file_path])
+        return {"message": "File deleted successfully", "path": file_path}
+
+
+# Singleton instance
+_storage_instance: Optional[StorageBackend] = None
+
+async def get_storage() -> StorageBackend:
+    """Get or create the configured storage backend (`settings.storage_backend`)"""
+    global _storage_instance
+    if _storage_instance is None:
+        if settings.storage_backend == "local":
+            from app.storage.local import LocalStorage
+            storage = LocalStorage(settings.local_storage_root)
+        elif settings.storage_backend == "supabase":
+            from app.services.supabase_service import SupabaseStorage
+            storage = SupabaseStorage()
+        else:
+            raise RuntimeError(f"Unknown storage backend: {settings.storage_backend}")
+        await storage.ensure_bucket_exists()
+        _storage_instance = storage
+    return _storage_instance
@@ -0,0 +1,282 @@
+# app/storage/local.py
+import asyncio
+import functools
+import mimetypes
+import mmap
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, Optional
+from fastapi import HTTPException, Response, status
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+from app.storage.base import Download, StorageBackend
+from app.utils.metrics import track_upstream
+
+MMAP_CHUNK_SIZE = 1024 * 1024
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+# Content types live beside the data, out of listings
+_META_DIR = ".meta"
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) inclusive of a single-range `bytes=` header, or None to
+    send the whole file (no header, or one we don't handle, which RFC 9110
+    lets a server ignore). Raises ValueError when it can't be satisfied.
+    """
+    match = _RANGE.match(range_header.strip()) if range_header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":  # suffix: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range outside the file")
+    return start, end
+
+
+class ZeroCopyFileResponse(Response):
+    """
+    Sends `length` bytes of a file from `offset` without reading it through
+    Python when the ASGI server allows it:
+
+    - `http.response.zerocopysend`: the server sendfile()s the descriptor
+    - `http.response.pathsend`: the server sends the path (whole file only)
+    - otherwise the file is memory-mapped and sent in MMAP_CHUNK_SIZE slices
+    """
+
+    def __init__(self, path: Path, offset: int, length: int, status_code: int, headers: dict[str, str]):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.length,
+                })
+        elif "http.response.pathsend" in extensions and self.offset == 0 and self.length == self.path.stat().st_size:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            await self._send_mapped(send)
+        if self.background is not None:
+            await self.background()
+
+    async def _send_mapped(self, send: Send):
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            position, end = self.offset, self.offset + self.length
+            while position < end:
+                stop = min(position + MMAP_CHUNK_SIZE, end)
+                # Page faults on a cold cache block, so copy off the event loop
+                chunk = await asyncio.to_thread(mapped.__getitem__, slice(position, stop))
+                position = stop
+                await send({"type": "http.response.body", "body": chunk, "more_body": position < end})
+
+
+class LocalDownload(Download):
+    def __init__(self, path: Path, offset: int, length: int, status_code: int, headers: dict[str, str]):
+        super().__init__(status_code, headers)
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def response(self, headers: dict[str, str]) -> Response:
+        return ZeroCopyFileResponse(self.path, self.offset, self.length, self.status_code, {**headers, **self.headers})
+
+
+def _tracked(operation: str):
+    """Record the call in the /metrics upstream series, like Supabase calls"""
+    def wrap(method):
+        @functools.wraps(method)
+        async def tracked(self, *args, **kwargs):
+            with track_upstream("local_storage", self.root.name, operation):
+                return await method(self, *args, **kwargs)
+        return tracked
+    return wrap
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files on a local disk under `root`, for on-prem nodes and offline
+    benchmarks. Downloads are served zero-copy (see ZeroCopyFileResponse).
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _path(self, file_path: str) -> Path:
+        path = (self.root / file_path).resolve()
+        if path == self.root or not path.is_relative_to(self.root) or _META_DIR in path.relative_to(self.root).parts:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {file_path}"
+            )
+        return path
+
+    def _meta_path(self, path: Path) -> Path:
+        return self.root / _META_DIR / path.relative_to(self.root)
+
+    async def ensure_bucket_exists(self):
+        (self.root / _META_DIR).mkdir(parents=True, exist_ok=True)
+
+    @_tracked("upload")
+    async def upload_stream(
+        self,
+        file_path: str,
+        chunks: AsyncIterable[bytes],
+        content_type: Optional[str] = None,
+        upsert: bool = False,
+        exist_ok: bool = False
+    ) -> None:
+        """
+        Written to a temporary file and renamed into place, so readers never
+        see a partial object.
+        """
+        path = self._path(file_path)
+        if path.exists() and not upsert:
+            if exist_ok:
+                return
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Storage upload failed: {file_path} already exists"
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with open(partial, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        meta = self._meta_path(path)
+        meta.parent.mkdir(parents=True, exist_ok=True)
+        meta.write_text(content_type or "application/octet-stream")
+
+    def _content_type(self, path: Path) -> str:
+        try:
+            return self._meta_path(path).read_text()
+        except FileNotFoundError:
+            return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    @_tracked("download")
+    async def open_download(self, file_path: str, range_header: Optional[str] = None) -> Download:
+        path = self._path(file_path)
+        try:
+            size = path.stat().st_size
+        except (FileNotFoundError, NotADirectoryError):
+            size = None
+        if size is None or not path.is_file():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {file_path}"
+            )
+
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Download(416, {"Content-Range": f"bytes */{size}"})
+        headers = {"Content-Type": self._content_type(path)}
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return LocalDownload(path, 0, size, 200, headers)
+        start, end = byte_range
+        headers["Content-Length"] = str(end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return LocalDownload(path, start, end - start + 1, 206, headers)
+
+    @_tracked("download")
+    async def download_file(self, file_path: str) -> bytes:
+        path = self._path(file_path)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {str(e)}"
+            )
+
+    @_tracked("move")
+    async def move(self, source: str, destination: str, exist_ok: bool = False) -> bool:
+        """Hard-linked into place, so an existing destination is never replaced"""
+        src, dst = self._path(source), self._path(destination)
+        if not src.is_file():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {source}"
+            )
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            if not exist_ok:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Storage move failed: {destination} already exists"
+                )
+            moved = False
+        else:
+            moved = True
+            meta = self._meta_path(src)
+            if meta.exists():
+                self._meta_path(dst).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(meta, self._meta_path(dst))
+        src.unlink(missing_ok=True)
+        self._meta_path(src).unlink(missing_ok=True)
+        return moved
+
+    @_tracked("head")
+    async def exists(self, file_path: str) -> bool:
+        try:
+            return self._path(file_path).is_file()
+        except HTTPException:
+            return False
+
+    @_tracked("delete")
+    async def delete_files(self, file_paths: list[str]) -> dict:
+        for file_path in file_paths:
+            path = self._path(file_path)
+            path.unlink(missing_ok=True)
+            self._meta_path(path).unlink(missing_ok=True)
+        return {"message": "Files deleted successfully", "paths": file_paths}
+
+    @_tracked("list")
+    async def list_files(self, folder: str = "") -> list:
+        """Same shape as Supabase Storage listings: name, updated_at, metadata"""
+        directory = self._path(folder) if folder else self.root
+        if not directory.is_dir():
+            return []
+        files = []
+        for entry in sorted(directory.iterdir()):
+            if entry.name == _META_DIR or entry.name.endswith(".part"):
+                continue
+            stat = entry.stat()
+            files.append({
+                "name": entry.name,
+                "id": None if entry.is_dir() else str(entry.relative_to(self.root)),
+                "updated_at": stat.st_mtime,
+                "metadata": None if entry.is_dir() else {
+                    "size": stat.st_size,
+                    "mimetype": self._content_type(entry),
+                },
+            })
+        return files
+
+    async def get_public_url(self, file_path: str) -> str:
+        return f"{settings.local_storage_public_url.rstrip('/')}/{file_path}"
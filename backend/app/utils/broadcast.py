@@ -0,0 +1,130 @@
+# app/utils/broadcast.py
+import asyncio
+from collections import deque
+from typing import Optional
+import orjson
+from app.config import settings
+
+
+def sse_frame(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    """One Server-Sent Events message"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+RESYNC = sse_frame("resync", {"reason": "subscriber fell behind; refetch the list"})
+
+
+class Subscription:
+    """
+    One subscriber's bounded buffer of encoded messages. When it is full the
+    backlog is dropped and replaced by a single `resync` message: a slow
+    consumer costs its own freshness, never the publisher's time or
+    memory.
+    """
+
+    def __init__(self, broadcaster: "Broadcaster", topic: str, max_queue: int):
+        self.broadcaster = broadcaster
+        self.topic = topic
+        self.max_queue = max_queue
+        self.overflows = 0
+        self._queue: deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, message: bytes):
+        if len(self._queue) >= self.max_queue:
+            self._queue.clear()
+            self._queue.append(RESYNC)
+            self.overflows += 1
+            self.broadcaster.overflows += 1
+        elif self._queue and self._queue[0] is RESYNC:
+            pass  # the client refetches anyway; don't pile up after it
+        else:
+            self._queue.append(message)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> bytes:
+        """
+        Everything queued so far as one chunk, or b"" after `timeout`
+        seconds with nothing to send (callers send a heartbeat)
+        """
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return b""
+        chunk = b"".join(self._queue)
+        self._queue.clear()
+        return chunk
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """
+    In-process fan-out of events to subscribers of a topic (a project id).
+    A message is encoded once per publish and shared by every subscriber;
+    publishing never waits on a subscriber.
+
+    Subscribers only see events published in the same worker process.
+    """
+
+    def __init__(self, name: str, max_queue: int):
+        self.name = name
+        self.max_queue = max_queue
+        self._topics: dict[str, set[Subscription]] = {}
+        self._sequence: dict[str, int] = {}
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(self, topic, self.max_queue)
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._topics[subscription.topic]
+            self._sequence.pop(subscription.topic, None)
+
+    def publish(self, topic: str, event: str, data: dict):
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return
+        sequence = self._sequence.get(topic, 0) + 1
+        self._sequence[topic] = sequence
+        message = sse_frame(event, data, sequence)
+        for subscription in subscribers:
+            subscription.push(message)
+        self.published += 1
+        self.delivered += len(subscribers)
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(s) for s in self._topics.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+_broadcasters: dict[str, Broadcaster] = {}
+
+
+def get_broadcaster(name: str, max_queue: int = settings.task_feed_queue_size) -> Broadcaster:
+    """Get or create the named process-wide broadcaster"""
+    if name not in _broadcasters:
+        _broadcasters[name] = Broadcaster(name, max_queue)
+    return _broadcasters[name]
+
+
+def broadcast_stats() -> dict:
+    return {name: b.stats() for name, b in _broadcasters.items()}
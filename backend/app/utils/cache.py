@@ -0,0 +1,102 @@
+# app/utils/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.config import settings
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with LRU eviction and a per-entry TTL.
+
+    Not shared between workers: invalidation is local, so other workers can
+    serve an entry for up to `ttl` seconds after a write elsewhere.
+
+    Read-through callers should take `version` before fetching and store with
+    `set(..., version=...)`; if anything was invalidated meanwhile the value
+    may be stale and is dropped instead of cached.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None, ttl: Optional[float] = None):
+        """`ttl` shortens the lifetime of this entry; it never extends past the cache's ttl"""
+        if version is not None and version != self.version:
+            return
+        if not settings.cache_enabled or value is None:
+            return
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+        self._entries[key] = (time.monotonic() + lifetime, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, key: Hashable, fn: Callable[[Any], None]) -> bool:
+        """
+        Apply a write to the cached value in place (`fn` mutates it) instead
+        of dropping it. Like invalidate, this bumps the version so a fetch
+        that started before the write isn't cached. False if nothing was
+        cached for `key`.
+        """
+        self.version += 1
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return False
+        fn(entry[1])
+        return True
+
+    def invalidate(self, key: Hashable):
+        self.version += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_caches: dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, max_entries: int = settings.cache_max_entries, ttl: float = settings.cache_ttl_seconds) -> TTLCache:
+    """Get or create the named process-wide cache"""
+    if name not in _caches:
+        _caches[name] = TTLCache(name, max_entries, ttl)
+    return _caches[name]
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
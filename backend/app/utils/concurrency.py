@@ -0,0 +1,83 @@
+# app/utils/concurrency.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from app.config import settings
+
+# One semaphore per Supabase upstream so a slow storage bucket can't eat
+# the slots that table reads need (and vice versa).
+_UPSTREAM_LIMITS = {
+    "postgrest": settings.postgrest_max_concurrency,
+    "storage": settings.storage_max_concurrency,
+    "auth": settings.auth_max_concurrency,
+}
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def upstream_limit(name: str) -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent calls to a Supabase upstream
+    ("postgrest", "storage" or "auth")
+    """
+    if name not in _semaphores:
+        _semaphores[name] = asyncio.Semaphore(_UPSTREAM_LIMITS[name])
+    return _semaphores[name]
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls: while a call for `key` is in
+    flight, further callers await the same result instead of issuing their
+    own. Nothing is kept once the call finishes, so it never serves data
+    older than the request it joined.
+
+    The shared call runs in its own task, so a caller that disconnects
+    doesn't cancel it for the others. Results are shared, not copied -
+    callers must not mutate them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(call)
+
+    def _finish(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.calls - self.collapsed,
+            "collapsed": self.collapsed,
+            "collapse_rate": round(self.collapsed / self.calls, 3) if self.calls else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+
+_flights: dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """Get or create the named process-wide single-flight group"""
+    if name not in _flights:
+        _flights[name] = SingleFlight(name)
+    return _flights[name]
+
+
+def single_flight_stats() -> dict:
+    return {name: flight.stats() for name, flight in _flights.items()}
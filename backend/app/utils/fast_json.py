@@ -0,0 +1,31 @@
+# app/utils/fast_json.py
+from typing import Any, Iterable, Optional
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(response: Response, content: bytes, status_code: int = 200) -> Response:
+    """
+    Pre-serialized JSON body as a Response, keeping headers the route set on
+    `response` (ETag, X-Next-Cursor). FastAPI skips response_model
+    validation for a returned Response.
+    """
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=content, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def dump_models(adapter: TypeAdapter, items: Any) -> bytes:
+    """Serialize already-validated models in pydantic-core, without revalidating"""
+    return adapter.dump_json(items)
+
+
+def dump_rows(rows: Iterable[dict], fields: Optional[Iterable[str]] = None) -> bytes:
+    """
+    Serialize database rows as-is with orjson. Rows are trusted to match the
+    response model; `fields` drops any other columns.
+    """
+    if fields is not None:
+        fields = tuple(fields)
+        rows = [{f: row.get(f) for f in fields} for row in rows]
+    return orjson.dumps(rows)
@@ -0,0 +1,63 @@
+# app/utils/http_cache.py
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Request, Response, status
+
+
+def strong_etag(value: str) -> str:
+    return '"' + hashlib.sha256(value.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    True when an If-None-Match header matches `etag`.
+
+    Uses weak comparison (RFC 9110 §13.1.2), which is what If-None-Match
+    calls for: W/"x" and "x" are the same validator.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _field(item, name: str):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def collection_etag(items: Iterable) -> str:
+    """
+    Weak ETag for a task/project row or list of rows.
+
+    Built from the row count and each row's (id, updated_at) - every write
+    stamps updated_at - so it is far cheaper than serializing the body.
+    """
+    digest = hashlib.sha1()
+    count = 0
+    for item in items:
+        updated_at = _field(item, "updated_at")
+        # Same validator for a model (datetime) and a raw row (ISO string)
+        if hasattr(updated_at, "isoformat"):
+            updated_at = updated_at.isoformat()
+        digest.update(f"{_field(item, 'id')}@{updated_at};".encode())
+        count += 1
+    return f'W/"{count}-{digest.hexdigest()[:16]}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Conditional GET: returns a bodiless 304 when the client's If-None-Match
+    matches `etag`, else stamps the validator on `response` and returns None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        # Keep headers the route already set (e.g. X-Next-Cursor)
+        extra = {k: v for k, v in response.headers.items() if k != "content-length"}
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**extra, **headers})
+    response.headers.update(headers)
+    return None
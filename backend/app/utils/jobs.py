@@ -0,0 +1,181 @@
+# app/utils/jobs.py
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+jobs_total = metrics.counter(
+    "taskflow_jobs_total", "Background jobs by outcome (done, retried, failed, dropped)", ("queue", "job", "status")
+)
+job_duration = metrics.histogram(
+    "taskflow_job_duration_seconds", "Time one attempt of a background job took", ("queue", "job")
+)
+queue_depth = metrics.gauge("taskflow_job_queue_depth", "Jobs waiting for a worker", ("queue",))
+
+
+class _Job:
+    __slots__ = ("name", "fn", "attempt")
+
+    def __init__(self, name: str, fn: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.fn = fn
+        self.attempt = 0
+
+
+class JobQueue:
+    """
+    In-process background jobs: a bounded queue drained by `workers`
+    asyncio workers. A failed job is retried up to `max_attempts` times,
+    waiting `retry_delay` seconds doubled after each failure, without
+    holding a worker while it waits. CPU-bound steps go through
+    `run_blocking`, on a thread pool of the same size, so they don't stall
+    the event loop serving requests.
+
+    Jobs live in memory only: ones queued or waiting for a retry at
+    shutdown are lost, so they must be safe to skip (or redo later).
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, max_attempts: int, retry_delay: float):
+        self.name = name
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue(max_queue)
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.running = 0
+        self.done = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work(), name=f"{self.name}-worker-{i}") for i in range(self.workers)
+            ]
+
+    def submit(self, name: str, fn: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Queue `fn` to run in the background; returns at once. False (and the
+        job is dropped) when the queue is full.
+        """
+        self._start()
+        try:
+            self._queue.put_nowait(_Job(name, fn))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            jobs_total.inc(queue=self.name, job=name, status="dropped")
+            logger.warning(f"Job queue {self.name} is full; dropped {name}")
+            return False
+        return True
+
+    async def run_blocking(self, fn: Callable[..., Any], *args) -> Any:
+        """Run `fn(*args)` on the queue's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _retry(self, job: _Job, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            jobs_total.inc(queue=self.name, job=job.name, status="dropped")
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            job.attempt += 1
+            self.running += 1
+            started = time.perf_counter()
+            try:
+                await job.fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if job.attempt < self.max_attempts:
+                    jobs_total.inc(queue=self.name, job=job.name, status="retried")
+                    delay = self.retry_delay * 2 ** (job.attempt - 1)
+                    retry = asyncio.create_task(self._retry(job, delay))
+                    self._retries.add(retry)
+                    retry.add_done_callback(self._retries.discard)
+                else:
+                    self.failed += 1
+                    jobs_total.inc(queue=self.name, job=job.name, status="failed")
+                    logger.error(f"Job {job.name} failed after {job.attempt} attempts: {str(e)}")
+            else:
+                self.done += 1
+                jobs_total.inc(queue=self.name, job=job.name, status="done")
+            finally:
+                self.running -= 1
+                job_duration.observe(time.perf_counter() - started, queue=self.name, job=job.name)
+                self._queue.task_done()
+
+    async def join(self, timeout: Optional[float] = None):
+        """Wait until every queued job has run (retries scheduled later excluded)"""
+        await asyncio.wait_for(self._queue.join(), timeout)
+
+    async def close(self, timeout: float = 5.0):
+        """Give queued jobs `timeout` seconds to finish, then stop the workers and thread pool"""
+        if self._tasks:
+            try:
+                await self.join(timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Job queue {self.name} closed with {self._queue.qsize()} jobs pending")
+        tasks = [*self._retries, *self._tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        # Blocking steps still queued would outlive their jobs
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "waiting_retry": len(self._retries),
+            "done": self.done,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+_queues: dict[str, JobQueue] = {}
+
+
+def get_job_queue(name: str) -> JobQueue:
+    """Get or create the named process-wide job queue; workers start with the first job"""
+    if name not in _queues:
+        _queues[name] = JobQueue(
+            name,
+            workers=settings.job_workers or os.cpu_count() or 1,
+            max_queue=settings.job_queue_size,
+            max_attempts=settings.job_max_attempts,
+            retry_delay=settings.job_retry_seconds,
+        )
+    return _queues[name]
+
+
+def job_stats() -> dict:
+    return {name: queue.stats() for name, queue in _queues.items()}
+
+
+async def close_job_queues():
+    for queue in _queues.values():
+        await queue.close()
+
+
+def _collect_queue_depth():
+    for name, queue in _queues.items():
+        queue_depth.set(queue.stats()["queued"], queue=name)
+
+
+metrics.add_collector(_collect_queue_depth)
@@ -0,0 +1,221 @@
+# app/utils/metrics.py
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_number(v)}" for key, v in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics, rendered in the Prometheus text format. Values are
+    per worker; scrape each worker (or aggregate) as usual.
+
+    Collectors are called at scrape time to refresh gauges that mirror
+    state kept elsewhere (cache sizes, ...).
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _get(self, cls, name: str, help: str, labels: Iterable[str] = (), **kwargs):
+        if name not in self._metrics:
+            self._metrics[name] = cls(name, help, labels, **kwargs)
+        return self._metrics[name]
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def add_collector(self, collect: Callable[[], None]):
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "taskflow_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_duration = metrics.histogram(
+    "taskflow_http_request_duration_seconds", "Time from request to last body byte", ("method", "route")
+)
+http_in_progress = metrics.gauge(
+    "taskflow_http_requests_in_progress", "Requests currently being handled", ("method",)
+)
+upstream_requests = metrics.counter(
+    "taskflow_upstream_requests_total",
+    "Calls to Supabase / the local backends by target (table, bucket) and operation",
+    ("upstream", "target", "operation", "status"),
+)
+upstream_duration = metrics.histogram(
+    "taskflow_upstream_request_duration_seconds",
+    "Upstream call latency (to response headers for streamed bodies)",
+    ("upstream", "target", "operation"),
+)
+
+
+def observe_upstream(upstream: str, target: str, operation: str, seconds: float, status: str):
+    upstream_requests.inc(upstream=upstream, target=target, operation=operation, status=status)
+    upstream_duration.observe(seconds, upstream=upstream, target=target, operation=operation)
+
+
+@contextmanager
+def track_upstream(upstream: str, target: str, operation: str):
+    """Time a backend call that doesn't go through the Supabase HTTP client"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        observe_upstream(upstream, target, operation, time.perf_counter() - started, "error")
+        raise
+    observe_upstream(upstream, target, operation, time.perf_counter() - started, "ok")
+
+
+def route_template(scope: Scope) -> str:
+    # Routers declare their full prefix (see app.main), so route.path is the whole template
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    # Unmatched paths (404s, scanners) share one label to bound cardinality
+    return template or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body buffering) recording
+    status counts, latency and in-flight requests per route template
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: Optional[set[str]] = None):
+        self.app = app
+        self.skip_paths = skip_paths or {"/metrics"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_progress.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_progress.dec(method=method)
+            route = route_template(scope)
+            http_requests.inc(method=method, route=route, status=status_code)
+            http_duration.observe(elapsed, method=method, route=route)
@@ -0,0 +1,43 @@
+# app/utils/pagination.py
+import base64
+import json
+from fastapi import HTTPException, status
+
+
+def parse_sort(sort: str, allowed: set[str]) -> tuple[str, bool]:
+    """
+    Parse a sort option like "updated_at" or "-updated_at" (descending)
+    into (column, descending)
+    """
+    column = sort.lstrip("-")
+    if column not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort. Allowed: {', '.join(sorted(allowed))} (prefix '-' for descending)"
+        )
+    return column, sort.startswith("-")
+
+
+def encode_cursor(sort: str, row: dict, columns: list[str]) -> str:
+    """Opaque keyset cursor pointing just past `row`"""
+    payload = {"sort": sort, "after": {c: row[c] for c in columns}}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> dict:
+    """
+    Column values of the last row of the previous page.
+
+    A cursor is only valid for the sort it was issued for.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["sort"] != sort:
+            raise ValueError("sort mismatch")
+        return payload["after"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -0,0 +1,209 @@
+# app/utils/profiling.py
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.metrics import route_template
+
+_SITE_PACKAGES = os.sep + "site-packages" + os.sep
+
+
+def _location(code) -> str:
+    path = code.co_filename
+    if _SITE_PACKAGES in path:
+        path = path.split(_SITE_PACKAGES, 1)[1]
+    elif path.startswith(os.getcwd()):
+        path = os.path.relpath(path)
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+
+
+def _awaiting(coro, marker) -> Optional[list[str]]:
+    """
+    Where a suspended request is parked: its coroutine chain from `marker`
+    down to the awaited object (a Future, a gather, ...)
+    """
+    frames, seen = [], False
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            if seen:
+                frames.append(f"<{type(coro).__name__}>")
+            break
+        seen = seen or frame is marker
+        if seen:
+            frames.append(_location(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames if seen else None
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples the event loop thread every `interval` seconds. When the
+    request's coroutine is on the stack the sample is "cpu" (the running
+    frames); otherwise the request is suspended and the sample is "await"
+    (the coroutine chain it is waiting in). Children started with gather()
+    or create_task() are not followed; their wait shows as the gather.
+    """
+
+    def __init__(self, marker, task: asyncio.Task, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = threading.get_ident()
+        self.marker = marker
+        self.task = task
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self._sample()
+            except (AttributeError, ValueError, RuntimeError):
+                # The request moved on while we walked it; drop the sample
+                continue
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        running = []
+        while frame is not None:
+            running.append(_location(frame.f_code))
+            if frame is self.marker:
+                self.samples[("cpu", *reversed(running))] += 1
+                return
+            frame = frame.f_back
+        stack = _awaiting(self.task.get_coro(), self.marker)
+        if stack:
+            self.samples[("await", *stack)] += 1
+
+    async def stop(self) -> Counter:
+        self._stopped.set()
+        # The thread may be mid-sample; wait for it without blocking the loop
+        await asyncio.to_thread(self.join)
+        return self.samples
+
+
+class Profile:
+    def __init__(self, method: str, path: str, interval: float, reason: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route = ""
+        self.status: Optional[int] = None
+        self.reason = reason
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+
+    def summary(self) -> dict:
+        cpu = sum(n for stack, n in self.samples.items() if stack[0] == "cpu")
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.samples.values()),
+            "cpu_samples": cpu,
+        }
+
+    def stacks(self) -> list[dict]:
+        return [
+            {"kind": stack[0], "frames": list(stack[1:]), "count": count}
+            for stack, count in self.samples.most_common()
+        ]
+
+    def folded(self) -> str:
+        """Collapsed stacks, for flamegraph.pl, speedscope or inferno"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """The most recent profiles, oldest dropped first"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+
+    def add(self, profile: Profile):
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> list[dict]:
+        return [p.summary() for p in reversed(self._profiles.values())]
+
+
+profiles = ProfileStore(settings.profiling_max_stored)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests: those carrying `X-Profile: <admin token>`,
+    plus a random `sample_rate` fraction of traffic. The profile id is
+    returned in `X-Profile-Id`; see /api/admin/profiles.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, token: str = "", sample_rate: float = 0.0,
+                 interval: float = 0.005, skip_prefix: str = "/api/admin"):
+        self.app = app
+        self.store = store
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.skip_prefix = skip_prefix
+
+    def _reason(self, scope: Scope) -> Optional[str]:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and hmac.compare_digest(value, self.token):
+                    return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        reason = None
+        if scope["type"] == "http" and not scope["path"].startswith(self.skip_prefix):
+            reason = self._reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], self.interval, reason)
+        header = (b"x-profile-id", profile.id.encode())
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        # This coroutine's frame marks where the request's own stack starts
+        sampler = _Sampler(sys._getframe(), asyncio.current_task(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.samples = await sampler.stop()
+            profile.duration = time.perf_counter() - started
+            profile.route = route_template(scope)
+            self.store.add(profile)
@@ -1,11 +1,23 @@
+import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Header, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import settings
+from app.utils.cache import get_cache
 from typing import Optional
 
 security = HTTPBearer()
+# sha256(token) -> verified claims
+token_cache = get_cache(
+    "verified_tokens",
+    max_entries=settings.token_cache_max_entries,
+    ttl=settings.token_cache_ttl_seconds,
+)
+# sha256(token) -> exp of tokens revoked at logout
+_revoked: dict[str, float] = {}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -25,34 +37,89 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     )
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_token(token: str) -> dict:
     """
-    Verify JWT token from Authorization header
-    Used as dependency for protected routes
+    Verified claims of a JWT, served from `token_cache` when the same token
+    was checked recently. Raises 401 for invalid, expired or revoked tokens.
     """
-    token = credentials.credentials
+    key = _digest(token)
+    if key in _revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret,
             algorithms=[settings.jwt_algorithm]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    # Tokens without exp are never cached; jose already rejected expired ones
+    if "exp" in payload:
+        token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+def revoke_token(token: str):
+    """
+    Reject `token` from now until it expires (used by /logout).
+
+    Revocation is per process, like the cache it guards.
+    """
+    now = time.time()
+    for key in [k for k, exp in _revoked.items() if exp <= now]:
+        del _revoked[key]
+    key = _digest(token)
+    token_cache.invalidate(key)
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return
+    _revoked[key] = exp if exp is not None else now + settings.jwt_expiration
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Verify JWT token from Authorization header
+    Used as dependency for protected routes
+    """
+    return decode_token(credentials.credentials)
 
 async def get_current_user(token_data: dict = Depends(verify_token)):
     """
     Get current user from token
     Use this dependency to protect routes
     """
-    return token_data
\ No newline at end of file
+    return token_data
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Guard for operator endpoints: the `X-Admin-Token` header must match
+    settings.admin_token. The admin API is off while no token is set.
+    """
+    if not settings.admin_token:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
@@ -1,8 +1,215 @@
-from supabase import create_client
+# app/utils/supabase_client.py
+import logging
+import time
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from supabase_auth import AsyncGoTrueClient
 from app.config import settings
+from app.utils.metrics import observe_upstream
 
-def get_anon_client():
-    return create_client(settings.supabase_url, settings.supabase_key)
+logger = logging.getLogger(__name__)
 
-def get_service_client():
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+
+def _upstream(path: str) -> str:
+    """Map a Supabase request path to the upstream it hits"""
+    for prefix, name in (("/rest/", "postgrest"), ("/storage/", "storage"), ("/auth/", "auth")):
+        if path.startswith(prefix):
+            return name
+    return "other"
+
+
+_REST_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "PUT": "upsert", "DELETE": "delete"}
+_OBJECT_OPERATIONS = {"GET": "download", "HEAD": "info", "POST": "upload", "PUT": "update", "DELETE": "delete"}
+_AUTH_OPERATIONS = {"token": "sign_in", "signup": "sign_up"}
+
+
+def describe_request(method: str, path: str) -> tuple[str, str, str]:
+    """
+    (upstream, target, operation) of a Supabase API call, e.g.
+    ("postgrest", "tasks", "select") or ("storage", "task-files", "download").
+    Targets are tables, buckets or auth endpoints - never object paths or
+    ids, so label cardinality stays bounded.
+    """
+    upstream = _upstream(path)
+    parts = path.strip("/").split("/")[2:]  # drop "rest/v1", "storage/v1", ...
+    if not parts:
+        return upstream, "", method.lower()
+    if upstream == "postgrest":
+        if parts[0] == "rpc" and len(parts) > 1:
+            return upstream, parts[1], "rpc"
+        return upstream, parts[0], _REST_OPERATIONS.get(method, method.lower())
+    if upstream == "storage":
+        if parts[0] == "bucket":
+            return upstream, parts[1] if len(parts) > 1 else "*", f"bucket_{method.lower()}"
+        rest = parts[1:]
+        if rest and rest[0] in ("authenticated", "public"):
+            return upstream, rest[1] if len(rest) > 1 else "", "download"
+        if rest and rest[0] in ("list", "sign", "move", "copy", "info"):
+            return upstream, rest[1] if len(rest) > 1 else "", rest[0]
+        return upstream, rest[0] if rest else "", _OBJECT_OPERATIONS.get(method, method.lower())
+    if upstream == "auth":
+        if parts[0] == "admin":
+            return upstream, "admin/" + (parts[1] if len(parts) > 1 else ""), method.lower()
+        return upstream, parts[0], _AUTH_OPERATIONS.get(parts[0], method.lower())
+    return upstream, parts[0], method.lower()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Records every Supabase call in the /metrics upstream series, failures
+    included. Latency is measured to the response headers, so a streamed
+    download counts its time to first byte.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream, target, operation = describe_request(request.method, request.url.path)
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            observe_upstream(upstream, target, operation, time.perf_counter() - started, "error")
+            raise
+        observe_upstream(upstream, target, operation, time.perf_counter() - started, str(response.status_code))
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ConnectionMetrics:
+    """Counters for the shared connection pool, split per upstream"""
+
+    def __init__(self):
+        self.startup_seconds: float | None = None
+        self.upstreams: dict[str, dict] = {}
+
+    def _counters(self, upstream: str) -> dict:
+        return self.upstreams.setdefault(
+            upstream, {"requests": 0, "new_connections": 0, "tls_handshakes": 0, "total_seconds": 0.0}
+        )
+
+    def record_connect(self, upstream: str):
+        self._counters(upstream)["new_connections"] += 1
+
+    def record_tls(self, upstream: str):
+        self._counters(upstream)["tls_handshakes"] += 1
+
+    def record_request(self, upstream: str, seconds: float):
+        counters = self._counters(upstream)
+        counters["requests"] += 1
+        counters["total_seconds"] += seconds
+
+    def snapshot(self) -> dict:
+        upstreams = {}
+        for name, c in self.upstreams.items():
+            requests = c["requests"] or 1
+            upstreams[name] = {
+                "requests": c["requests"],
+                "new_connections": c["new_connections"],
+                "tls_handshakes": c["tls_handshakes"],
+                "connection_reuse_ratio": round(1 - c["new_connections"] / requests, 3),
+                "avg_latency_ms": round(c["total_seconds"] / requests * 1000, 2),
+            }
+        return {"startup_seconds": self.startup_seconds, "upstreams": upstreams}
+
+
+class SupabaseRegistry:
+    """
+    Process-wide Supabase clients sharing one keep-alive connection pool.
+
+    Created and closed by the FastAPI lifespan (see app.main) so every request
+    reuses warm connections instead of building a client - and paying a TLS
+    handshake - per call.
+    """
+
+    def __init__(self):
+        self.http: httpx.AsyncClient | None = None
+        self.service: AsyncClient | None = None
+        self.auth: AsyncGoTrueClient | None = None
+        self.metrics = ConnectionMetrics()
+
+    async def start(self):
+        started = time.perf_counter()
+        transport = httpx.AsyncHTTPTransport(
+            http2=settings.supabase_http2,
+            limits=httpx.Limits(
+                max_connections=settings.supabase_max_connections,
+                max_keepalive_connections=settings.supabase_max_keepalive_connections,
+                keepalive_expiry=settings.supabase_keepalive_expiry,
+            ),
+        )
+        self.http = httpx.AsyncClient(
+            transport=InstrumentedTransport(transport),
+            timeout=settings.supabase_timeout,
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+        self.service = await acreate_client(
+            settings.supabase_url,
+            settings.supabase_service_key,
+            AsyncClientOptions(httpx_client=self.http, auto_refresh_token=False, persist_session=False),
+        )
+        # Password sign-in/up goes through a bare GoTrue client: the anon
+        # supabase client rewrites its own headers on SIGNED_IN, which is
+        # per-user state we can't have on a shared instance.
+        self.auth = AsyncGoTrueClient(
+            url=f"{settings.supabase_url.rstrip('/')}/auth/v1",
+            headers={"apikey": settings.supabase_key, "Authorization": f"Bearer {settings.supabase_key}"},
+            http_client=self.http,
+            auto_refresh_token=False,
+            persist_session=False,
+        )
+        if settings.supabase_warmup:
+            await self._warm_up()
+        self.metrics.startup_seconds = round(time.perf_counter() - started, 4)
+        logger.info(f"Supabase registry ready in {self.metrics.startup_seconds}s")
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+        self.http = self.service = self.auth = None
+
+    async def _warm_up(self):
+        """Open the first pooled connection before traffic arrives"""
+        try:
+            await self.http.get(
+                f"{settings.supabase_url.rstrip('/')}/auth/v1/health",
+                headers={"apikey": settings.supabase_key},
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"Supabase warm-up failed: {str(e)}")
+
+    async def _on_request(self, request: httpx.Request):
+        upstream = _upstream(request.url.path)
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self.metrics.record_connect(upstream)
+            elif event_name == "connection.start_tls.complete":
+                self.metrics.record_tls(upstream)
+
+        request.extensions["trace"] = trace
+        request.extensions["taskflow.started"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response):
+        started = response.request.extensions.get("taskflow.started")
+        if started is not None:
+            self.metrics.record_request(_upstream(response.request.url.path), time.perf_counter() - started)
+
+
+registry = SupabaseRegistry()
+
+
+def _require(client):
+    if client is None:
+        raise RuntimeError("Supabase registry is not started; is the app lifespan running?")
+    return client
+
+def get_service_client() -> AsyncClient:
+    return _require(registry.service)
+
+def get_auth_client() -> AsyncGoTrueClient:
+    return _require(registry.auth)
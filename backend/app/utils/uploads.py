@@ -0,0 +1,44 @@
+# app/utils/uploads.py
+import hashlib
+from fastapi import HTTPException, UploadFile, status
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+CHUNK_SIZE = 256 * 1024  # bytes of an upload held in memory at any time
+
+
+def file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File too large. Max size is {MAX_FILE_SIZE // (1024*1024)}MB"
+    )
+
+
+class UploadStream:
+    """
+    Async iterator over an UploadFile in CHUNK_SIZE pieces.
+
+    Enforces `limit` as bytes go by, counts them in `size` and hashes them
+    into `sha256`, so the file can be streamed straight to storage without
+    ever being held whole.
+    """
+
+    def __init__(self, file: UploadFile, limit: int = MAX_FILE_SIZE):
+        self.file = file
+        self.limit = limit
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    async def __aiter__(self):
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        await self.file.seek(0)
+        while chunk := await self.file.read(CHUNK_SIZE):
+            self.size += len(chunk)
+            if self.size > self.limit:
+                raise file_too_large()
+            self.sha256.update(chunk)
+            yield chunk
+
+    def hexdigest(self) -> str:
+        """Hex SHA-256 of the content, once the stream has been consumed"""
+        return self.sha256.hexdigest()
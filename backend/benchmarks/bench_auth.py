@@ -0,0 +1,67 @@
+"""
+Per-request cost of the `verify_token` auth dependency, with and without the
+verified-token cache.
+
+Simulates `--users` signed-in users each sending `--requests` requests with
+the same bearer token (a page load issues a dozen), and reports the mean
+microseconds spent authenticating one request.
+
+    cd backend
+    python -m benchmarks.bench_auth --users 100 --requests 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+from benchmarks.bench_data_access import FAKE_KEY
+
+
+async def measure(tokens: list[str], requests: int) -> float:
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.utils.security import verify_token
+
+    calls = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        for token in tokens for _ in range(requests)
+    ]
+    random.shuffle(calls)
+    start = time.perf_counter()
+    for credentials in calls:
+        await verify_token(credentials)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="distinct tokens")
+    parser.add_argument("--requests", type=int, default=50, help="requests per token")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "SUPABASE_URL": "http://127.0.0.1:1",
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "JWT_SECRET": "benchmark-secret",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.config import settings
+    from app.utils.security import create_access_token, token_cache
+
+    tokens = [create_access_token({"sub": str(uuid.uuid4())}) for _ in range(args.users)]
+
+    print(f"{'token cache':<14}{'us/request':>12}{'hit rate':>10}")
+    for enabled in (False, True):
+        settings.cache_enabled = enabled
+        token_cache.clear()
+        token_cache.hits = token_cache.misses = 0
+        per_request = asyncio.run(measure(tokens, args.requests))
+        hit_rate = token_cache.stats()["hit_rate"] if enabled else 0.0
+        print(f"{'on' if enabled else 'off':<14}{per_request:>12.1f}{hit_rate:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Throughput of the read endpoints against a local PostgREST stand-in.
+
+Starts `StubSupabase` with an injected per-request latency, seeds one project
+with tasks, and drives `/api/projects/` and `/tasks/project/{id}` in-process
+at increasing concurrency. With a non-blocking data layer requests/sec should
+grow with concurrency until the upstream semaphore is saturated.
+
+    cd backend
+    python -m benchmarks.bench_data_access --latency 0.02 --tasks 200
+    python -m benchmarks.bench_data_access --repository sqlite  # no upstream at all
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.stub_supabase import StubSupabase
+
+# PostgREST needs a JWT-shaped key; the stub never checks it
+FAKE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.c3R1Yg"
+
+
+def seed(stub: StubSupabase, n_tasks: int) -> tuple[str, str]:
+    owner_id, project_id = str(uuid.uuid4()), str(uuid.uuid4())
+    now = datetime.utcnow()
+    stub.tables["projects"] = [{
+        "id": project_id,
+        "name": "Benchmark project",
+        "description": None,
+        "owner_id": owner_id,
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }]
+    stub.tables["tasks"] = [{
+        "id": str(uuid.uuid4()),
+        "project_id": project_id,
+        "title": f"Task {i}",
+        "description": "Generated by bench_data_access",
+        "status": ("todo", "in_progress", "done")[i % 3],
+        "priority": ("low", "medium", "high")[i % 3],
+        "assigned_to": None,
+        "created_by": owner_id,
+        "created_at": (now - timedelta(minutes=i)).isoformat(),
+        "updated_at": (now - timedelta(minutes=i)).isoformat(),
+    } for i in range(n_tasks)]
+    return owner_id, project_id
+
+
+async def drive(client, path: str, headers: dict, concurrency: int, total: int) -> float:
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            res = await client.get(path, headers=headers)
+            res.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def run(args, owner_id: str, project_id: str, stub: StubSupabase):
+    import httpx
+    from app.main import app
+    from app.repositories.base import get_repository
+    from app.utils.security import create_access_token
+
+    if args.repository == "sqlite":
+        # Same rows as the stub, loaded into the embedded database
+        repository = get_repository()
+        for table in ("projects", "tasks"):
+            await repository.delete(table, filters=[])
+            await repository.insert(table, stub.tables[table])
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': owner_id})}"}
+    routes = {
+        "/api/projects/": "/api/projects/",
+        "/tasks/project/{id}": f"/tasks/project/{project_id}",
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'route':<24}{'concurrency':>12}{'req/s':>10}")
+            for name, path in routes.items():
+                await drive(client, path, headers, 1, 5)  # warm up connections
+                for concurrency in args.concurrency:
+                    rps = await drive(client, path, headers, concurrency, args.requests)
+                    print(f"{name:<24}{concurrency:>12}{rps:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every stub request")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks seeded into the project")
+    parser.add_argument("--requests", type=int, default=400, help="requests per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--repository", choices=["supabase", "sqlite"], default="supabase",
+                        help="sqlite: embedded database (the stub then only serves auth health)")
+    parser.add_argument("--sqlite-path", default="bench.db")
+    args = parser.parse_args()
+
+    stub = StubSupabase(latency=args.latency)
+    owner_id, project_id = seed(stub, args.tasks)
+    url = stub.start()
+
+    # Settings are read at import time, so point them at the stub first
+    os.environ.update({
+        "SUPABASE_URL": url,
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "JWT_SECRET": "benchmark-secret",
+        "REPOSITORY_BACKEND": args.repository,
+        "SQLITE_PATH": args.sqlite_path,
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        asyncio.run(run(args, owner_id, project_id, stub))
+    finally:
+        stub.stop()
+        print(f"\nstub served {stub.requests} upstream requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+CPU cost of turning a task listing into a JSON body, per response path.
+
+    default     TaskResponse(**row) per row, then FastAPI validates and
+                serializes the list again through response_model
+    fast_json   rows validated once in pydantic-core, serialized without
+                revalidation (settings.fast_json)
+    trusted     database rows written straight out with orjson
+                (settings.fast_json + fast_json_trust_rows)
+
+Measures process CPU time, so the numbers don't depend on I/O.
+
+    cd backend
+    python -m benchmarks.bench_serialization --tasks 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.bench_data_access import FAKE_KEY, seed
+from benchmarks.stub_supabase import StubSupabase
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000, help="rows in the listing")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "SUPABASE_URL": "http://127.0.0.1:1",
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "JWT_SECRET": "benchmark-secret",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fastapi.routing import serialize_response
+    from app.models.task import TaskResponse
+    from app.routers.tasks import router
+    from app.services.task_service import task_list_adapter
+    from app.utils.fast_json import dump_models, dump_rows
+
+    stub = StubSupabase()
+    seed(stub, args.tasks)
+    rows = stub.tables["tasks"]
+    route = next(r for r in router.routes if r.path.endswith("/project/{project_id}"))
+
+    def default():
+        tasks = [TaskResponse(**row) for row in rows]
+        # What FastAPI does with the returned list for response_model=List[TaskResponse]
+        asyncio.run(serialize_response(field=route.response_field, response_content=tasks, dump_json=True))
+
+    paths = {
+        "default": default,
+        "fast_json": lambda: dump_models(task_list_adapter, task_list_adapter.validate_python(rows)),
+        "trusted": lambda: dump_rows(rows),
+    }
+    baseline = None
+    print(f"{'path':<12}{'cpu ms':>10}{'vs default':>12}")
+    for name, fn in paths.items():
+        ms = cpu_ms(fn, args.repeat)
+        baseline = baseline or ms
+        print(f"{name:<12}{ms:>10.1f}{baseline / ms:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Upload and download throughput of the file routes, per storage backend.
+
+Runs entirely offline: `supabase` streams through the Storage stand-in in
+`StubSupabase`, `local` reads and writes a temporary directory (downloads
+memory-mapped; ASGITransport offers no zero-copy extension). For each file
+size it uploads a few files through POST /api/files/upload and then
+downloads them repeatedly through GET /api/files/{path}.
+
+    cd backend
+    python -m benchmarks.bench_storage --sizes 65536 1048576 8388608
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_data_access import FAKE_KEY
+from benchmarks.stub_supabase import StubSupabase
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for size in args.sizes:
+                paths = []
+                start = time.perf_counter()
+                for i in range(args.files):
+                    # Distinct content per file, so nothing is deduplicated
+                    data = i.to_bytes(4, "big") * (size // 4)
+                    res = await client.post(
+                        "/api/files/upload",
+                        params={"task_id": "bench"},
+                        files={"file": ("bench.pdf", data, "application/pdf")},
+                    )
+                    res.raise_for_status()
+                    paths.append(res.json()["data"]["file_path"])
+                upload_mb_s = size * args.files / (time.perf_counter() - start) / 1e6
+
+                start = time.perf_counter()
+                for _ in range(args.downloads):
+                    for path in paths:
+                        res = await client.get(f"/api/files/{path}")
+                        res.raise_for_status()
+                download_mb_s = size * args.files * args.downloads / (time.perf_counter() - start) / 1e6
+                print(f"{args.backend:<10}{size:>12}{upload_mb_s:>14.1f}{download_mb_s:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "supabase", "both"], default="both")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64 * 1024, 1024 * 1024, 8 * 1024 * 1024])
+    parser.add_argument("--files", type=int, default=4, help="files uploaded per size")
+    parser.add_argument("--downloads", type=int, default=5, help="times each file is downloaded")
+    parser.add_argument("--no-header", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.no_header:
+        print(f"{'backend':<10}{'size':>12}{'upload MB/s':>14}{'download MB/s':>16}", flush=True)
+    if args.backend == "both":
+        # Settings and the storage singleton are per process
+        for backend in ("supabase", "local"):
+            subprocess.run([
+                sys.executable, "-m", "benchmarks.bench_storage", "--backend", backend,
+                "--sizes", *map(str, args.sizes), "--files", str(args.files), "--downloads", str(args.downloads), "--no-header",
+            ], check=True)
+        return
+
+    stub = StubSupabase()
+    stub.tables["task_files"] = []
+    url = stub.start()
+    root = tempfile.mkdtemp(prefix="taskflow-bench-")
+    os.environ.update({
+        "SUPABASE_URL": url,
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "JWT_SECRET": "benchmark-secret",
+        "STORAGE_BACKEND": args.backend,
+        "LOCAL_STORAGE_ROOT": root,
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        asyncio.run(run(args))
+    finally:
+        stub.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Reproducible load test of the TaskFlow API.
+
+Starts `app.main:app` (in-process over ASGI, or under uvicorn with
+`--server uvicorn`) against `StubSupabase`, which stands in for the
+Supabase REST, Storage and Auth APIs with a fixed injected latency.
+Virtual users sign up, then run a seeded mix of:
+
+    board    GET /api/projects/ + GET /tasks/project/{id}  (their team's board)
+    edit     PUT /tasks/{id}
+    me       GET /api/auth/me
+    upload   POST /api/files/upload
+
+and the run reports throughput and p50/p95/p99 latency per route. `--save`
+writes the results as a JSON baseline; `--compare` checks a run against one
+and exits non-zero when a route regressed beyond `--tolerance`.
+
+    cd backend
+    python -m benchmarks.load_test --users 20 --iterations 50 --save baseline.json
+    python -m benchmarks.load_test --users 20 --iterations 50 --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+import uuid
+
+from benchmarks.bench_data_access import FAKE_KEY
+from benchmarks.stub_supabase import StubSupabase
+
+MIX = {"board": 50, "edit": 25, "me": 20, "upload": 5}
+STATUSES = ("todo", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, client, route: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = await client.request(method, url, **kwargs)
+            ok = res.status_code < 400
+        except Exception:
+            res, ok = None, False
+        self.latencies[route].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[route] += 1
+        return res
+
+    def summary(self, wall_seconds: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "rps": round(len(values) / wall_seconds, 1),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / wall_seconds, 1),
+            "routes": routes,
+        }
+
+
+def seed_teams(stub: StubSupabase, teams: int, tasks_per_team: int) -> list[dict]:
+    """One owner, project and task list per team; members join via sign-up"""
+    now = datetime.utcnow()
+    stub.tables.setdefault("projects", [])
+    stub.tables.setdefault("tasks", [])
+    stub.tables.setdefault("task_files", [])
+    seeded = []
+    for t in range(teams):
+        owner_id = stub.add_user(f"owner{t}@bench.example.com", "bench-password", f"Owner {t}")
+        project_id = str(uuid.uuid4())
+        stub.tables["projects"].append({
+            "id": project_id,
+            "name": f"Team {t} board",
+            "description": None,
+            "owner_id": owner_id,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        })
+        task_ids = []
+        for i in range(tasks_per_team):
+            task_ids.append(str(uuid.uuid4()))
+            stub.tables["tasks"].append({
+                "id": task_ids[-1],
+                "project_id": project_id,
+                "title": f"Team {t} task {i}",
+                "description": "Generated by load_test",
+                "status": STATUSES[i % 3],
+                "priority": PRIORITIES[i % 3],
+                "assigned_to": None,
+                "created_by": owner_id,
+                "created_at": (now - timedelta(minutes=i)).isoformat(),
+                "updated_at": (now - timedelta(minutes=i)).isoformat(),
+            })
+        seeded.append({"owner": f"owner{t}@bench.example.com", "project_id": project_id, "task_ids": task_ids})
+    return seeded
+
+
+async def virtual_user(client, recorder: Recorder, index: int, team: dict, args):
+    rng = random.Random(args.seed * 1_000_003 + index)
+    # Team owners see their project in /api/projects/; everyone else signs up
+    if index < args.teams:
+        res = await recorder.call(client, "POST /api/auth/login", "POST", "/api/auth/login",
+                                  json={"email": team["owner"], "password": "bench-password"})
+    else:
+        res = await recorder.call(client, "POST /api/auth/signup", "POST", "/api/auth/signup", json={
+            "email": f"user{index}@bench.example.com", "password": "bench-password", "full_name": f"User {index}"
+        })
+    if res is None or res.status_code >= 400:
+        return
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    actions, weights = zip(*MIX.items())
+
+    for _ in range(args.iterations):
+        action = rng.choices(actions, weights)[0]
+        if action == "board":
+            await recorder.call(client, "GET /api/projects/", "GET", "/api/projects/", headers=headers)
+            await recorder.call(client, "GET /tasks/project/{id}", "GET", f"/tasks/project/{team['project_id']}",
+                                params={"limit": args.page_size}, headers=headers)
+        elif action == "edit":
+            task_id = rng.choice(team["task_ids"])
+            await recorder.call(client, "PUT /tasks/{id}", "PUT", f"/tasks/{task_id}",
+                                json={"status": rng.choice(STATUSES)}, headers=headers)
+        elif action == "me":
+            await recorder.call(client, "GET /api/auth/me", "GET", "/api/auth/me", headers=headers)
+        else:
+            content = rng.randbytes(args.upload_bytes)
+            await recorder.call(client, "POST /api/files/upload", "POST", "/api/files/upload",
+                                params={"task_id": rng.choice(team["task_ids"])},
+                                files={"file": ("attachment.txt", content, "text/plain")}, headers=headers)
+        if args.think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+async def drive(client, teams: list[dict], args) -> dict:
+    recorder = Recorder()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        virtual_user(client, recorder, i, teams[i % len(teams)], args) for i in range(args.users)
+    ))
+    return recorder.summary(time.perf_counter() - start)
+
+
+async def run_asgi(teams: list[dict], args) -> dict:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+            return await drive(client, teams, args)
+
+
+async def run_uvicorn(teams: list[dict], args, env: dict) -> dict:
+    import httpx
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await drive(client, teams, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Routes whose p95 grew or throughput fell by more than `tolerance`"""
+    regressions = []
+    for route, base in baseline["results"]["routes"].items():
+        now = current["results"]["routes"].get(route)
+        if now is None:
+            continue
+        if now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {base['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{route}: {base['rps']} -> {now['rps']} req/s")
+        if now["errors"] > base["errors"]:
+            regressions.append(f"{route}: errors {base['errors']} -> {now['errors']}")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict):
+    print(f"{'route':<28}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in results["routes"].items():
+        print(f"{route:<28}{r['requests']:>9}{r['errors']:>8}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+    print(f"\n{results['requests']} requests, {results['errors']} errors in {results['wall_seconds']}s "
+          f"({results['rps']} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to every stub request")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--teams", type=int, default=4, help="projects the users are spread over")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per team project")
+    parser.add_argument("--iterations", type=int, default=50, help="actions per user")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--upload-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between actions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+    args.teams = max(1, min(args.teams, args.users))
+
+    stub = StubSupabase(latency=args.latency)
+    teams = seed_teams(stub, args.teams, args.tasks)
+    url = stub.start()
+    # Settings are read at import time, so point them at the stub first
+    env = {
+        "SUPABASE_URL": url,
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "JWT_SECRET": "load-test-secret",
+    }
+    os.environ.update(env)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        if args.server == "uvicorn":
+            results = asyncio.run(run_uvicorn(teams, args, env))
+        else:
+            results = asyncio.run(run_asgi(teams, args))
+    finally:
+        stub.stop()
+
+    print_report(results)
+    print(f"stub served {stub.requests} upstream requests")
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+            "upstream_requests": stub.requests,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["config"] != report["meta"]["config"]:
+            print("warning: baseline was recorded with different settings")
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
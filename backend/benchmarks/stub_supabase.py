@@ -0,0 +1,391 @@
+"""
+Local stand-in for the Supabase HTTP APIs used by the backend.
+
+Only the subset the app actually issues is implemented: PostgREST
+(`select`, `order`, `limit`, `count()` aggregates and the
+eq/neq/lt/lte/gt/gte/in/is/ilike filters on GET/POST/PATCH/DELETE), Storage object upload/download/move/remove/list and
+GoTrue password sign-up/sign-in plus the admin user lookup. Tables,
+objects and users live in memory and every request can be delayed by a
+fixed latency to mimic a remote round-trip.
+
+    stub = StubSupabase(latency=0.02)
+    stub.tables["tasks"] = [...]
+    url = stub.start()
+    ...
+    stub.stop()
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict", "or"}
+
+
+def _coerce(value: str):
+    if value == "null":
+        return None
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+def _compare(row_value, op: str, raw: str) -> bool:
+    if op == "is":
+        return row_value is _coerce(raw)
+    if op == "in":
+        options = [v.strip().strip('"') for v in raw.strip("()").split(",")]
+        return str(row_value) in options
+    if op == "ilike":
+        needle = raw.replace("*", "%").strip("%").lower()
+        return row_value is not None and needle in str(row_value).lower()
+    if row_value is None:
+        return False
+    left, right = str(row_value), raw
+    if op == "eq":
+        return left == right
+    if op == "neq":
+        return left != right
+    if op == "lt":
+        return left < right
+    if op == "lte":
+        return left <= right
+    if op == "gt":
+        return left > right
+    if op == "gte":
+        return left >= right
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _matches(row: dict, filters: list[tuple[str, str, str]]) -> bool:
+    for column, op, raw in filters:
+        negate = op.startswith("not.")
+        op = op[4:] if negate else op
+        if _compare(row.get(column), op, raw) == negate:
+            return False
+    return True
+
+
+def _parse_logic(text: str, i: int = 0) -> tuple[list, int]:
+    """
+    Parse a PostgREST logic tree body such as `a.lt."x",and(a.eq."x",id.lt.y)`
+    up to the closing paren. Returns (conditions, index after the list).
+    """
+    conditions = []
+    while i < len(text) and text[i] != ")":
+        for group in ("and(", "or("):
+            if text.startswith(group, i):
+                children, i = _parse_logic(text, i + len(group))
+                conditions.append((group[:-1], children))
+                i += 1  # closing paren
+                break
+        else:
+            column, op, rest = text[i:].split(".", 2)
+            i += len(column) + len(op) + 2
+            if text[i] == '"':
+                j, value = i + 1, []
+                while text[j] != '"':
+                    if text[j] == "\\":
+                        j += 1
+                    value.append(text[j])
+                    j += 1
+                raw, i = "".join(value), j + 1
+            else:
+                j = i
+                while j < len(text) and text[j] not in ",)":
+                    j += 1
+                raw, i = text[i:j], j
+            conditions.append((column, op, raw))
+        if i < len(text) and text[i] == ",":
+            i += 1
+    return conditions, i
+
+
+def _matches_logic(row: dict, kind: str, conditions: list) -> bool:
+    results = (
+        _matches_logic(row, c[0], c[1]) if c[0] in ("and", "or") and isinstance(c[1], list)
+        else _matches(row, [c])
+        for c in conditions
+    )
+    return all(results) if kind == "and" else any(results)
+
+
+def _parse_filters(params: list[tuple[str, str]]) -> list[tuple[str, str, str]]:
+    filters = []
+    for key, value in params:
+        if key in RESERVED_PARAMS:
+            continue
+        if value.startswith("not."):
+            op, _, raw = value[4:].partition(".")
+            filters.append((key, f"not.{op}", raw))
+        else:
+            op, _, raw = value.partition(".")
+            filters.append((key, op, raw))
+    return filters
+
+
+def _project(rows: list[dict], select: str) -> list[dict]:
+    if not select or select == "*":
+        return [dict(r) for r in rows]
+    columns = [c.strip() for c in select.split(",")]
+    return [{c: r.get(c) for c in columns} for r in rows]
+
+
+def _sort(rows: list[dict], order: str) -> list[dict]:
+    for part in reversed(order.split(",")):
+        column, _, direction = part.partition(".")
+        desc = direction.startswith("desc")
+        rows = sorted(rows, key=lambda r: (r.get(column) is None, str(r.get(column))), reverse=desc)
+    return rows
+
+
+class StubSupabase:
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.tables: dict[str, list[dict]] = {}
+        self.objects: dict[str, tuple[bytes, str]] = {}  # "bucket/path" -> (body, content type)
+        self.users: dict[str, dict] = {}  # id -> {"email", "full_name", "created_at"}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---- PostgREST -------------------------------------------------------
+
+    def rest(self, method: str, table: str, params: list[tuple[str, str]], body) -> tuple[int, list]:
+        query = dict(params)
+        filters = _parse_filters(params)
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+            if method == "POST":
+                new_rows = [dict(r) for r in (body if isinstance(body, list) else [body])]
+                for r in new_rows:
+                    r.setdefault("id", str(uuid.uuid4()))  # column default
+                rows.extend(dict(r) for r in new_rows)
+                return 201, _project(new_rows, query.get("select", "*"))
+            matched = [r for r in rows if _matches(r, filters)]
+            if "or" in query:
+                logic, _ = _parse_logic(query["or"][1:])  # drop the opening paren
+                matched = [r for r in matched if _matches_logic(r, "or", logic)]
+            if method == "PATCH":
+                for r in matched:
+                    r.update(body)
+                return 200, _project(matched, query.get("select", "*"))
+            if method == "DELETE":
+                doomed = {id(r) for r in matched}
+                self.tables[table] = [r for r in rows if id(r) not in doomed]
+                return 200, _project(matched, query.get("select", "*"))
+        columns = query.get("select", "*").split(",")
+        if "count()" in columns:
+            # Aggregate select: group by the plain columns
+            groups = [c for c in columns if c != "count()"]
+            counts: dict[tuple, int] = {}
+            for r in matched:
+                key = tuple(r.get(c) for c in groups)
+                counts[key] = counts.get(key, 0) + 1
+            return 200, [{**dict(zip(groups, key)), "count": n} for key, n in counts.items()]
+        if "order" in query:
+            matched = _sort(matched, query["order"])
+        offset = int(query.get("offset", 0))
+        if "limit" in query:
+            matched = matched[offset:offset + int(query["limit"])]
+        return 200, _project(matched, query.get("select", "*"))
+
+    # ---- Storage ---------------------------------------------------------
+
+    def storage(self, method: str, path: str, headers, body: bytes) -> tuple:
+        """
+        Returns (status, payload, content type[, extra headers]); payload is
+        bytes for downloads, which honor single `Range: bytes=a-b` requests
+        """
+        parts = path.split("/")
+        if parts[0] == "bucket":
+            name = parts[1] if len(parts) > 1 else json.loads(body or b"{}").get("id")
+            return 200, {"id": name, "name": name, "public": False}, "application/json"
+        if parts[:2] == ["object", "list"]:
+            prefix = f"{parts[2]}/"
+            names = [k[len(prefix):] for k in self.objects if k.startswith(prefix)]
+            return 200, [{"name": n} for n in names], "application/json"
+        if parts[0] != "object":
+            return 404, {"message": f"No stub route for {path}"}, "application/json"
+        if parts[1:] == ["move"]:
+            move = json.loads(body)
+            source, destination = f"{move['bucketId']}/{move['sourceKey']}", f"{move['bucketId']}/{move['destinationKey']}"
+            with self._lock:
+                if source not in self.objects:
+                    return 400, {"statusCode": "404", "error": "not_found", "message": "Object not found"}, "application/json"
+                if destination in self.objects:
+                    return 400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}, "application/json"
+                self.objects[destination] = self.objects.pop(source)
+            return 200, {"message": "Successfully moved"}, "application/json"
+        if parts[1] in ("authenticated", "public"):
+            parts = parts[1:]
+        key = "/".join(parts[1:])
+        if method in ("POST", "PUT"):
+            with self._lock:
+                if key in self.objects and method == "POST" and headers.get("x-upsert") != "true":
+                    return 400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}, "application/json"
+                self.objects[key] = (body, headers.get("Content-Type") or "application/octet-stream")
+            return 200, {"Key": key}, "application/json"
+        if method == "DELETE":
+            bucket = parts[1]
+            removed = []
+            with self._lock:
+                for name in json.loads(body or b"{}").get("prefixes", []):
+                    if self.objects.pop(f"{bucket}/{name}", None) is not None:
+                        removed.append({"name": name, "bucket_id": bucket})
+            return 200, removed, "application/json"
+        if key not in self.objects:
+            return 400, {"statusCode": "404", "error": "not_found", "message": "Object not found"}, "application/json"
+        data, content_type = self.objects[key]
+        requested = headers.get("Range")
+        if requested and requested.startswith("bytes="):
+            first, _, last = requested[6:].partition("-")
+            if not first:
+                start, end = max(len(data) - int(last), 0), len(data) - 1
+            else:
+                start, end = int(first), min(int(last) if last else len(data) - 1, len(data) - 1)
+            if start >= len(data) or start > end:
+                return 416, b"", content_type, {"Content-Range": f"bytes */{len(data)}"}
+            return 206, data[start:end + 1], content_type, {"Content-Range": f"bytes {start}-{end}/{len(data)}"}
+        return 200, data, content_type
+
+    # ---- GoTrue admin ----------------------------------------------------
+
+    def add_user(self, email: str, password: str, full_name: str | None = None) -> str:
+        user_id = str(uuid.uuid4())
+        with self._lock:
+            self.users[user_id] = {
+                "email": email,
+                "password": password,
+                "full_name": full_name,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+        return user_id
+
+    def _user_json(self, user_id: str) -> dict:
+        user = self.users[user_id]
+        return {
+            "id": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": user["email"],
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {"full_name": user.get("full_name")},
+            "created_at": user["created_at"],
+        }
+
+    def _session_json(self, user_id: str) -> dict:
+        return {
+            "access_token": f"stub.{user_id}.token",
+            "refresh_token": uuid.uuid4().hex,
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "expires_at": int(time.time()) + 3600,
+            "user": self._user_json(user_id),
+        }
+
+    def admin_user(self, user_id: str) -> tuple[int, dict]:
+        if user_id not in self.users:
+            return 404, {"code": 404, "msg": "User not found"}
+        return 200, self._user_json(user_id)
+
+    def sign_up(self, body: dict) -> tuple[int, dict]:
+        if any(u["email"] == body["email"] for u in self.users.values()):
+            return 422, {"code": 422, "error_code": "user_already_exists", "msg": "User already registered"}
+        full_name = (body.get("data") or {}).get("full_name")
+        return 200, self._session_json(self.add_user(body["email"], body["password"], full_name))
+
+    def sign_in(self, body: dict) -> tuple[int, dict]:
+        for user_id, user in self.users.items():
+            if user["email"] == body.get("email") and user.get("password") == body.get("password"):
+                return 200, self._session_json(user_id)
+        return 400, {"code": 400, "error_code": "invalid_credentials", "msg": "Invalid login credentials"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _raw_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return b"".join(chunks)
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status: int, data: bytes, content_type: str, headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def _send_json(self, status: int, payload):
+                self._send(status, json.dumps(payload).encode(), "application/json")
+
+            def _dispatch(self):
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                parts = urlsplit(self.path)
+                body = self._raw_body()
+                if parts.path.startswith("/rest/v1/"):
+                    table = parts.path[len("/rest/v1/"):]
+                    params = parse_qsl(parts.query, keep_blank_values=True)
+                    try:
+                        status, payload = stub.rest(self.command, table, params, json.loads(body) if body else None)
+                    except ValueError as e:
+                        status, payload = 400, {"message": str(e), "code": "PGRST100"}
+                    return self._send_json(status, payload)
+                if parts.path.startswith("/storage/v1/"):
+                    status, payload, content_type, *extra = stub.storage(
+                        self.command, parts.path[len("/storage/v1/"):], self.headers, body
+                    )
+                    if isinstance(payload, bytes):
+                        return self._send(status, payload, content_type, *extra)
+                    return self._send_json(status, payload)
+                if parts.path == "/auth/v1/health":
+                    return self._send_json(200, {"name": "GoTrue", "description": "stub"})
+                if parts.path == "/auth/v1/signup":
+                    return self._send_json(*stub.sign_up(json.loads(body)))
+                if parts.path == "/auth/v1/token":
+                    return self._send_json(*stub.sign_in(json.loads(body)))
+                if parts.path.startswith("/auth/v1/admin/users/"):
+                    return self._send_json(*stub.admin_user(parts.path.rsplit("/", 1)[1]))
+                self._send_json(404, {"message": f"No stub route for {parts.path}"})
+
+            do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+        return Handler
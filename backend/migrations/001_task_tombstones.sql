@@ -0,0 +1,20 @@
+-- Tombstones of deleted tasks, read by delta sync
+-- (GET /tasks/project/{id}/changes). Rows older than
+-- TASK_TOMBSTONE_RETENTION_DAYS are pruned by the API.
+--
+-- Run once in the Supabase SQL editor (or `supabase db push`). The API
+-- uses the service role, so no policies are needed; RLS keeps the table
+-- closed to the anon and authenticated roles.
+
+create table if not exists task_tombstones (
+    id uuid primary key,
+    project_id uuid not null,
+    deleted_at timestamptz not null
+);
+
+create index if not exists task_tombstones_project_id_idx
+    on task_tombstones (project_id, deleted_at, id);
+create index if not exists task_tombstones_deleted_at_idx
+    on task_tombstones (deleted_at);
+
+alter table task_tombstones enable row level security;
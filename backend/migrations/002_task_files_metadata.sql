@@ -0,0 +1,16 @@
+-- Results of post-upload processing (app/services/upload_processing.py):
+-- image dimensions, page counts and the thumbnail object, filled in by
+-- the background job; processed_at marks a row as done.
+--
+-- Run once in the Supabase SQL editor (or `supabase db push`).
+
+alter table task_files
+    add column if not exists width integer,
+    add column if not exists height integer,
+    add column if not exists page_count integer,
+    add column if not exists thumbnail_path text,
+    add column if not exists processed_at timestamptz;
+
+-- Rows are looked up by blob: processing, and reference counts of
+-- content-addressed uploads
+create index if not exists task_files_file_path_idx on task_files (file_path);
@@ -0,0 +1,28 @@
+-- Background project deletions (DELETE /api/projects/{id}); see
+-- app/services/project_deletion.py. A worker runs a deletion only after
+-- claiming it: claimed_by is the worker, lease_expires_at when its claim
+-- lapses unless renewed.
+--
+-- Run once in the Supabase SQL editor (or `supabase db push`). The API
+-- uses the service role, so no policies are needed; RLS keeps the table
+-- closed to the anon and authenticated roles.
+
+create table if not exists project_deletions (
+    id uuid primary key,
+    owner_id uuid not null,
+    status text not null check (status in ('pending', 'running', 'done', 'failed')),
+    tasks_deleted integer not null default 0,
+    files_deleted integer not null default 0,
+    objects_removed integer not null default 0,
+    pending_paths text,
+    error text,
+    claimed_by text,
+    lease_expires_at timestamptz not null default now(),
+    created_at timestamptz not null,
+    updated_at timestamptz not null
+);
+
+create index if not exists project_deletions_status_idx
+    on project_deletions (status, lease_expires_at);
+
+alter table project_deletions enable row level security;
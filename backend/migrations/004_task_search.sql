@@ -0,0 +1,26 @@
+-- Full-text search over tasks (GET /tasks/search); see
+-- SupabaseRepository.search. Title words weigh more than description
+-- words, so a title hit outranks a description hit.
+--
+-- Run once in the Supabase SQL editor (or `supabase db push`). The API
+-- calls search_tasks with the service role and filters the result to the
+-- caller's projects itself.
+
+alter table tasks add column if not exists fts tsvector generated always as (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) stored;
+
+create index if not exists tasks_fts_idx on tasks using gin (fts);
+
+-- q is a tsquery, e.g. 'fix:* & login:*' (every word, as a prefix)
+create or replace function search_tasks(q text) returns table (
+    id uuid, project_id uuid, title text, description text,
+    status text, priority text, assigned_to uuid, created_by uuid,
+    created_at timestamptz, updated_at timestamptz, rank real
+) language sql stable as $$
+    select t.id, t.project_id, t.title, t.description, t.status,
+           t.priority, t.assigned_to, t.created_by, t.created_at,
+           t.updated_at, ts_rank_cd(t.fts, to_tsquery('simple', q))
+    from tasks t where t.fts @@ to_tsquery('simple', q)
+$$;
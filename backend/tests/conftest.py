@@ -0,0 +1,102 @@
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+# Settings are read at import, so the backends are chosen before the app loads
+_root = tempfile.mkdtemp(prefix="taskflow-tests-")
+os.environ.update({
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.dGVzdA",
+    "SUPABASE_SERVICE_KEY": "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.dGVzdA",
+    "SUPABASE_WARMUP": "false",
+    "JWT_SECRET": "test-secret",
+    "REPOSITORY_BACKEND": "sqlite",
+    "SQLITE_PATH": os.path.join(_root, "taskflow.db"),
+    "STORAGE_BACKEND": "local",
+    "LOCAL_STORAGE_ROOT": os.path.join(_root, "storage"),
+    "TASK_SYNC_SETTLE_SECONDS": "0",
+    "JOB_WORKERS": "2",
+    "JOB_RETRY_SECONDS": "0.01",
+    "ADMIN_TOKEN": "test-admin",
+    "PROFILING_ENABLED": "true",
+    "PROFILING_INTERVAL": "0.001",
+})
+
+import httpx
+import pytest
+from app.main import app
+from app.config import settings
+from app.repositories.base import get_repository
+from app.utils.security import create_access_token
+
+# Manual script against a live Supabase project
+collect_ignore = ["test_upload.py"]
+
+STORAGE_ROOT = settings.local_storage_root
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # One event loop for the session: queues and caches are module singletons
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def started(anyio_backend):
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+async def client(started):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=started), base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def repo():
+    return get_repository()
+
+
+ADMIN = {"X-Admin-Token": "test-admin"}
+
+
+def auth_headers(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+@pytest.fixture
+def user() -> dict:
+    user_id = str(uuid.uuid4())
+    return {"id": user_id, "headers": auth_headers(user_id)}
+
+
+@pytest.fixture
+async def project(client, user) -> str:
+    r = await client.post("/api/projects/", json={"name": "test project"}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+@pytest.fixture
+async def task(repo, project, user) -> str:
+    row = task_row(project, user["id"])
+    await repo.insert("tasks", row)
+    return row["id"]
+
+
+def task_row(project_id: str, created_by: str, **fields) -> dict:
+    now = datetime.utcnow().isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "project_id": project_id,
+        "title": "task",
+        "description": "",
+        "status": "todo",
+        "priority": "low",
+        "created_by": created_by,
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }
@@ -0,0 +1,106 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import auth_service
+from app.utils import security
+from app.utils.security import create_access_token, decode_token, token_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_protected_routes_need_a_valid_token(client, user):
+    assert (await client.get("/api/projects/")).status_code == 401
+    bad = {"Authorization": "Bearer not-a-token"}
+    assert (await client.get("/api/projects/", headers=bad)).status_code == 401
+    assert (await client.get("/api/projects/", headers=user["headers"])).status_code == 200
+
+
+async def test_expired_token_is_rejected(client, user):
+    token = create_access_token({"sub": user["id"]}, expires_delta=timedelta(seconds=-1))
+    r = await client.get("/api/projects/", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 401
+
+
+async def test_logout_revokes_the_token(client, user):
+    r = await client.post("/api/auth/logout", headers=user["headers"])
+    assert r.status_code == 200, r.text
+    r = await client.get("/api/projects/", headers=user["headers"])
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token has been revoked"
+
+
+def test_verified_claims_are_cached(monkeypatch):
+    token = create_access_token({"sub": "someone"})
+    decode, calls = security.jwt.decode, []
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counted)
+    assert decode_token(token)["sub"] == decode_token(token)["sub"] == "someone"
+    assert len(calls) == 1
+
+
+def test_cached_claims_expire_with_the_token(monkeypatch):
+    token = create_access_token({"sub": "someone"}, expires_delta=timedelta(seconds=30))
+    decode_token(token)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 60)
+    assert token_cache.get(security._digest(token)) is None
+
+
+@pytest.fixture
+def admin_api(monkeypatch):
+    """Stands in for the Supabase admin API; records the users looked up"""
+    lookups = []
+
+    async def get_user_by_id(user_id):
+        lookups.append(user_id)
+        return SimpleNamespace(user=SimpleNamespace(
+            id=user_id, email="fresh@example.com", user_metadata={"full_name": "Fresh"},
+            created_at=datetime(2024, 1, 1),
+        ))
+
+    client = SimpleNamespace(auth=SimpleNamespace(admin=SimpleNamespace(get_user_by_id=get_user_by_id)))
+    monkeypatch.setattr(auth_service, "get_service_client", lambda: client)
+    return lookups
+
+
+def profile_token(user_id: str) -> dict:
+    token = create_access_token({
+        "sub": user_id, "email": "claims@example.com", "full_name": "Claims", "created_at": "2024-01-01T00:00:00",
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def background_refreshes():
+    await asyncio.gather(*auth_service._refreshing.values())
+
+
+async def test_me_is_answered_from_token_claims(client, admin_api):
+    r = await client.get("/api/auth/me", headers=profile_token(str(uuid.uuid4())))
+    assert r.status_code == 200, r.text
+    assert (r.json()["email"], r.json()["full_name"]) == ("claims@example.com", "Claims")
+    assert admin_api == []
+
+
+async def test_stale_profile_is_refreshed_in_the_background(client, admin_api):
+    user_id = str(uuid.uuid4())
+    headers = profile_token(user_id)
+    await client.get("/api/auth/me", headers=headers)
+
+    # Still answered from the cache; the lookup runs behind it
+    r = await client.get("/api/auth/me", headers=headers)
+    assert r.json()["email"] == "claims@example.com"
+    await background_refreshes()
+    assert admin_api == [user_id]
+
+    r = await client.get("/api/auth/me", headers=headers)
+    assert r.json()["email"] == "fresh@example.com"
+    assert admin_api == [user_id]
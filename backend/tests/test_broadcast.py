@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from app.services.task_service import task_feed
+from app.utils.broadcast import RESYNC, Broadcaster
+
+pytestmark = pytest.mark.anyio
+
+
+def events(chunk: bytes) -> list[tuple[str, dict]]:
+    """(event, data) of each SSE message in a chunk"""
+    found = []
+    for message in chunk.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if ": " in line)
+        if "event" in fields:
+            found.append((fields["event"], json.loads(fields["data"])))
+    return found
+
+
+async def test_every_subscriber_of_a_topic_gets_each_event():
+    feed = Broadcaster("test", max_queue=10)
+    first, second, other = feed.subscribe("p"), feed.subscribe("p"), feed.subscribe("q")
+    feed.publish("p", "task.created", {"n": 1})
+    feed.publish("p", "task.updated", {"n": 2})
+
+    for subscription in (first, second):
+        chunk = await subscription.next(1)
+        assert events(chunk) == [("task.created", {"n": 1}), ("task.updated", {"n": 2})]
+        assert chunk.startswith(b"id: 1\n")
+    assert await other.next(0.01) == b""
+    assert feed.stats()["delivered"] == 4
+
+
+async def test_publishing_to_a_topic_without_subscribers_is_a_no_op():
+    feed = Broadcaster("test", max_queue=10)
+    feed.publish("p", "task.created", {})
+    assert feed.stats()["published"] == 0
+
+
+async def test_slow_subscriber_is_told_to_resync():
+    feed = Broadcaster("test", max_queue=3)
+    slow, fast = feed.subscribe("p"), feed.subscribe("p")
+    for n in range(3):
+        feed.publish("p", "task.updated", {"n": n})
+    assert len(events(await fast.next(1))) == 3
+
+    # The slow one's buffer is full: its backlog becomes one resync
+    for n in range(3, 6):
+        feed.publish("p", "task.updated", {"n": n})
+    assert await slow.next(1) == RESYNC
+    assert (slow.overflows, fast.overflows, feed.overflows) == (1, 0, 1)
+    assert [d["n"] for _, d in events(await fast.next(1))] == [3, 4, 5]
+
+    # Once it has caught up, events flow again
+    feed.publish("p", "task.updated", {"n": 6})
+    assert events(await slow.next(1)) == [("task.updated", {"n": 6})]
+
+
+async def test_closed_subscriptions_leave_the_topic():
+    feed = Broadcaster("test", max_queue=10)
+    subscription = feed.subscribe("p")
+    subscription.close()
+    feed.publish("p", "task.created", {})
+    assert feed.stats() == {"topics": 0, "subscribers": 0, "published": 0, "delivered": 0, "overflows": 0}
+
+
+async def test_task_writes_are_published_to_the_project(client, repo, project, user):
+    subscription = task_feed.subscribe(project)
+    try:
+        r = await client.post("/tasks/", headers=user["headers"], json={
+            "project_id": project, "title": "new", "description": "", "status": "todo", "priority": "low",
+        })
+        task_id = r.json()["id"]
+        await client.put(f"/tasks/{task_id}", json={"title": "renamed"})
+        await client.delete(f"/tasks/{task_id}")
+        received = events(await subscription.next(1))
+    finally:
+        subscription.close()
+    assert [e for e, _ in received] == ["task.created", "task.updated", "task.deleted"]
+    assert received[1][1]["task"]["title"] == "renamed"
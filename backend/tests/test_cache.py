@@ -0,0 +1,38 @@
+import time
+
+from app.utils.cache import TTLCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("test", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.evictions == 1
+
+
+def test_entries_expire(monkeypatch):
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert (cache.get("a"), cache.get("b")) == (1, None)
+
+
+def test_fetch_overtaken_by_a_write_is_not_cached():
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    version = cache.version
+    cache.invalidate("a")  # a write lands while the read is in flight
+    cache.set("a", "stale", version=version)
+    assert cache.get("a") is None
+
+
+def test_update_applies_a_write_in_place():
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    cache.set("a", {"n": 1})
+    assert cache.update("a", lambda v: v.update(n=2))
+    assert cache.get("a") == {"n": 2}
+    assert not cache.update("missing", lambda v: None)
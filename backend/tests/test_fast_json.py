@@ -0,0 +1,39 @@
+import pytest
+
+from app.config import settings
+from tests.conftest import task_row
+
+pytestmark = pytest.mark.anyio
+
+MODES = {
+    "response_model": {"fast_json": False, "fast_json_trust_rows": False},
+    "dump_models": {"fast_json": True, "fast_json_trust_rows": False},
+    "dump_rows": {"fast_json": True, "fast_json_trust_rows": True},
+}
+
+
+async def bodies(client, monkeypatch, url, **kwargs) -> dict:
+    out = {}
+    for mode, values in MODES.items():
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+        r = await client.get(url, **kwargs)
+        assert r.status_code == 200, r.text
+        assert r.headers["content-type"] == "application/json"
+        out[mode] = (r.json(), r.headers.get("etag"), r.headers.get("x-next-cursor"))
+    return out
+
+
+async def test_task_list_body_is_the_same_on_every_path(client, repo, project, user, monkeypatch):
+    await repo.insert("tasks", [
+        task_row(project, user["id"], title=f"t{i}", assigned_to=user["id"] if i % 2 else None) for i in range(3)
+    ])
+    out = await bodies(client, monkeypatch, f"/tasks/project/{project}", params={"limit": 2})
+    assert out["dump_models"] == out["response_model"]
+    assert out["dump_rows"] == out["response_model"]
+
+
+async def test_project_list_body_is_the_same_on_every_path(client, user, project, monkeypatch):
+    out = await bodies(client, monkeypatch, "/api/projects/", headers=user["headers"])
+    assert out["dump_models"] == out["response_model"]
+    assert out["dump_rows"] == out["response_model"]
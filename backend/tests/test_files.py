@@ -0,0 +1,214 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services import file_service
+from app.storage.base import get_storage
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def upload(client, task_id, name, content):
+    r = await client.post("/api/files/upload", params={"task_id": task_id}, files={"file": (name, content, "text/plain")})
+    assert r.status_code == 201, r.text
+    return r.json()["data"]
+
+
+@pytest.fixture
+async def stored(client, task):
+    content = os.urandom(1000)
+    return (await upload(client, task, "a.txt", content))["file_path"], content
+
+
+async def test_download_sends_the_whole_file(client, stored):
+    path, content = stored
+    r = await client.get(f"/api/files/{path}")
+    assert r.status_code == 200
+    assert r.content == content
+    assert r.headers["content-length"] == "1000"
+    assert r.headers["accept-ranges"] == "bytes"
+    assert "immutable" in r.headers["cache-control"]
+
+
+async def test_range_requests(client, stored):
+    path, content = stored
+    r = await client.get(f"/api/files/{path}", headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.content == content[10:20]
+    assert r.headers["content-range"] == "bytes 10-19/1000"
+
+    r = await client.get(f"/api/files/{path}", headers={"Range": "bytes=-100"})
+    assert r.status_code == 206
+    assert r.content == content[-100:]
+    assert r.headers["content-range"] == "bytes 900-999/1000"
+
+    r = await client.get(f"/api/files/{path}", headers={"Range": "bytes=5000-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == "bytes */1000"
+
+
+async def test_if_range(client, stored):
+    path, content = stored
+    etag = (await client.get(f"/api/files/{path}")).headers["etag"]
+    r = await client.get(f"/api/files/{path}", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert (r.status_code, r.content) == (206, content[:10])
+    # A stale validator gets the full, current body
+    r = await client.get(f"/api/files/{path}", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert (r.status_code, r.content) == (200, content)
+
+
+async def test_revalidation_gets_304_from_the_path(client, stored, monkeypatch):
+    path, _ = stored
+    etag = (await client.get(f"/api/files/{path}")).headers["etag"]
+    storage = await get_storage()
+
+    async def untouched(*args, **kwargs):
+        raise AssertionError("storage was called")
+
+    monkeypatch.setattr(storage, "open_download", untouched)
+    monkeypatch.setattr(storage, "exists", untouched)
+    r = await client.get(f"/api/files/{path}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    monkeypatch.undo()
+
+    r = await client.get(f"/api/files/{path}", headers={"If-None-Match": '"other"'})
+    assert r.status_code == 200
+
+
+async def test_unknown_path_is_404(client):
+    assert (await client.get("/api/files/blobs/missing")).status_code == 404
+
+
+def batch(*files):
+    return [("files", (name, content, "text/plain")) for name, content in files]
+
+
+async def test_batch_reports_each_file(client, repo, task):
+    r = await client.post("/api/files/upload/batch", params={"task_id": task}, files=batch(
+        ("a.txt", os.urandom(10)), ("b.exe", b"x"), ("c.txt", os.urandom(10)),
+    ))
+    assert r.status_code == 201, r.text
+    body = r.json()
+    assert (body["uploaded"], body["failed"]) == (2, 1)
+    assert [d["status"] for d in body["data"]] == ["uploaded", "failed", "uploaded"]
+    assert "not allowed" in body["data"][1]["error"]
+    rows = await repo.select("task_files", "file_name", filters=[("task_id", "eq", task)])
+    assert sorted(f["file_name"] for f in rows) == ["a.txt", "c.txt"]
+
+
+async def test_batch_size_is_capped(client, task, monkeypatch):
+    monkeypatch.setattr(settings, "upload_batch_max_files", 2)
+    r = await client.post("/api/files/upload/batch", params={"task_id": task},
+                          files=batch(*[(f"{i}.txt", b"x") for i in range(3)]))
+    assert r.status_code == 400
+
+
+async def test_batch_bounds_concurrent_writes(client, task, monkeypatch):
+    monkeypatch.setattr(settings, "upload_batch_concurrency", 2)
+    storage = await get_storage()
+    upload_stream, active, peak = storage.upload_stream, [0], [0]
+
+    async def tracked(*args, **kwargs):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        try:
+            await asyncio.sleep(0.01)
+            return await upload_stream(*args, **kwargs)
+        finally:
+            active[0] -= 1
+
+    monkeypatch.setattr(storage, "upload_stream", tracked)
+    r = await client.post("/api/files/upload/batch", params={"task_id": task},
+                          files=batch(*[(f"{i}.txt", os.urandom(10)) for i in range(6)]))
+    assert r.json()["uploaded"] == 6
+    assert peak[0] == 2
+
+
+async def test_same_content_is_stored_once(client, task):
+    content = uuid.uuid4().bytes
+    first = await upload(client, task, "a.txt", content)
+    second = await upload(client, task, "b.txt", content)
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert first["file_path"] == second["file_path"]
+
+    storage = await get_storage()
+    assert await storage.list_files("staging") == []
+
+
+async def test_batch_upload_dedups_within_and_across_requests(client, task):
+    shared, fresh = uuid.uuid4().bytes, uuid.uuid4().bytes
+    await upload(client, task, "a.txt", shared)
+    r = await client.post("/api/files/upload/batch", params={"task_id": task}, files=[
+        ("files", ("b.txt", shared, "text/plain")),
+        ("files", ("c.txt", fresh, "text/plain")),
+        ("files", ("d.txt", fresh, "text/plain")),
+    ])
+    assert r.status_code == 201, r.text
+    assert [d["deduplicated"] for d in r.json()["data"]] == [True, False, True]
+
+
+async def test_blob_outlives_all_but_the_last_reference(client, repo, task, user):
+    content = uuid.uuid4().bytes
+    path = (await upload(client, task, "a.txt", content))["file_path"]
+    await upload(client, task, "b.txt", content)
+    ids = [r["id"] for r in await repo.select("task_files", "id", filters=[("file_path", "eq", path)])]
+    storage = await get_storage()
+
+    r = await client.delete(f"/api/files/{ids[0]}", headers=user["headers"])
+    assert r.json() == {"success": True, "blob_removed": False}
+    assert await storage.exists(path)
+
+    r = await client.delete(f"/api/files/{ids[1]}", headers=user["headers"])
+    assert r.json() == {"success": True, "blob_removed": True}
+    assert not await storage.exists(path)
+    assert await storage.list_files("trash") == []
+
+
+async def test_file_delete_requires_the_owner(client, repo, task, user):
+    path = (await upload(client, task, "a.txt", uuid.uuid4().bytes))["file_path"]
+    file_id = (await repo.select("task_files", "id", filters=[("file_path", "eq", path)]))[0]["id"]
+    assert (await client.delete(f"/api/files/{file_id}")).status_code == 401
+    assert (await client.delete(f"/api/files/{file_id}", headers=auth_headers(str(uuid.uuid4())))).status_code == 404
+    assert (await client.delete(f"/api/files/{file_id}", headers=user["headers"])).status_code == 200
+
+
+async def test_release_keeps_a_blob_referenced_meanwhile(client, repo, task, monkeypatch):
+    path = (await upload(client, task, "a.txt", uuid.uuid4().bytes))["file_path"]
+    await repo.delete("task_files", filters=[("file_path", "eq", path)])
+    referenced, calls = file_service.referenced_paths, []
+
+    async def racing(paths):
+        # A new upload of the same content lands between the two checks
+        calls.append(paths)
+        if len(calls) == 2:
+            await repo.insert("task_files", {
+                "task_id": task, "file_name": "late.txt", "file_path": path, "file_type": ".txt", "file_size": 16,
+            })
+        return await referenced(paths)
+
+    monkeypatch.setattr(file_service, "referenced_paths", racing)
+    storage = await get_storage()
+    assert await file_service.release_blobs(storage, [path]) == []
+    assert await storage.exists(path)
+
+
+async def test_failed_release_restores_the_blob(client, repo, task, monkeypatch):
+    path = (await upload(client, task, "a.txt", uuid.uuid4().bytes))["file_path"]
+    await repo.delete("task_files", filters=[("file_path", "eq", path)])
+    storage = await get_storage()
+
+    async def failing(paths):
+        raise RuntimeError("storage down")
+
+    monkeypatch.setattr(storage, "delete_files", failing)
+    with pytest.raises(RuntimeError):
+        await file_service.release_blobs(storage, [path])
+    monkeypatch.undo()
+    assert await storage.exists(path)
+    assert await storage.list_files("trash") == []
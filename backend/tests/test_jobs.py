@@ -0,0 +1,96 @@
+import asyncio
+import io
+import os
+
+import pytest
+from PIL import Image
+from pypdf import PdfWriter
+
+from app.services.upload_processing import upload_jobs
+from app.storage.base import get_storage
+from app.utils.jobs import JobQueue
+
+pytestmark = pytest.mark.anyio
+
+
+async def until(condition):
+    async def wait():
+        while not condition():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(wait(), 1)
+
+
+async def test_failing_job_is_retried_then_given_up():
+    queue = JobQueue("test", workers=1, max_queue=10, max_attempts=3, retry_delay=0.001)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("try again")
+
+    async def broken():
+        raise RuntimeError("always")
+
+    queue.submit("flaky", flaky)
+    queue.submit("broken", broken)
+    await until(lambda: queue.done + queue.failed == 2)
+    assert len(attempts) == 2
+    stats = queue.stats()
+    assert (stats["done"], stats["failed"], stats["waiting_retry"]) == (1, 1, 0)
+    await queue.close()
+
+
+async def test_full_queue_drops_jobs():
+    queue = JobQueue("test", workers=1, max_queue=1, max_attempts=1, retry_delay=0)
+
+    async def job():
+        pass
+
+    # Workers start on the first submit but haven't taken a job yet
+    assert (queue.submit("a", job), queue.submit("b", job)) == (True, False)
+    assert queue.stats()["dropped"] == 1
+    await queue.close()
+
+
+async def test_close_shuts_down_the_thread_pool():
+    queue = JobQueue("test", workers=1, max_queue=10, max_attempts=1, retry_delay=0)
+    assert await queue.run_blocking(sum, [1, 2]) == 3
+    await queue.close()
+    with pytest.raises(RuntimeError):
+        await queue.run_blocking(sum, [1, 2])
+
+
+async def processed(client, repo, task, name, content) -> dict:
+    r = await client.post("/api/files/upload", params={"task_id": task}, files={"file": (name, content)})
+    assert r.status_code == 201, r.text
+    await upload_jobs.join(1)
+    path = r.json()["data"]["file_path"]
+    return (await repo.select("task_files", filters=[("file_path", "eq", path)]))[0]
+
+
+async def test_image_upload_gets_dimensions_and_a_thumbnail(client, repo, task):
+    out = io.BytesIO()
+    Image.frombytes("RGB", (640, 480), os.urandom(640 * 480 * 3)).save(out, "PNG")
+    row = await processed(client, repo, task, "photo.png", out.getvalue())
+    assert (row["width"], row["height"], row["page_count"]) == (640, 480, None)
+    assert row["processed_at"]
+
+    storage = await get_storage()
+    with Image.open(io.BytesIO(await storage.download_file(row["thumbnail_path"]))) as thumbnail:
+        assert max(thumbnail.size) < 640
+
+
+async def test_pdf_upload_gets_its_page_count(client, repo, task):
+    writer, out = PdfWriter(), io.BytesIO()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    writer.write(out)
+    row = await processed(client, repo, task, "doc.pdf", out.getvalue())
+    assert (row["page_count"], row["thumbnail_path"]) == (3, None)
+
+
+async def test_unreadable_upload_is_marked_processed(client, repo, task):
+    row = await processed(client, repo, task, "broken.pdf", os.urandom(100))
+    assert row["processed_at"]
+    assert row["page_count"] is None
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+
+from app.storage.local import LocalStorage
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+class Failing(Exception):
+    pass
+
+
+async def broken_stream():
+    yield b"partial"
+    raise Failing()
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    await storage.ensure_bucket_exists()
+    return storage
+
+
+async def test_upload_keeps_content_and_type(storage):
+    await storage.upload_stream("a/b.txt", chunks(b"hello ", b"world"), content_type="text/plain")
+    assert await storage.download_file("a/b.txt") == b"hello world"
+    [entry] = await storage.list_files("a")
+    assert (entry["name"], entry["metadata"]) == ("b.txt", {"size": 11, "mimetype": "text/plain"})
+
+
+async def test_failed_upload_leaves_no_object(storage):
+    with pytest.raises(Failing):
+        await storage.upload_stream("a.txt", broken_stream())
+    assert not await storage.exists("a.txt")
+    assert list(storage.root.glob("*.part")) == []
+
+
+async def test_existing_objects_are_not_replaced(storage):
+    await storage.upload_stream("a.txt", chunks(b"first"))
+    with pytest.raises(HTTPException):
+        await storage.upload_stream("a.txt", chunks(b"second"))
+    await storage.upload_stream("a.txt", chunks(b"second"), exist_ok=True)
+    assert await storage.download_file("a.txt") == b"first"
+
+
+async def test_move_never_overwrites(storage):
+    await storage.upload_stream("src", chunks(b"new"), content_type="text/csv")
+    await storage.upload_stream("dst", chunks(b"old"))
+    with pytest.raises(HTTPException):
+        await storage.move("src", "dst")
+    assert await storage.move("src", "dst", exist_ok=True) is False
+    assert not await storage.exists("src")
+    assert await storage.download_file("dst") == b"old"
+
+    await storage.upload_stream("src", chunks(b"x"), content_type="text/csv")
+    assert await storage.move("src", "elsewhere/dst") is True
+    assert (await storage.list_files("elsewhere"))[0]["metadata"]["mimetype"] == "text/csv"
+    with pytest.raises(HTTPException) as e:
+        await storage.move("src", "dst")
+    assert e.value.status_code == 404
+
+
+async def test_paths_outside_the_root_are_not_found(storage):
+    for path in ("../escape", "/etc/passwd", ".meta/a.txt", ""):
+        with pytest.raises(HTTPException) as e:
+            await storage.download_file(path)
+        assert e.value.status_code == 404
+
+
+async def test_delete_ignores_missing_objects(storage):
+    await storage.upload_stream("a.txt", chunks(b"x"))
+    await storage.delete_files(["a.txt", "missing.txt"])
+    assert not await storage.exists("a.txt")
@@ -0,0 +1,69 @@
+import re
+
+import httpx
+import pytest
+
+from app.utils.supabase_client import InstrumentedTransport
+
+pytestmark = pytest.mark.anyio
+
+
+def samples(text: str, name: str) -> list[dict]:
+    """Label sets of the `name` samples in a Prometheus text exposition"""
+    found = []
+    for line in text.splitlines():
+        match = re.match(rf"^{name}\{{(.*)\}} \S+$", line)
+        if match:
+            found.append(dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(1))))
+    return found
+
+
+async def test_routes_are_labelled_by_template(client, task):
+    await client.get(f"/tasks/{task}")
+    await client.get("/api/files/blobs/ab/cd")
+    await client.get("/no/such/route")
+    text = (await client.get("/metrics")).text
+    requests = samples(text, "taskflow_http_requests_total")
+    assert {"method": "GET", "route": "/tasks/{task_id}", "status": "200"} in requests
+    assert {"method": "GET", "route": "/api/files/{file_path}", "status": "404"} in requests
+    assert {"method": "GET", "route": "unmatched", "status": "404"} in requests
+    assert not any(task in r["route"] for r in requests)
+    assert not any(r["route"] == "/metrics" for r in requests)
+    assert "# TYPE taskflow_http_request_duration_seconds histogram" in text
+
+
+async def test_backend_calls_are_labelled_by_table(client, task):
+    await client.get(f"/tasks/{task}")
+    upstream = samples((await client.get("/metrics")).text, "taskflow_upstream_requests_total")
+    assert any(s["upstream"] == "sqlite" and s["target"] == "tasks" and s["operation"] == "select" for s in upstream)
+
+
+async def test_supabase_calls_are_labelled_by_table_bucket_and_endpoint(client):
+    def respond(request):
+        return httpx.Response(500 if "broken" in request.url.path else 200, json={})
+
+    transport = InstrumentedTransport(httpx.MockTransport(respond))
+    async with httpx.AsyncClient(transport=transport, base_url="http://supabase.test") as upstream:
+        await upstream.get("/rest/v1/tasks", params={"select": "*", "id": "eq.123"})
+        await upstream.post("/rest/v1/rpc/search_tasks")
+        await upstream.post("/storage/v1/object/task-files/blobs/ab/cdef")
+        await upstream.get("/storage/v1/object/authenticated/task-files/blobs/ab/cdef")
+        await upstream.post("/auth/v1/token", params={"grant_type": "password"})
+        await upstream.get("/auth/v1/admin/users/123")
+        await upstream.get("/rest/v1/broken")
+
+    found = {
+        (s["upstream"], s["target"], s["operation"], s["status"])
+        for s in samples((await client.get("/metrics")).text, "taskflow_upstream_requests_total")
+    }
+    assert {
+        ("postgrest", "tasks", "select", "200"),
+        ("postgrest", "search_tasks", "rpc", "200"),
+        ("storage", "task-files", "upload", "200"),
+        ("storage", "task-files", "download", "200"),
+        ("auth", "token", "sign_in", "200"),
+        ("auth", "admin/users", "get", "200"),
+        ("postgrest", "broken", "select", "500"),
+    } <= found
+    # Object paths and ids never become label values
+    assert not any("cdef" in target or "123" in target for _, target, _, _ in found)
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from tests.conftest import ADMIN
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_admin_api_needs_the_token(client, monkeypatch):
+    assert (await client.get("/api/admin/profiles")).status_code == 403
+    assert (await client.get("/api/admin/profiles", headers={"X-Admin-Token": "wrong"})).status_code == 403
+    assert (await client.get("/api/admin/profiles", headers=ADMIN)).status_code == 200
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert (await client.get("/api/admin/profiles", headers=ADMIN)).status_code == 404
+
+
+async def test_requests_with_the_header_are_profiled(client, repo, task, monkeypatch):
+    select = repo.select
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await select(*args, **kwargs)
+
+    monkeypatch.setattr(repo, "select", slow)
+    r = await client.get(f"/tasks/{task}", headers={"X-Profile": "test-admin"})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+
+    profile = (await client.get(f"/api/admin/profiles/{profile_id}", headers=ADMIN)).json()
+    assert (profile["method"], profile["route"], profile["status"], profile["reason"]) == (
+        "GET", "/tasks/{task_id}", 200, "header",
+    )
+    assert profile["samples"] > 0
+    # Parked on the slow read: an await stack through the route handler
+    waits = [s for s in profile["stacks"] if s["kind"] == "await"]
+    assert any(any("get_task" in f for f in s["frames"]) for s in waits)
+
+    folded = (await client.get(f"/api/admin/profiles/{profile_id}", params={"format": "folded"}, headers=ADMIN)).text
+    assert folded.startswith(("await;", "cpu;"))
+    listed = (await client.get("/api/admin/profiles", headers=ADMIN)).json()
+    assert listed[0]["id"] == profile_id
+
+
+async def test_other_requests_are_not_profiled(client, task):
+    r = await client.get(f"/tasks/{task}", headers={"X-Profile": "wrong"})
+    assert "x-profile-id" not in r.headers
+    r = await client.get("/api/admin/profiles", headers={**ADMIN, "X-Profile": "test-admin"})
+    assert "x-profile-id" not in r.headers
+
+
+async def test_unknown_profile_is_404(client):
+    assert (await client.get("/api/admin/profiles/nope", headers=ADMIN)).status_code == 404
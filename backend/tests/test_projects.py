@@ -0,0 +1,186 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import project_deletion
+from app.services.project_service import ProjectService
+from app.storage.base import get_storage
+from app.utils.jobs import get_job_queue
+from tests.conftest import auth_headers, task_row
+
+pytestmark = pytest.mark.anyio
+
+EXPIRED = "2000-01-01T00:00:00"
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    # Several batches and chunks, so progress is saved midway
+    monkeypatch.setattr(settings, "project_delete_batch_size", 7)
+    monkeypatch.setattr(settings, "storage_delete_chunk_size", 3)
+
+
+async def finished():
+    # join() doesn't wait for retries scheduled for later
+    queue = get_job_queue("project_deletions")
+    while True:
+        await queue.join(10)
+        if not queue.stats()["waiting_retry"]:
+            return
+        await asyncio.sleep(0.01)
+
+
+def deletion_row(project_id: str, **fields) -> dict:
+    now = datetime.utcnow().isoformat()
+    return {
+        "id": project_id, "owner_id": str(uuid.uuid4()), "status": "running",
+        "tasks_deleted": 0, "files_deleted": 0, "objects_removed": 0, "pending_paths": "[]", "error": None,
+        "lease_expires_at": EXPIRED, "created_at": now, "updated_at": now, **fields,
+    }
+
+
+async def test_cascade_deletes_tasks_files_and_unshared_blobs(client, repo, project, user, small_batches):
+    headers = user["headers"]
+    tasks = [task_row(project, user["id"]) for _ in range(30)]
+    await repo.insert("tasks", tasks)
+    keeper = (await client.post("/api/projects/", json={"name": "keeper"}, headers=headers)).json()["id"]
+    kept_task = task_row(keeper, user["id"])
+    await repo.insert("tasks", kept_task)
+
+    tag = uuid.uuid4().hex
+    for i, task in enumerate(tasks[:12]):
+        r = await client.post("/api/files/upload", params={"task_id": task["id"]},
+                              files={"file": (f"f{i}.txt", f"{tag}{i % 8}".encode(), "text/plain")})
+        assert r.status_code == 201, r.text
+    shared = (await client.post("/api/files/upload", params={"task_id": kept_task["id"]},
+                                files={"file": ("shared.txt", f"{tag}0".encode(), "text/plain")})).json()["data"]
+
+    r = await client.delete(f"/api/projects/{project}", headers=headers)
+    assert r.status_code == 202, r.text
+    assert [p["id"] for p in (await client.get("/api/projects/", headers=headers)).json()] == [keeper]
+    await finished()
+
+    deletion = (await client.get(f"/api/projects/{project}/deletion", headers=headers)).json()
+    assert deletion["status"] == "done"
+    assert (deletion["tasks_deleted"], deletion["files_deleted"], deletion["objects_removed"]) == (30, 12, 7)
+    assert await repo.select("tasks", "id", filters=[("project_id", "eq", project)]) == []
+    storage = await get_storage()
+    assert await storage.exists(shared["file_path"])
+    assert len(await repo.select("tasks", "id", filters=[("project_id", "eq", keeper)])) == 1
+
+
+async def test_repeated_delete_returns_the_same_deletion(client, project, user):
+    headers = user["headers"]
+    first = (await client.delete(f"/api/projects/{project}", headers=headers)).json()
+    await finished()
+    again = await client.delete(f"/api/projects/{project}", headers=headers)
+    assert again.status_code == 202
+    assert again.json()["id"] == first["id"]
+    assert again.json()["status"] == "done"
+
+
+async def test_concurrent_deletes_share_one_deletion(client, project, user):
+    results = await asyncio.gather(*[client.delete(f"/api/projects/{project}", headers=user["headers"]) for _ in range(3)])
+    assert {r.status_code for r in results} == {202}
+    assert len({r.json()["id"] for r in results}) == 1
+    await finished()
+
+
+async def test_failed_request_can_be_retried(client, repo, project, user, monkeypatch):
+    async def failing(project_id, owner_id):
+        raise RuntimeError("projects down")
+
+    monkeypatch.setattr(ProjectService, "delete_project", failing)
+    with pytest.raises(RuntimeError):
+        await client.delete(f"/api/projects/{project}", headers=user["headers"])
+    monkeypatch.undo()
+    assert await repo.select("project_deletions", filters=[("id", "eq", project)]) == []
+
+    r = await client.delete(f"/api/projects/{project}", headers=user["headers"])
+    assert r.status_code == 202, r.text
+    await finished()
+    deletion = (await client.get(f"/api/projects/{project}/deletion", headers=user["headers"])).json()
+    assert deletion["status"] == "done"
+
+
+async def test_deletion_is_private_to_the_owner(client, project, user):
+    stranger = auth_headers(str(uuid.uuid4()))
+    assert (await client.delete(f"/api/projects/{project}", headers=stranger)).status_code == 404
+    assert (await client.delete(f"/api/projects/{uuid.uuid4()}", headers=user["headers"])).status_code == 404
+    assert (await client.get(f"/api/projects/{project}/deletion", headers=user["headers"])).status_code == 404
+
+
+async def test_interrupted_deletion_is_resumed(client, repo, user):
+    project = str(uuid.uuid4())
+    await repo.insert("tasks", [task_row(project, user["id"]) for _ in range(5)])
+    # Stopped after deleting rows whose blob it had not released yet
+    storage = await get_storage()
+    orphan = f"orphans/{uuid.uuid4().hex}"
+    Path(settings.local_storage_root, orphan).parent.mkdir(parents=True, exist_ok=True)
+    Path(settings.local_storage_root, orphan).write_bytes(b"x")
+    await repo.insert("project_deletions", deletion_row(
+        project, tasks_deleted=3, pending_paths=json.dumps([orphan])
+    ))
+
+    await project_deletion.resume_deletions()
+    await finished()
+
+    row = (await repo.select("project_deletions", filters=[("id", "eq", project)]))[0]
+    assert row["status"] == "done"
+    assert (row["tasks_deleted"], row["objects_removed"], row["pending_paths"]) == (8, 1, "[]")
+    assert not await storage.exists(orphan)
+    assert await repo.select("tasks", "id", filters=[("project_id", "eq", project)]) == []
+
+
+async def test_failed_run_is_retried(client, repo, project, user, monkeypatch):
+    task = task_row(project, user["id"])
+    await repo.insert("tasks", task)
+    await client.post("/api/files/upload", params={"task_id": task["id"]},
+                      files={"file": ("a.txt", uuid.uuid4().bytes, "text/plain")})
+    storage = await get_storage()
+    delete_files, calls = storage.delete_files, []
+
+    async def flaky(paths):
+        calls.append(paths)
+        if len(calls) == 1:
+            raise RuntimeError("storage down")
+        return await delete_files(paths)
+
+    monkeypatch.setattr(storage, "delete_files", flaky)
+    await client.delete(f"/api/projects/{project}", headers=user["headers"])
+    await finished()
+
+    deletion = (await client.get(f"/api/projects/{project}/deletion", headers=user["headers"])).json()
+    assert deletion["status"] == "done"
+    assert (deletion["files_deleted"], deletion["objects_removed"]) == (1, 1)
+    assert len(calls) == 2
+
+
+async def test_only_one_worker_runs_a_deletion(repo, started, monkeypatch):
+    project = str(uuid.uuid4())
+    await repo.insert("project_deletions", deletion_row(project, status="failed", error="x"))
+
+    monkeypatch.setattr(project_deletion, "WORKER_ID", "A")
+    assert await project_deletion._claim(project)
+    monkeypatch.setattr(project_deletion, "WORKER_ID", "B")
+    assert await project_deletion._claim(project) is None
+    await project_deletion.resume_deletions()
+    assert get_job_queue("project_deletions").stats()["queued"] == 0
+
+    # A's lease runs out: B takes over and finishes
+    await repo.update("project_deletions", {"lease_expires_at": EXPIRED}, filters=[("id", "eq", project)])
+    await project_deletion.resume_deletions()
+    await finished()
+    row = (await repo.select("project_deletions", filters=[("id", "eq", project)]))[0]
+    assert (row["status"], row["claimed_by"]) == ("done", "B")
+
+    # A, still running, finds the work taken over and does nothing
+    monkeypatch.setattr(project_deletion, "WORKER_ID", "A")
+    await project_deletion.run_deletion(project)
+    row = (await repo.select("project_deletions", filters=[("id", "eq", project)]))[0]
+    assert row["claimed_by"] == "B"
@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+
+from app.repositories.sqlite_repository import SqliteRepository
+from tests.conftest import task_row
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def db(tmp_path):
+    repo = SqliteRepository(str(tmp_path / "test.db"))
+    await repo.start()
+    yield repo
+    await repo.close()
+
+
+async def test_insert_returns_rows_with_generated_ids(db):
+    rows = await db.insert("tasks", [
+        {k: v for k, v in task_row("p", "u", title=f"t{i}").items() if k != "id"} for i in range(2)
+    ])
+    assert [r["title"] for r in rows] == ["t0", "t1"]
+    assert all(r["id"] for r in rows)
+    assert len({r["id"] for r in rows}) == 2
+
+
+async def test_multi_row_insert_is_atomic(db):
+    row = task_row("p", "u")
+    with pytest.raises(sqlite3.IntegrityError):
+        await db.insert("tasks", [task_row("p", "u"), row, row])
+    assert await db.select("tasks") == []
+
+
+async def test_insert_can_skip_existing_rows(db):
+    first, second = task_row("p", "u", title="first"), task_row("p", "u")
+    await db.insert("tasks", first)
+    rows = await db.insert("tasks", [{**first, "title": "again"}, second], ignore_duplicates=True)
+    assert [r["id"] for r in rows] == [second["id"]]
+    assert (await db.select("tasks", "title", filters=[("id", "eq", first["id"])]))[0]["title"] == "first"
+
+
+async def test_filters(db):
+    await db.insert("tasks", [
+        task_row("p", "u", title="Alpha", assigned_to="a"),
+        task_row("p", "u", title="beta", status="done"),
+        task_row("q", "u", title="gamma"),
+    ])
+
+    async def titles(*filters):
+        return sorted(r["title"] for r in await db.select("tasks", "title", filters=list(filters)))
+
+    assert await titles(("project_id", "eq", "p")) == ["Alpha", "beta"]
+    assert await titles(("status", "neq", "done")) == ["Alpha", "gamma"]
+    assert await titles(("project_id", "in", ["q", "r"])) == ["gamma"]
+    assert await titles(("project_id", "in", [])) == []
+    assert await titles(("assigned_to", "is", None)) == ["beta", "gamma"]
+    assert await titles(("title", "ilike", "a*")) == ["Alpha"]
+
+
+async def test_keyset_after(db):
+    await db.insert("tasks", [task_row("p", "u", title=t) for t in "abcde"])
+    order = [("title", False), ("id", False)]
+    first = await db.select("tasks", "id,title", order=order, limit=2)
+    rest = await db.select("tasks", "id,title", order=order, after=first[-1])
+    assert [r["title"] for r in first + rest] == list("abcde")
+
+
+async def test_update_and_delete_return_touched_rows(db):
+    row = task_row("p", "u")
+    await db.insert("tasks", [row, task_row("p", "u")])
+    updated = await db.update("tasks", {"status": "done"}, filters=[("id", "eq", row["id"])])
+    assert [(r["id"], r["status"]) for r in updated] == [(row["id"], "done")]
+    deleted = await db.delete("tasks", filters=[("status", "eq", "done")])
+    assert [r["id"] for r in deleted] == [row["id"]]
+    assert len(await db.select("tasks")) == 1
+
+
+async def test_counts_are_grouped_in_the_database(db):
+    await db.insert("tasks", [task_row("p", "u", status=s) for s in ("todo", "todo", "done")])
+    counts = await db.count("tasks", ["status"], filters=[("project_id", "eq", "p")])
+    assert sorted((c["status"], c["count"]) for c in counts) == [("done", 1), ("todo", 2)]
+
+
+async def test_identifiers_are_not_interpolated(db):
+    with pytest.raises(ValueError):
+        await db.select("tasks; drop table tasks")
+    with pytest.raises(ValueError):
+        await db.select("tasks", filters=[("id = id or 1", "eq", "x")])
+
+
+async def test_older_databases_gain_added_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE task_files (id TEXT PRIMARY KEY, task_id TEXT NOT NULL, file_name TEXT NOT NULL, "
+            "file_path TEXT NOT NULL, file_type TEXT, file_size INTEGER, uploaded_by TEXT, created_at TEXT)"
+        )
+    repo = SqliteRepository(path)
+    await repo.start()
+    try:
+        [row] = await repo.insert("task_files", {"task_id": "t", "file_name": "a", "file_path": "a", "page_count": 3})
+        assert (row["page_count"], row["thumbnail_path"]) == (3, None)
+    finally:
+        await repo.close()
+
+
+async def test_search_ranks_title_hits_first(db):
+    await db.insert("tasks", [
+        task_row("p", "u", title="Write docs", description="login page copy"),
+        task_row("p", "u", title="Fix login", description="users can't sign in"),
+        task_row("p", "u", title="Unrelated", description="nothing here"),
+        task_row("q", "u", title="Login elsewhere"),
+    ])
+    hits = await db.search("tasks", ["log"], "title", filters=[("project_id", "eq", "p")])
+    assert [h["title"] for h in hits] == ["Fix login", "Write docs"]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    # Every term must match
+    assert [h["title"] for h in await db.search("tasks", ["login", "sign"], "title")] == ["Fix login"]
+
+
+async def test_search_pages_with_limit_and_offset(db):
+    await db.insert("tasks", [task_row("p", "u", title=f"deploy {i}") for i in range(5)])
+    first = await db.search("tasks", ["deploy"], "id", limit=3)
+    rest = await db.search("tasks", ["deploy"], "id", limit=3, offset=3)
+    assert (len(first), len(rest)) == (3, 2)
+    assert {h["id"] for h in first + rest} == {r["id"] for r in await db.select("tasks", "id")}
+
+
+async def test_search_without_matches_or_index(db):
+    await db.insert("tasks", task_row("p", "u", title="Fix login"))
+    assert await db.search("tasks", ["nothing"]) == []
+    with pytest.raises(ValueError):
+        await db.search("projects", ["fix"])
@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories import supabase_repository
+from app.repositories.supabase_repository import SupabaseRepository
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest request builder"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.writes = False
+
+    def __getattr__(self, name):
+        def chained(*args, **kwargs):
+            self.writes = self.writes or name in ("insert", "upsert", "update", "delete")
+            return self
+        return chained
+
+    async def execute(self):
+        self.client.executed.append(self.table)
+        call = len(self.client.executed)
+        if not self.writes:
+            # Reads stay in flight until the test lets them finish
+            await self.client.gate.wait()
+        return SimpleNamespace(data=[{"call": call}])
+
+
+class FakeClient:
+    def __init__(self):
+        self.executed = []
+        self.gate = asyncio.Event()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    async def reached(self, calls: int):
+        async def wait():
+            while len(self.executed) < calls:
+                await asyncio.sleep(0)
+        await asyncio.wait_for(wait(), 1)
+
+
+@pytest.fixture
+def upstream(monkeypatch, started):
+    client = FakeClient()
+    monkeypatch.setattr(supabase_repository, "get_service_client", lambda: client)
+    return client
+
+
+async def test_identical_concurrent_reads_share_one_call(upstream):
+    repo = SupabaseRepository()
+    reads = [asyncio.create_task(repo.select("tasks", filters=[("project_id", "eq", "p")])) for _ in range(5)]
+    other = asyncio.create_task(repo.select("tasks", filters=[("project_id", "eq", "q")]))
+    await upstream.reached(2)
+    upstream.gate.set()
+    results = await asyncio.gather(*reads)
+    await other
+    assert upstream.executed == ["tasks", "tasks"]
+    assert all(r == results[0] for r in results)
+
+
+async def test_read_after_a_write_does_not_join_an_earlier_read(upstream):
+    repo = SupabaseRepository()
+    before = asyncio.create_task(repo.select("tasks"))
+    await upstream.reached(1)
+    await repo.insert("tasks", {"title": "new"})
+    after = asyncio.create_task(repo.select("tasks"))
+    await upstream.reached(3)
+    upstream.gate.set()
+    # The later read saw the write: it made its own call after the insert
+    assert (await before, await after) == ([{"call": 1}], [{"call": 3}])
@@ -0,0 +1,324 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services import task_service
+from tests.conftest import auth_headers, task_row
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(repo, project, user, count, **fields):
+    rows = [task_row(project, user["id"], title=f"t{i:03d}", **fields) for i in range(count)]
+    await repo.insert("tasks", rows)
+    return [r["id"] for r in rows]
+
+
+async def pages(client, project, **params):
+    ids, cursor, count = [], None, 0
+    while True:
+        r = await client.get(f"/tasks/project/{project}", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        ids += [t["id"] for t in r.json()]
+        count += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            return ids, count
+
+
+async def test_keyset_pages_cover_every_task_once(client, repo, project, user):
+    ids = await seed(repo, project, user, 23)
+    seen, count = await pages(client, project, limit=7)
+    assert sorted(seen) == sorted(ids)
+    assert count == 4
+
+
+async def test_cursor_follows_sort_and_filters(client, repo, project, user):
+    await seed(repo, project, user, 5, status="done")
+    await seed(repo, project, user, 3)
+    r = await client.get(f"/tasks/project/{project}", params={"status": "done", "sort": "title", "limit": 3})
+    first = [t["title"] for t in r.json()]
+    cursor = r.headers["x-next-cursor"]
+    r = await client.get(f"/tasks/project/{project}", params={"status": "done", "sort": "title", "limit": 3, "cursor": cursor})
+    rest = [t["title"] for t in r.json()]
+    assert first + rest == sorted(first + rest)
+    assert len(first + rest) == 5
+    assert all(t["status"] == "done" for t in r.json())
+    assert "x-next-cursor" not in r.headers
+
+
+async def test_cursor_is_rejected_for_another_sort(client, repo, project, user):
+    await seed(repo, project, user, 3)
+    r = await client.get(f"/tasks/project/{project}", params={"sort": "title", "limit": 1})
+    r = await client.get(f"/tasks/project/{project}", params={"sort": "-title", "cursor": r.headers["x-next-cursor"]})
+    assert r.status_code == 400
+    r = await client.get(f"/tasks/project/{project}", params={"sort": "bogus"})
+    assert r.status_code == 400
+
+
+async def test_task_reads_see_writes(client, repo, project, user):
+    task_id = (await seed(repo, project, user, 1))[0]
+    assert (await client.get(f"/tasks/{task_id}")).json()["title"] == "t000"
+    r = await client.put(f"/tasks/{task_id}", json={"title": "changed"})
+    assert r.status_code == 200, r.text
+    assert (await client.get(f"/tasks/{task_id}")).json()["title"] == "changed"
+    await client.delete(f"/tasks/{task_id}")
+    assert (await client.get(f"/tasks/{task_id}")).status_code == 404
+
+
+async def test_task_reads_are_cached(client, repo, project, user, monkeypatch):
+    task_id = (await seed(repo, project, user, 1))[0]
+    await client.get(f"/tasks/{task_id}")
+    select, calls = repo.select, []
+
+    async def counted(table, *args, **kwargs):
+        calls.append(table)
+        return await select(table, *args, **kwargs)
+
+    monkeypatch.setattr(repo, "select", counted)
+    for _ in range(3):
+        assert (await client.get(f"/tasks/{task_id}")).status_code == 200
+    assert "tasks" not in calls
+
+
+async def test_project_list_follows_writes(client, user, project):
+    headers = user["headers"]
+    assert [p["id"] for p in (await client.get("/api/projects/", headers=headers)).json()] == [project]
+    await client.put(f"/api/projects/{project}", json={"name": "renamed"}, headers=headers)
+    await client.post("/api/projects/", json={"name": "second"}, headers=headers)
+    names = sorted(p["name"] for p in (await client.get("/api/projects/", headers=headers)).json())
+    assert names == ["renamed", "second"]
+
+
+async def test_unchanged_task_gets_304(client, repo, project, user):
+    task_id = (await seed(repo, project, user, 1))[0]
+    r = await client.get(f"/tasks/{task_id}")
+    etag = r.headers["etag"]
+    assert etag.startswith('W/"')
+    r = await client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert (r.status_code, r.content) == (304, b"")
+
+    await client.put(f"/tasks/{task_id}", json={"title": "changed"})
+    r = await client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+async def test_unchanged_page_gets_304_with_its_cursor(client, repo, project, user):
+    await seed(repo, project, user, 3)
+    url = f"/tasks/project/{project}"
+    r = await client.get(url, params={"limit": 2})
+    r = await client.get(url, params={"limit": 2}, headers={"If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+    assert r.headers["x-next-cursor"]
+
+
+async def test_project_list_etag_follows_writes(client, user, project):
+    headers = user["headers"]
+    etag = (await client.get("/api/projects/", headers=headers)).headers["etag"]
+    r = await client.get("/api/projects/", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    await client.put(f"/api/projects/{project}", json={"name": "renamed"}, headers=headers)
+    r = await client.get("/api/projects/", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+
+
+async def test_bulk_create_reports_each_row(client, repo, project, user):
+    payload = [
+        {"project_id": project, "title": f"b{i}", "description": "", "status": "todo", "priority": "low"}
+        for i in range(3)
+    ]
+    payload.insert(1, {**payload[0], "project_id": str(uuid.uuid4())})
+    r = await client.post("/tasks/bulk", json=payload, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    results = r.json()
+    assert [x["index"] for x in results] == [0, 1, 2, 3]
+    assert [x["status"] for x in results] == ["created", "failed", "created", "created"]
+    assert results[1]["error"]
+    created = [x["id"] for x in results if x["status"] == "created"]
+    assert len(await repo.select("tasks", "id", filters=[("id", "in", created)])) == 3
+
+
+async def test_bulk_update_and_delete_report_missing_rows(client, repo, project, user):
+    ids = await seed(repo, project, user, 3)
+    missing = str(uuid.uuid4())
+    r = await client.put("/tasks/bulk", json=[
+        {"id": ids[0], "status": "done"}, {"id": missing, "status": "done"}, {"id": ids[1], "title": "T"},
+    ])
+    assert [x["status"] for x in r.json()] == ["updated", "not_found", "updated"]
+    assert (await client.get(f"/tasks/{ids[0]}")).json()["status"] == "done"
+    assert (await client.get(f"/tasks/{ids[1]}")).json()["title"] == "T"
+
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": [ids[0], missing, ids[1]]})
+    assert [x["status"] for x in r.json()] == ["deleted", "not_found", "deleted"]
+    assert [t["id"] for t in await repo.select("tasks", "id", filters=[("id", "in", ids)])] == [ids[2]]
+
+
+async def test_bulk_writes_span_chunks(client, repo, project, user, monkeypatch):
+    monkeypatch.setattr(settings, "task_bulk_chunk_size", 3)
+    payload = [
+        {"project_id": project, "title": f"b{i}", "description": "", "status": "todo", "priority": "low"}
+        for i in range(7)
+    ]
+    results = (await client.post("/tasks/bulk", json=payload, headers=user["headers"])).json()
+    assert [x["status"] for x in results] == ["created"] * 7
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": [x["id"] for x in results]})
+    assert [x["status"] for x in r.json()] == ["deleted"] * 7
+    assert await repo.select("tasks", "id", filters=[("project_id", "eq", project)]) == []
+
+
+async def test_bulk_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(settings, "task_bulk_max_items", 2)
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": [str(uuid.uuid4()) for _ in range(3)]})
+    assert r.status_code == 400
+
+
+async def test_delta_sync_reports_deletions(client, repo, project, user):
+    ids = await seed(repo, project, user, 5)
+    changes = f"/tasks/project/{project}/changes"
+    full = (await client.get(changes, headers=user["headers"])).json()
+    assert sorted(t["id"] for t in full["changes"]) == sorted(ids)
+    assert full["deleted"] == []
+
+    await asyncio.sleep(0.01)
+    await client.delete(f"/tasks/{ids[0]}")
+    await client.request("DELETE", "/tasks/bulk", json={"ids": ids[1:3]})
+    await client.put(f"/tasks/{ids[3]}", json={"title": "edited"})
+    await asyncio.sleep(0.01)
+
+    delta = (await client.get(changes, params={"since": full["cursor"]}, headers=user["headers"])).json()
+    assert sorted(delta["deleted"]) == sorted(ids[:3])
+    assert [t["id"] for t in delta["changes"]] == [ids[3]]
+
+
+async def test_idle_project_cursor_outlives_the_retention(client, repo, project, user, monkeypatch):
+    await seed(repo, project, user, 2)
+    changes = f"/tasks/project/{project}/changes"
+    days = settings.task_tombstone_retention_days
+    start = datetime.utcnow()
+
+    class Clock(datetime):
+        now = start
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    monkeypatch.setattr(task_service, "datetime", Clock)
+    cursor = (await client.get(changes, headers=user["headers"])).json()["cursor"]
+    # Synced regularly but nothing changes: each cursor is as fresh as its sync
+    for elapsed in (days * 2 // 3, days * 4 // 3, days * 2):
+        Clock.now = start + timedelta(days=elapsed)
+        r = await client.get(changes, params={"since": cursor}, headers=user["headers"])
+        assert r.status_code == 200, r.text
+        assert (r.json()["changes"], r.json()["deleted"]) == ([], [])
+        cursor = r.json()["cursor"]
+
+    Clock.now += timedelta(days=days + 1)
+    r = await client.get(changes, params={"since": cursor}, headers=user["headers"])
+    assert r.status_code == 410
+
+
+async def test_failed_tombstone_keeps_the_task(client, repo, project, user, monkeypatch):
+    ids = await seed(repo, project, user, 2)
+    insert = repo.insert
+
+    async def failing(table, rows, **kwargs):
+        if table == "task_tombstones":
+            raise RuntimeError("tombstones down")
+        return await insert(table, rows, **kwargs)
+
+    monkeypatch.setattr(repo, "insert", failing)
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": ids})
+    assert {x["status"] for x in r.json()} == {"failed"}
+    with pytest.raises(RuntimeError):
+        await client.delete(f"/tasks/{ids[0]}")
+    monkeypatch.undo()
+
+    assert len(await repo.select("tasks", "id", filters=[("id", "in", ids)])) == 2
+    assert (await client.get(f"/tasks/project/{project}/stats", headers=user["headers"])).json()["total"] == 2
+
+
+async def test_concurrent_deletes_of_one_task(client, repo, project, user):
+    ids = await seed(repo, project, user, 2)
+    results = await asyncio.gather(*[client.delete(f"/tasks/{ids[0]}") for _ in range(3)])
+    assert sorted(r.json()["success"] for r in results) == [False, False, True]
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": ids})
+    assert r.status_code == 200, r.text
+    assert [x["status"] for x in r.json()] == ["not_found", "deleted"]
+    tombstones = await repo.select("task_tombstones", "id", filters=[("project_id", "eq", project)])
+    assert sorted(t["id"] for t in tombstones) == sorted(ids)
+
+
+async def test_failed_delete_keeps_tombstones_it_did_not_write(client, repo, project, user, monkeypatch):
+    ids = await seed(repo, project, user, 2)
+    # Written by a delete of ids[0] still in flight
+    await repo.insert("task_tombstones", {"id": ids[0], "project_id": project, "deleted_at": datetime.utcnow().isoformat()})
+    delete = repo.delete
+
+    async def failing(table, filters):
+        if table == "tasks":
+            raise RuntimeError("tasks down")
+        return await delete(table, filters)
+
+    monkeypatch.setattr(repo, "delete", failing)
+    r = await client.request("DELETE", "/tasks/bulk", json={"ids": ids})
+    assert {x["status"] for x in r.json()} == {"failed"}
+    monkeypatch.undo()
+
+    tombstones = await repo.select("task_tombstones", "id", filters=[("project_id", "eq", project)])
+    assert [t["id"] for t in tombstones] == [ids[0]]
+
+
+async def test_sync_routes_require_the_owner(client, project, user):
+    changes = f"/tasks/project/{project}/changes"
+    assert (await client.get(changes)).status_code == 401
+    assert (await client.get(changes, headers=auth_headers(str(uuid.uuid4())))).status_code == 404
+    assert (await client.get(changes, headers=user["headers"])).status_code == 200
+
+
+async def test_search_pages_and_rejects_empty_queries(client, repo, project, user):
+    await seed(repo, project, user, 3, description="quarterly report")
+    ids, cursor = [], None
+    while True:
+        r = await client.get("/tasks/search", headers=user["headers"],
+                             params={"q": "report", "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        ids += [t["id"] for t in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert len(ids) == len(set(ids)) == 3
+
+    for q, code in (("", 422), ("  !? ", 400)):
+        assert (await client.get("/tasks/search", params={"q": q}, headers=user["headers"])).status_code == code
+
+
+async def test_counts_follow_writes(client, repo, project, user):
+    stats = f"/tasks/project/{project}/stats"
+    ids = await seed(repo, project, user, 2)
+    assert (await client.get(stats, headers=user["headers"])).json()["total"] == 2
+    r = await client.post("/tasks/", headers=user["headers"], json={
+        "project_id": project, "title": "new", "description": "", "status": "done", "priority": "high",
+    })
+    assert r.status_code == 200, r.text
+    await client.put(f"/tasks/{ids[0]}", json={"status": "done"})
+    await client.delete(f"/tasks/{ids[1]}")
+    counts = (await client.get(stats, headers=user["headers"])).json()
+    assert counts["total"] == 2
+    assert counts["by_status"] == {"done": 2}
+    assert counts["by_priority"] == {"high": 1, "low": 1}
+
+
+async def test_dashboard_sums_the_callers_projects(client, repo, project, user):
+    other = (await client.post("/api/projects/", json={"name": "second"}, headers=user["headers"])).json()["id"]
+    await seed(repo, project, user, 2)
+    await seed(repo, other, user, 1, status="done")
+    r = await client.get("/tasks/stats", headers=user["headers"])
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["totals"]["total"] == 3
+    assert {k: v["total"] for k, v in body["projects"].items()} == {project: 2, other: 1}
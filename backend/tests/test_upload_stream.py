@@ -0,0 +1,55 @@
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.storage.base import get_storage
+from app.utils.uploads import CHUNK_SIZE, MAX_FILE_SIZE, UploadStream
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_stream_reads_in_bounded_chunks():
+    content = os.urandom(CHUNK_SIZE * 2 + 17)
+    stream = UploadStream(UploadFile(io.BytesIO(content), filename="a.bin"))
+    chunks = [chunk async for chunk in stream]
+    assert max(len(c) for c in chunks) <= CHUNK_SIZE
+    assert b"".join(chunks) == content
+    assert stream.size == len(content)
+    assert stream.hexdigest() == hashlib.sha256(content).hexdigest()
+
+
+async def test_stream_stops_at_the_limit():
+    stream = UploadStream(UploadFile(io.BytesIO(b"x" * (CHUNK_SIZE + 1)), filename="a.bin"), limit=CHUNK_SIZE)
+    with pytest.raises(HTTPException) as e:
+        async for _ in stream:
+            pass
+    assert e.value.status_code == 400
+
+
+async def test_upload_is_stored_whole(client, repo, task):
+    content = os.urandom(CHUNK_SIZE * 3 + 5)
+    r = await client.post("/api/files/upload", params={"task_id": task}, files={"file": ("a.txt", content, "text/plain")})
+    assert r.status_code == 201, r.text
+    data = r.json()["data"]
+    assert data["size"] == len(content)
+
+    storage = await get_storage()
+    assert await storage.download_file(data["file_path"]) == content
+    rows = await repo.select("task_files", filters=[("task_id", "eq", task)])
+    assert [(f["file_name"], f["file_size"]) for f in rows] == [("a.txt", len(content))]
+
+
+async def test_rejected_uploads_leave_nothing_behind(client, repo, task):
+    r = await client.post("/api/files/upload", params={"task_id": task},
+                          files={"file": ("big.txt", b"x" * (MAX_FILE_SIZE + 1), "text/plain")})
+    assert r.status_code == 400
+    r = await client.post("/api/files/upload", params={"task_id": task},
+                          files={"file": ("a.exe", b"x", "application/octet-stream")})
+    assert r.status_code == 400
+
+    storage = await get_storage()
+    assert await storage.list_files("staging") == []
+    assert await repo.select("task_files", filters=[("task_id", "eq", task)]) == []